@@ -2,7 +2,7 @@
 """
 Simple launcher for the 20 Questions game.
 
-Usage: python play.py [--debug]
+Usage: python play.py [--debug] [--sqlite] [--write-behind]
 """
 
 from twenty_questions.cli import main
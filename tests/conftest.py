@@ -0,0 +1,16 @@
+"""Shared fixtures: every test works on its own copy of the bundled catalog."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "twenty_questions" / "data"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A temporary data directory holding a copy of entities.json and attributes.json."""
+    for name in ("entities.json", "attributes.json"):
+        shutil.copy(DATA_DIR / name, tmp_path / name)
+    return tmp_path
@@ -0,0 +1,54 @@
+"""The compiled catalog must load the same knowledge base as the JSON files."""
+import json
+import os
+
+import numpy as np
+
+from twenty_questions.compiled_kb import CompiledEntity, compile_knowledge_base
+from twenty_questions.knowledge_base import KnowledgeBase
+
+
+def _assert_same_kb(kb, expected):
+    assert kb.entity_ids == expected.entity_ids
+    assert kb.attribute_ids == expected.attribute_ids
+    assert np.array_equal(kb.matrix, expected.matrix)
+    for entity_id, entity in expected.entities.items():
+        assert kb.entities[entity_id].to_dict() == entity.to_dict()
+    for attr_id, attribute in expected.attributes.items():
+        assert kb.attributes[attr_id].to_dict() == attribute.to_dict()
+    assert kb.content_hash() == expected.content_hash()
+
+
+def test_compiled_matches_json(data_dir):
+    compile_knowledge_base(data_dir)
+
+    kb = KnowledgeBase(data_dir)
+
+    assert isinstance(next(iter(kb.entities.values())), CompiledEntity)
+    _assert_same_kb(kb, KnowledgeBase(data_dir, use_compiled=False))
+
+
+def test_stale_compiled_file_is_ignored_until_rebuilt(data_dir):
+    compile_knowledge_base(data_dir)
+    entities_file = data_dir / "entities.json"
+    with open(entities_file) as f:
+        data = json.load(f)
+    entity = data["entities"][0]
+    entity["attributes"]["is_animal"] = 0.25
+    with open(entities_file, "w") as f:
+        json.dump(data, f)
+    # Make the edit visible even on filesystems with coarse timestamps
+    stat = entities_file.stat()
+    os.utime(entities_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    kb = KnowledgeBase(data_dir)
+
+    assert not isinstance(kb.entities[entity["id"]], CompiledEntity)
+    assert kb.entities[entity["id"]].attributes["is_animal"] == 0.25
+
+    compile_knowledge_base(data_dir)
+    kb = KnowledgeBase(data_dir)
+
+    assert isinstance(kb.entities[entity["id"]], CompiledEntity)
+    assert kb.entities[entity["id"]].attributes["is_animal"] == 0.25
+    _assert_same_kb(kb, KnowledgeBase(data_dir, use_compiled=False))
@@ -0,0 +1,33 @@
+"""Implication propagation must not chain through attributes that are already known."""
+from twenty_questions.implications import ImplicationEngine, KnownAnswers
+
+
+def test_chain_without_known_attributes():
+    engine = ImplicationEngine()
+    known = KnownAnswers(engine)
+    known.add_answer("is_mineral", 1.0)
+
+    assert known["is_animal"] == 0.0
+    assert known["is_cetacean"] == 0.0
+
+
+def test_maybe_answer_blocks_propagation():
+    engine = ImplicationEngine()
+    known = KnownAnswers(engine)
+    known.add_answer("is_animal", 0.5)
+    known.add_answer("is_mineral", 1.0)
+
+    assert known["is_animal"] == 0.5
+    assert "is_cetacean" not in known
+
+
+def test_add_answer_matches_propagate():
+    engine = ImplicationEngine()
+    answers = [("is_animal", 0.5), ("is_mineral", 1.0), ("is_large", 0.0)]
+    known = KnownAnswers(engine)
+    for attr_id, answer in answers:
+        known.add_answer(attr_id, answer)
+
+    assert dict(known.items()) == engine.propagate(answers)
+    determined = engine.get_all_determined_attributes(dict(answers))
+    assert dict(known.items()) == {**dict(answers), **determined}
@@ -0,0 +1,36 @@
+"""Tests for the learning journal of KnowledgeBase."""
+
+from twenty_questions.knowledge_base import KnowledgeBase
+
+
+def _learn(data_dir, entity_id, attr_id, value):
+    kb = KnowledgeBase(data_dir)
+    kb.set_attribute_value(entity_id, attr_id, value)
+    kb.save()
+
+
+def test_records_after_torn_journal_tail_survive(data_dir):
+    _learn(data_dir, "cat", "is_animal", 0.9)
+    # A crash in the middle of an append leaves a partial record behind
+    with open(data_dir / "learned.journal", "a") as f:
+        f.write('{"op":"w","e":"dog","a":"is_an')
+
+    _learn(data_dir, "cat", "is_animal", 0.33)
+    _learn(data_dir, "cow", "is_animal", 0.22)
+
+    kb = KnowledgeBase(data_dir)
+    assert kb.get_entity("cat").attributes["is_animal"] == 0.33
+    assert kb.get_entity("cow").attributes["is_animal"] == 0.22
+    assert (data_dir / "learned.journal").read_text().endswith("\n")
+
+
+def test_save_terminates_unterminated_last_record(data_dir):
+    _learn(data_dir, "cat", "is_animal", 0.9)
+    journal = data_dir / "learned.journal"
+    journal.write_text(journal.read_text().rstrip("\n"))
+
+    _learn(data_dir, "cow", "is_animal", 0.22)
+
+    kb = KnowledgeBase(data_dir)
+    assert kb.get_entity("cat").attributes["is_animal"] == 0.9
+    assert kb.get_entity("cow").attributes["is_animal"] == 0.22
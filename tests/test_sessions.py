@@ -0,0 +1,95 @@
+"""Serialized sessions must resume with the posterior they were saved with."""
+import numpy as np
+import pytest
+
+from twenty_questions.game_engine import GameConfig, GameEngine, GameState
+from twenty_questions.session_manager import SessionManager
+
+
+def _play(engine, entity_id, turns=5):
+    """Answer a few questions the way the given entity would."""
+    engine.start_game()
+    entity = engine.kb.entities[entity_id]
+    for _ in range(turns):
+        question = engine.get_next_question()
+        if question is None or engine.state != GameState.ASKING_QUESTIONS:
+            break
+        attr_id = question[0]
+        value = entity.attributes.get(attr_id, 0.5)
+        engine.process_answer(attr_id, 1.0 if value > 0.7 else 0.0 if value < 0.3 else 0.5)
+
+
+def _posterior(engine):
+    return engine.bt.as_vector(engine.beliefs).vector
+
+
+def _engine(data_dir, log_space):
+    config = GameConfig(log_space_beliefs=log_space, use_opening_book=False)
+    return GameEngine(data_dir, config)
+
+
+@pytest.mark.parametrize("log_space", [False, True])
+@pytest.mark.parametrize("include_posterior", [False, True])
+def test_restore_gives_identical_posterior(data_dir, log_space, include_posterior):
+    engine = _engine(data_dir, log_space)
+    _play(engine, "dog")
+    data = engine.serialize_session(include_posterior=include_posterior)
+    assert ("turns" in data) == include_posterior
+
+    restored = _engine(data_dir, log_space)
+    restored.restore_session(data)
+
+    assert restored.state == engine.state
+    assert restored.question_answers == engine.question_answers
+    assert dict(restored.known_answers.items()) == dict(engine.known_answers.items())
+    assert np.array_equal(_posterior(restored), _posterior(engine))
+    assert restored.get_next_question() == engine.get_next_question()
+
+
+@pytest.mark.parametrize("log_space", [False, True])
+def test_restore_after_kb_change_replays_answers(data_dir, log_space):
+    engine = _engine(data_dir, log_space)
+    _play(engine, "dog")
+    data = engine.serialize_session(include_posterior=True)
+    attr_id = engine.question_answers[0][0]
+
+    restored = _engine(data_dir, log_space)
+    restored.kb.set_attribute_value("dog", attr_id, 0.5)
+    restored.restore_session(data)
+
+    replayed = _engine(data_dir, log_space)
+    replayed.kb.set_attribute_value("dog", attr_id, 0.5)
+    replayed.start_game()
+    for answered_id, answer in engine.question_answers:
+        replayed.process_answer(answered_id, answer)
+
+    assert not np.array_equal(_posterior(restored), _posterior(engine))
+    assert np.array_equal(_posterior(restored), _posterior(replayed))
+
+
+def _guess_wrong(session, entity_id):
+    """Play a few questions, then reject the session's guess."""
+    _play(session, entity_id)
+    session.get_guess()
+    assert session.guessed_entity is not None
+
+
+def test_session_names_entity_learned_after_its_snapshot(data_dir):
+    manager = SessionManager(data_dir, GameConfig(use_opening_book=False))
+    try:
+        first = manager.create_session()
+        _guess_wrong(first, "dog")
+        first.process_guess_result(False, "Axolotl")
+        assert first.state == GameState.LEARNING_NEW
+        first.learn_new_entity("Axolotl")
+
+        second = manager.create_session()
+        _guess_wrong(second, "cat")
+        assert "axolotl" not in second.kb.entities
+        second.process_guess_result(False, "an axolotl")
+
+        assert second.state == GameState.GAME_OVER
+        names = [e.name for e in manager.kb.get_all_entities()]
+        assert names.count("Axolotl") == 1
+    finally:
+        manager.close()
@@ -0,0 +1,78 @@
+"""SQLite storage: databases written by older versions are upgraded in place."""
+import sqlite3
+
+from twenty_questions.sqlite_kb import SCHEMA_VERSION, SQLiteKnowledgeBase
+
+# The schema of version 1, before the answer counters were added
+_SCHEMA_V1 = """
+CREATE TABLE entities (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    popularity_rank INTEGER NOT NULL DEFAULT 500,
+    category TEXT NOT NULL DEFAULT 'unknown',
+    times_played INTEGER NOT NULL DEFAULT 0,
+    times_guessed_correctly INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE attributes (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT 'general',
+    alpha REAL NOT NULL DEFAULT 1.0,
+    beta REAL NOT NULL DEFAULT 1.0
+);
+CREATE TABLE entity_attributes (
+    entity_id TEXT NOT NULL REFERENCES entities(id) ON DELETE CASCADE,
+    attribute_id TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (entity_id, attribute_id)
+);
+PRAGMA user_version=1;
+"""
+
+
+def _create_v1_database(path):
+    conn = sqlite3.connect(str(path))
+    conn.executescript(_SCHEMA_V1)
+    with conn:
+        conn.executemany("INSERT INTO entities VALUES (?, ?, ?, ?, ?, ?)", [
+            ("dog", "Dog", 3, "animal", 12, 9),
+            ("rock", "Rock", 200, "object", 4, 1),
+        ])
+        conn.executemany("INSERT INTO attributes VALUES (?, ?, ?, ?, ?)", [
+            ("is_animal", "Is it an animal?", "classification", 2.0, 1.5),
+            ("is_alive", "Is it alive?", "classification", 1.0, 1.0),
+        ])
+        conn.executemany("INSERT INTO entity_attributes VALUES (?, ?, ?)", [
+            ("dog", "is_animal", 1.0),
+            ("dog", "is_alive", 1.0),
+            ("rock", "is_animal", 0.0),
+        ])
+    conn.close()
+
+
+def test_v1_database_is_migrated_with_its_counters(tmp_path):
+    db_path = tmp_path / "kb.sqlite3"
+    _create_v1_database(db_path)
+
+    kb = SQLiteKnowledgeBase(tmp_path, db_path=db_path)
+
+    assert kb.entity_ids == ["dog", "rock"]
+    assert (kb.entities["dog"].times_played, kb.entities["dog"].times_guessed_correctly) == (12, 9)
+    assert (kb.entities["rock"].times_played, kb.entities["rock"].times_guessed_correctly) == (4, 1)
+    assert kb.entities["dog"].attributes == {"is_animal": 1.0, "is_alive": 1.0}
+    assert (kb.attributes["is_animal"].alpha, kb.attributes["is_animal"].beta) == (2.0, 1.5)
+    assert kb.attributes["is_animal"].times_asked == 0
+
+    kb.record_play("dog", True)
+    kb.record_answer("is_animal", 0.5)
+    kb.save()
+    kb.close()
+
+    kb = SQLiteKnowledgeBase(tmp_path, db_path=db_path)
+    assert (kb.entities["dog"].times_played, kb.entities["dog"].times_guessed_correctly) == (13, 10)
+    assert (kb.attributes["is_animal"].times_asked, kb.attributes["is_animal"].times_maybe) == (1, 1)
+    kb.close()
+
+    conn = sqlite3.connect(str(db_path))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
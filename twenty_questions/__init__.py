@@ -5,21 +5,40 @@ A probabilistic animal guessing game using Bayesian inference,
 entropy-based question selection, and dynamic weight learning.
 """
 
-from .models import Entity, Attribute, BeliefState
-from .knowledge_base import KnowledgeBase
-from .belief_tracker import BeliefTracker
-from .question_selector import QuestionSelector
-from .weight_learner import WeightLearner
-from .game_engine import GameEngine
+import importlib
 
 __version__ = "1.0.0"
-__all__ = [
-    "Entity",
-    "Attribute",
-    "BeliefState",
-    "KnowledgeBase",
-    "BeliefTracker",
-    "QuestionSelector",
-    "WeightLearner",
-    "GameEngine",
-]
+
+# Public names -> defining submodule. Submodules (and NumPy with them) are
+# imported on first access, so launching the CLI does not pay for them
+# before it can print anything.
+_EXPORTS = {
+    "Entity": "models",
+    "Attribute": "models",
+    "BeliefState": "models",
+    "VectorBeliefState": "models",
+    "LogBeliefState": "models",
+    "ActiveBeliefState": "models",
+    "KnowledgeBase": "knowledge_base",
+    "SQLiteKnowledgeBase": "sqlite_kb",
+    "BeliefTracker": "belief_tracker",
+    "QuestionSelector": "question_selector",
+    "WeightLearner": "weight_learner",
+    "GameEngine": "game_engine",
+    "SessionManager": "session_manager",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
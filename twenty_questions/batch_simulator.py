@@ -0,0 +1,393 @@
+"""
+Batch Simulator for the 20 Questions game.
+
+Advances many simulated games in lockstep. The beliefs of every game in a
+batch live in one (games x entities) matrix, so each turn is a handful of
+large NumPy operations - batched information gains, masked tier selection,
+a factor gather for the answers and a row-wise normalization - instead of
+one Python-level game loop per target.
+
+Games follow exactly the same rules as Trainer._simulate_single_game and
+produce the same SimulationResult records.
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .models import Entity
+from .implications import KnownAnswers
+from .question_selector import (
+    QUESTION_HIERARCHY, FIXED_ORDER_TIERS,
+    TIER1_ANIMAL_QUESTIONS, TIER1_PLANT_QUESTIONS, TIER1_OBJECT_QUESTIONS,
+)
+from .trainer import SimulationResult
+
+
+class BatchSimulator:
+    """
+    Simulates batches of games for a Trainer in lockstep.
+    """
+
+    def __init__(self, trainer):
+        """
+        Initialize the batch simulator.
+
+        Args:
+            trainer: Trainer whose settings, belief tracker and question
+                     selector the simulated games use
+        """
+        if not trainer.bt.vectorized:
+            raise ValueError("batch simulation requires vectorized beliefs")
+
+        self.trainer = trainer
+        self.kb = trainer.kb
+        self.bt = trainer.bt
+        self.qs = trainer.qs
+        self.implication_engine = trainer.implication_engine
+
+        # Target answers per entity row, computed on first use
+        self._answer_rows: Dict[int, np.ndarray] = {}
+        self._answers_version = -1
+
+        # Implication rule masks mapped to matrix columns, per attribute layout
+        self._rule_layout = -1
+
+    def simulate(self, targets: Sequence[Entity]) -> List[SimulationResult]:
+        """
+        Simulate one game per target, all advanced together.
+
+        Args:
+            targets: Entities the simulated players are thinking of
+
+        Returns:
+            One result per target, in target order
+        """
+        targets = list(targets)
+        if not targets:
+            return []
+
+        trainer = self.trainer
+        num_games = len(targets)
+        num_attributes = len(self.kb.attribute_ids)
+
+        # Every game starts from the same prior, so the first guess check
+        # and entropy are computed once, exactly as a single game would
+        if trainer.use_popularity_prior:
+            prior = trainer._initialize_with_popularity_prior()
+        else:
+            prior = self.bt.initialize_beliefs()
+        initial_entropy = self.bt.get_entropy(prior)
+        guess_at_start = self.qs.should_guess(
+            prior, trainer.guess_threshold, trainer.guess_margin
+        )
+
+        beliefs = np.tile(self.bt.as_vector(prior).vector, (num_games, 1))
+        entropies = np.full(num_games, initial_entropy)
+        target_rows = np.array([self.kb.get_entity_index(t.id) for t in targets])
+        answers = self._get_answer_table(target_rows)
+
+        asked = np.zeros((num_games, num_attributes), dtype=bool)
+        known = [KnownAnswers(self.implication_engine) for _ in targets]
+        questions: List[List[str]] = [[] for _ in targets]
+        progressions: List[List[float]] = [[initial_entropy] for _ in targets]
+
+        active = np.arange(num_games)
+        for turn in range(trainer.max_questions):
+            # Games confident enough to guess stop here
+            if turn == 0:
+                guessing = np.full(len(active), guess_at_start)
+            else:
+                guessing = self._should_guess(beliefs[active], entropies[active])
+            active = active[~guessing]
+            if len(active) == 0:
+                break
+
+            # Games that run out of questions stop as well
+            chosen = self._select_questions(
+                beliefs[active], entropies[active], asked[active],
+                [known[g] for g in active]
+            )
+            has_question = chosen >= 0
+            active, chosen = active[has_question], chosen[has_question]
+            if len(active) == 0:
+                break
+
+            turn_answers = answers[active, chosen]
+            asked[active, chosen] = True
+            for game, col, answer in zip(active, chosen, turn_answers):
+                question_id = self.kb.attribute_ids[col]
+                known[game].add_answer(question_id, float(answer))
+                questions[game].append(question_id)
+
+            self._update_beliefs(beliefs, active, chosen, turn_answers)
+            entropies[active] = self._get_entropies(beliefs[active])
+            for game, entropy in zip(active, entropies[active]):
+                progressions[game].append(float(entropy))
+
+        return self._build_results(targets, target_rows, beliefs, questions, progressions)
+
+    def _get_answer_table(self, target_rows: np.ndarray) -> np.ndarray:
+        """
+        Get every target's answer to every question.
+
+        Returns:
+            Array of shape (games, attributes) with 1.0/0.0/0.5 answers
+        """
+        if self._answers_version != self.kb.version:
+            self._answer_rows.clear()
+            self._answers_version = self.kb.version
+
+        table = np.empty((len(target_rows), len(self.kb.attribute_ids)))
+        for game, row in enumerate(target_rows):
+            answer_row = self._answer_rows.get(row)
+            if answer_row is None:
+                answer_row = self._compute_answer_row(row)
+                self._answer_rows[row] = answer_row
+            table[game] = answer_row
+        return table
+
+    def _compute_answer_row(self, row: int) -> np.ndarray:
+        """
+        Compute one entity's answers, as Trainer.get_target_answer would.
+
+        Most answers are the thresholded matrix row; only attributes that
+        some implication rule can determine need the rule lookups.
+        """
+        probabilities = self.kb.matrix[row]
+        answer_row = np.where(
+            probabilities >= 0.8, 1.0, np.where(probabilities <= 0.2, 0.0, 0.5)
+        )
+
+        engine = self.implication_engine
+        target = self.kb.get_entity(self.kb.entity_ids[row])
+        known_attrs = {k: v for k, v in target.attributes.items() if v >= 0.8 or v <= 0.2}
+        all_determined = engine.get_all_determined_attributes(known_attrs)
+
+        for attr_id in engine.implied_by:
+            col = self.kb.get_attribute_index(attr_id)
+            if col is None:
+                continue
+            is_det, implied_val = engine.is_already_determined(attr_id, known_attrs)
+            if is_det:
+                answer_row[col] = implied_val
+            elif attr_id in all_determined:
+                implied_val = all_determined[attr_id]
+                if implied_val >= 0.8:
+                    answer_row[col] = 1.0
+                elif implied_val <= 0.2:
+                    answer_row[col] = 0.0
+        return answer_row
+
+    def _should_guess(self, beliefs: np.ndarray, entropies: np.ndarray) -> np.ndarray:
+        """
+        Vectorized QuestionSelector.should_guess for games with no questions counted.
+
+        Returns:
+            Boolean array, True for games that should guess now
+        """
+        num_entities = beliefs.shape[1]
+        if num_entities < 3:
+            return np.array([
+                self.qs.should_guess(
+                    self.bt.beliefs_from_vector(vector),
+                    self.trainer.guess_threshold, self.trainer.guess_margin
+                )
+                for vector in beliefs
+            ], dtype=bool)
+
+        top3 = -np.sort(-np.partition(beliefs, num_entities - 3, axis=1)[:, -3:], axis=1)
+        top, second, third = top3[:, 0], top3[:, 1], top3[:, 2]
+        norm_entropy = entropies / np.log2(num_entities)
+
+        threshold = self.trainer.guess_threshold
+        margin = self.trainer.guess_margin
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dominance = (top > 0.1) & (second > 0) & (top / second >= 3.0)
+        return (
+            ((top >= threshold) & (top - second >= margin))
+            | (norm_entropy < 0.15)
+            | dominance
+            | ((top > 0.15) & (top - second >= 0.08) & (top - third >= 0.12))
+        )
+
+    def _select_questions(
+        self,
+        beliefs: np.ndarray,
+        entropies: np.ndarray,
+        asked: np.ndarray,
+        known: List[KnownAnswers]
+    ) -> np.ndarray:
+        """
+        Vectorized QuestionSelector.select_best_question for a batch of games.
+
+        Returns:
+            Chosen attribute column per game, or -1 where no question qualifies
+        """
+        gains = self.qs.score_belief_matrix(beliefs, entropies)
+        valid = ~asked & ~self._determined_columns(known) & (gains >= self.qs.min_info_gain)
+
+        chosen = np.full(len(beliefs), -1)
+        for tier in sorted(QUESTION_HIERARCHY.keys()):
+            pending = chosen < 0
+            if not pending.any():
+                break
+
+            if tier == 1:
+                # Group games by the category-specific question list they get
+                groups: Dict[tuple, List[int]] = {}
+                for game in np.flatnonzero(pending):
+                    tier_attrs = tuple(self.qs._get_tier1_questions(known[game]))
+                    groups.setdefault(tier_attrs, []).append(game)
+                for tier_attrs, games in groups.items():
+                    self._choose_in_tier(
+                        chosen, np.array(games), self._tier_columns(tier_attrs),
+                        valid, gains, tier in FIXED_ORDER_TIERS
+                    )
+                continue
+
+            self._choose_in_tier(
+                chosen, np.flatnonzero(pending), self._tier_columns(self._tier_attrs(tier)),
+                valid, gains, tier in FIXED_ORDER_TIERS
+            )
+        return chosen
+
+    def _choose_in_tier(
+        self,
+        chosen: np.ndarray,
+        games: np.ndarray,
+        columns: np.ndarray,
+        valid: np.ndarray,
+        gains: np.ndarray,
+        fixed_order: bool
+    ) -> None:
+        """Pick a question from one tier for the given games, where one qualifies."""
+        if len(games) == 0 or len(columns) == 0:
+            return
+        tier_valid = valid[np.ix_(games, columns)]
+        if fixed_order:
+            best = tier_valid.argmax(axis=1)
+        else:
+            tier_gains = np.where(tier_valid, gains[np.ix_(games, columns)], -np.inf)
+            best = tier_gains.argmax(axis=1)
+        found = tier_valid.any(axis=1)
+        chosen[games[found]] = columns[best[found]]
+
+    def _tier_attrs(self, tier: int) -> List[str]:
+        """Get a tier's attribute list (tier 1 is context-aware and handled separately)."""
+        tier_attrs = QUESTION_HIERARCHY[tier]
+        if tier_attrs is not None:
+            return tier_attrs
+        all_tier_attrs = set(TIER1_ANIMAL_QUESTIONS + TIER1_PLANT_QUESTIONS + TIER1_OBJECT_QUESTIONS)
+        all_tier_attrs.update(QUESTION_HIERARCHY.get(0, []) or [])
+        all_tier_attrs.update(QUESTION_HIERARCHY.get(2, []) or [])
+        return [a for a in self.kb.attribute_ids if a not in all_tier_attrs]
+
+    def _tier_columns(self, tier_attrs: Sequence[str]) -> np.ndarray:
+        """Map a tier's attributes to matrix columns, skipping ones not in the KB."""
+        columns = [self.kb.get_attribute_index(a) for a in tier_attrs]
+        return np.array([c for c in columns if c is not None], dtype=np.intp)
+
+    def _determined_columns(self, known: List[KnownAnswers]) -> np.ndarray:
+        """
+        Find the attributes determined by implications for every game at once.
+
+        Returns:
+            Boolean array of shape (games, attributes)
+        """
+        if self._rule_layout != len(self.kb.attribute_ids):
+            self._compile_rule_columns()
+
+        # Boolean matmul has no BLAS path, so count matching rules in float32
+        known_yes = np.array([k.known_yes for k in known], dtype=np.float32)
+        known_no = np.array([k.known_no for k in known], dtype=np.float32)
+        determined = (known_yes @ self._yes_rules + known_no @ self._no_rules) > 0
+
+        result = np.zeros((len(known), len(self.kb.attribute_ids)), dtype=bool)
+        result[:, self._rule_columns] = determined
+        return result
+
+    def _compile_rule_columns(self) -> None:
+        """Restrict the implication rule masks to attributes with a matrix column."""
+        engine = self.implication_engine
+        rule_idx, columns = [], []
+        for idx, attr_id in enumerate(engine.attribute_ids):
+            col = self.kb.get_attribute_index(attr_id)
+            if col is not None:
+                rule_idx.append(idx)
+                columns.append(col)
+
+        self._yes_rules = engine.yes_rules[rule_idx].T.astype(np.float32)
+        self._no_rules = engine.no_rules[rule_idx].T.astype(np.float32)
+        self._rule_columns = np.array(columns, dtype=np.intp)
+        self._rule_layout = len(self.kb.attribute_ids)
+
+    def _update_beliefs(
+        self,
+        beliefs: np.ndarray,
+        games: np.ndarray,
+        columns: np.ndarray,
+        answers: np.ndarray
+    ) -> None:
+        """
+        Apply one answer per game in place using the fused answer factors.
+
+        Every row is renormalized, including rows answered "maybe", exactly
+        as the single-game update does.
+        """
+        posterior = beliefs[games]
+        n = beliefs.shape[1]
+        for answer in (1.0, 0.0):
+            selected = answers > 0.7 if answer == 1.0 else answers < 0.3
+            if selected.any():
+                factors, _ = self.bt.get_answer_factors(answer)
+                posterior[selected] *= factors[:n, columns[selected]].T
+
+        totals = posterior.sum(axis=1)
+        positive = totals > 0
+        posterior[positive] /= totals[positive, np.newaxis]
+        beliefs[games] = posterior
+
+    def _get_entropies(self, beliefs: np.ndarray) -> np.ndarray:
+        """Shannon entropy in bits of each belief row."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(beliefs > 0, beliefs * np.log2(beliefs), 0.0)
+        return -terms.sum(axis=1)
+
+    def _build_results(
+        self,
+        targets: List[Entity],
+        target_rows: np.ndarray,
+        beliefs: np.ndarray,
+        questions: List[List[str]],
+        progressions: List[List[float]]
+    ) -> List[SimulationResult]:
+        """Turn the final belief matrix into per-game results."""
+        games = np.arange(len(targets))
+        top_rows = beliefs.argmax(axis=1)
+        target_probs = beliefs[games, target_rows]
+
+        # Rank as in a stable descending sort: ties go to the lower row
+        higher = (beliefs > target_probs[:, np.newaxis]).sum(axis=1)
+        tied_before = (
+            (beliefs == target_probs[:, np.newaxis])
+            & (np.arange(beliefs.shape[1]) < target_rows[:, np.newaxis])
+        ).sum(axis=1)
+        ranks = 1 + higher + tied_before
+
+        results = []
+        for game, target in enumerate(targets):
+            guessed_id = self.kb.entity_ids[top_rows[game]]
+            results.append(SimulationResult(
+                target_entity_id=target.id,
+                target_entity_name=target.name,
+                guessed_correctly=guessed_id == target.id,
+                num_questions=len(questions[game]),
+                final_rank=int(ranks[game]),
+                final_probability=float(target_probs[game]),
+                questions_asked=questions[game],
+                entropy_progression=progressions[game],
+                guessed_entity_id=guessed_id,
+            ))
+        return results
+
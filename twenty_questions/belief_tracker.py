@@ -5,8 +5,8 @@ Implements Bayesian belief updates based on user answers.
 """
 
 import numpy as np
-from typing import Optional, List, Tuple
-from .models import BeliefState
+from typing import Dict, Optional, List, Tuple
+from .models import BeliefState, VectorBeliefState, LogBeliefState, ActiveBeliefState
 from .knowledge_base import KnowledgeBase
 from .implications import ImplicationEngine
 
@@ -17,13 +17,37 @@ class BeliefTracker:
 
     After each answer, updates the probability distribution over entities
     using Bayes' theorem: P(entity|answer) ∝ P(answer|entity) * P(entity)
+
+    In vectorized mode (the default) beliefs are VectorBeliefState objects
+    aligned to the knowledge base matrix, and an answer together with all
+    of its implications is applied as a single column gather, product and
+    normalization. Dict-based BeliefState inputs are converted on the fly.
+    With log_space enabled, beliefs are LogBeliefState objects that
+    accumulate log-likelihoods and only normalize when probabilities are read.
+
+    With prune_epsilon set, vectorized beliefs become ActiveBeliefState
+    objects: entities below prune_epsilon times the top probability are
+    dropped from the active set, so updates and question scoring only touch
+    the candidates still in play. Each update also tracks an upper bound on
+    the pruned entities' probabilities; when an answer contradicts the
+    survivors enough that a pruned entity could be back within
+    REINSTATE_FACTOR * prune_epsilon of the top, the full distribution is
+    recomputed from the last checkpoint and the active set chosen again.
     """
 
+    # How far past the pruning cutoff a pruned entity may (by the bound) rise
+    # before the full distribution is recomputed
+    REINSTATE_FACTOR = 10.0
+
     def __init__(
         self,
         knowledge_base: KnowledgeBase,
         unknown_likelihood: float = 0.5,
-        smoothing: float = 0.01
+        smoothing: float = 0.01,
+        vectorized: bool = True,
+        log_space: bool = False,
+        implication_engine: Optional[ImplicationEngine] = None,
+        prune_epsilon: float = 0.0
     ):
         """
         Initialize the belief tracker.
@@ -32,17 +56,88 @@ class BeliefTracker:
             knowledge_base: The knowledge base to use
             unknown_likelihood: Likelihood to use for "don't know" answers
             smoothing: Small value to prevent zero probabilities
+            vectorized: Use array-backed beliefs instead of per-entity dicts
+            log_space: Keep array-backed beliefs as log-probabilities
+            implication_engine: Implication engine to share (a new one if None)
+            prune_epsilon: Prune entities below this fraction of the top
+                           probability (0 keeps every entity)
         """
+        if log_space and not vectorized:
+            raise ValueError("log_space requires vectorized beliefs")
+        if prune_epsilon > 0 and (log_space or not vectorized):
+            raise ValueError("prune_epsilon requires vectorized beliefs without log_space")
+
         self.kb = knowledge_base
         self.unknown_likelihood = unknown_likelihood
         self.smoothing = smoothing
-        self.implication_engine = ImplicationEngine()
+        self.vectorized = vectorized
+        self.log_space = log_space
+        self.prune_epsilon = prune_epsilon
+        if implication_engine is None:
+            implication_engine = ImplicationEngine()
+        self.implication_engine = implication_engine
+
+        # (attribute_id, answer_key) -> (columns, offsets, signs) for fused updates
+        self._evidence_plans: Dict[Tuple[str, float], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._plan_layout = -1
+
+        # answer_key -> (factors, factors * ln(factors)) for every attribute
+        self._answer_factors: Dict[float, Tuple[np.ndarray, np.ndarray]] = {}
+        self._factors_version = -1
 
     def initialize_beliefs(self) -> BeliefState:
         """Create uniform prior distribution over all entities."""
+        if self.log_space:
+            log_weights = np.zeros(len(self.kb.entity_ids))
+            return LogBeliefState(log_weights, self.kb.entity_ids, self.kb.entity_index)
+        if self.vectorized:
+            n = len(self.kb.entity_ids)
+            vector = np.full(n, 1.0 / n) if n else np.zeros(0)
+            return VectorBeliefState(vector, self.kb.entity_ids, self.kb.entity_index)
         entity_ids = self.kb.get_all_entity_ids()
         return BeliefState.uniform(entity_ids)
 
+    def as_vector(self, beliefs: BeliefState) -> VectorBeliefState:
+        """
+        Get an array-backed view of a belief state.
+
+        Entities missing from a dict-based state get zero probability.
+
+        Args:
+            beliefs: Any belief state
+
+        Returns:
+            The same state if already array-backed, otherwise a converted copy
+        """
+        if isinstance(beliefs, VectorBeliefState):
+            return beliefs
+        vector = np.zeros(len(self.kb.entity_ids))
+        for entity_id, prob in beliefs.probabilities.items():
+            row = self.kb.get_entity_index(entity_id)
+            if row is not None:
+                vector[row] = prob
+        return VectorBeliefState(vector, self.kb.entity_ids, self.kb.entity_index)
+
+    def beliefs_from_vector(self, vector: np.ndarray) -> BeliefState:
+        """
+        Wrap a probability vector aligned to KB rows in this tracker's representation.
+
+        Args:
+            vector: Probability per entity row (copied)
+
+        Returns:
+            A LogBeliefState, VectorBeliefState or dict-based BeliefState
+        """
+        if self.log_space:
+            with np.errstate(divide="ignore"):
+                log_weights = np.log(vector)
+            return LogBeliefState(log_weights, self.kb.entity_ids, self.kb.entity_index)
+        if self.prune_epsilon > 0:
+            return self._activate(vector.copy())
+        if self.vectorized:
+            return VectorBeliefState(vector.copy(), self.kb.entity_ids, self.kb.entity_index)
+        return BeliefState(probabilities=dict(zip(self.kb.entity_ids, vector.tolist())))
+
     def update_beliefs(
         self,
         beliefs: BeliefState,
@@ -64,6 +159,9 @@ class BeliefTracker:
         Returns:
             Updated belief state
         """
+        if self.vectorized:
+            return self._apply_fused_update(self.as_vector(beliefs), attribute_id, answer)
+
         # First, apply the direct update for the answered attribute
         result = self._apply_single_update(beliefs, attribute_id, answer)
 
@@ -74,6 +172,228 @@ class BeliefTracker:
 
         return result
 
+    def _get_evidence_plan(
+        self,
+        attribute_id: str,
+        answer: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the matrix columns touched by an answer and its implications.
+
+        Each piece of evidence contributes a likelihood of the form
+        offset + sign * P(yes|entity): (0, +1) for yes and (1, -1) for no.
+        "Maybe" answers and attributes without a matrix column have the same
+        likelihood for every entity, so they are left out of the plan.
+
+        Returns:
+            (columns, offsets, signs) arrays of equal length
+        """
+        layout = len(self.kb.attribute_ids)
+        if layout != self._plan_layout:
+            self._evidence_plans.clear()
+            self._plan_layout = layout
+
+        answer_key = 1.0 if answer > 0.7 else 0.0 if answer < 0.3 else 0.5
+        key = (attribute_id, answer_key)
+        plan = self._evidence_plans.get(key)
+        if plan is not None:
+            return plan
+
+        evidence = [(attribute_id, answer)]
+        evidence.extend(self.implication_engine.get_implications(attribute_id, answer))
+
+        columns, offsets, signs = [], [], []
+        for attr_id, value in evidence:
+            col = self.kb.get_attribute_index(attr_id)
+            if col is None or 0.3 <= value <= 0.7:
+                continue
+            is_yes = value > 0.7
+            columns.append(col)
+            offsets.append(0.0 if is_yes else 1.0)
+            signs.append(1.0 if is_yes else -1.0)
+
+        plan = (
+            np.array(columns, dtype=np.intp),
+            np.array(offsets),
+            np.array(signs),
+        )
+        self._evidence_plans[key] = plan
+        return plan
+
+    def _apply_fused_update(
+        self,
+        beliefs: VectorBeliefState,
+        attribute_id: str,
+        answer: float
+    ) -> VectorBeliefState:
+        """
+        Apply an answer and all of its implications in one vectorized step.
+
+        Equivalent to chaining _apply_single_update over the answer and its
+        implications: normalizing between steps only rescales, so the
+        smoothed likelihoods are multiplied first and normalized once.
+
+        Args:
+            beliefs: Current array-backed belief state
+            attribute_id: The attribute that was answered
+            answer: The answer value (1.0=yes, 0.0=no, 0.5=unknown)
+
+        Returns:
+            Updated belief state
+        """
+        if self.prune_epsilon > 0:
+            return self._apply_active_update(beliefs, attribute_id, answer)
+
+        columns, offsets, signs = self._get_evidence_plan(attribute_id, answer)
+
+        if self.log_space:
+            if isinstance(beliefs, LogBeliefState):
+                log_prior = beliefs.log_weights
+            else:
+                with np.errstate(divide="ignore"):
+                    log_prior = np.log(beliefs.vector)
+            if len(columns) == 0:
+                return LogBeliefState(log_prior.copy(), beliefs.entity_ids, beliefs.entity_index)
+            p_yes = self.kb.matrix[:len(log_prior), columns]
+            likelihoods = offsets + signs * p_yes + self.smoothing
+            with np.errstate(divide="ignore"):
+                log_posterior = log_prior + np.log(likelihoods).sum(axis=1)
+            return LogBeliefState(log_posterior, beliefs.entity_ids, beliefs.entity_index)
+
+        prior = beliefs.vector
+        if len(columns) == 0:
+            posterior = prior.copy()
+        else:
+            p_yes = self.kb.matrix[:len(prior), columns]
+            likelihoods = offsets + signs * p_yes + self.smoothing
+            posterior = prior * likelihoods.prod(axis=1)
+
+        result = VectorBeliefState(posterior, beliefs.entity_ids, beliefs.entity_index)
+        result.normalize()
+        return result
+
+    def _apply_active_update(
+        self,
+        beliefs: VectorBeliefState,
+        attribute_id: str,
+        answer: float
+    ) -> ActiveBeliefState:
+        """
+        Apply an answer to the active rows only, pruning and reinstating as needed.
+
+        Every likelihood product is at most (1 + smoothing) per column, which
+        bounds how much a pruned entity can gain on the survivors; if the
+        bound no longer keeps it clear of the top, the answer is taken to
+        contradict the survivors and the full distribution is recomputed.
+
+        Args:
+            beliefs: Current array-backed belief state
+            attribute_id: The attribute that was answered
+            answer: The answer value (1.0=yes, 0.0=no, 0.5=unknown)
+
+        Returns:
+            Updated belief state
+        """
+        if not isinstance(beliefs, ActiveBeliefState):
+            beliefs = self._activate(beliefs.vector)
+
+        columns, offsets, signs = self._get_evidence_plan(attribute_id, answer)
+        if len(columns) == 0:
+            return beliefs.copy()
+
+        deferred = beliefs.deferred + ((attribute_id, answer),)
+        p_yes = self.kb.matrix[np.ix_(beliefs.active, columns)]
+        likelihoods = offsets + signs * p_yes + self.smoothing
+        weights = beliefs.values * likelihoods.prod(axis=1)
+        total = weights.sum()
+
+        if total > 0:
+            values = weights / total
+            bound = beliefs.bound * (1.0 + self.smoothing) ** len(columns) / total
+            cutoff = self.prune_epsilon * values.max()
+            if bound <= cutoff * self.REINSTATE_FACTOR:
+                keep = values >= cutoff
+                if keep.all():
+                    active = beliefs.active
+                else:
+                    bound = max(bound, float(values[~keep].max()))
+                    active = beliefs.active[keep]
+                    values = values[keep]
+                    kept = values.sum()
+                    values = values / kept
+                    bound /= kept
+                return ActiveBeliefState(
+                    values, active, beliefs.size, beliefs.entity_ids, beliefs.entity_index,
+                    beliefs.checkpoint, deferred, bound
+                )
+
+        return self._activate(self._replay(beliefs.checkpoint, deferred))
+
+    def _replay(self, checkpoint: np.ndarray, deferred: tuple) -> np.ndarray:
+        """Apply deferred answers to every row of a checkpoint distribution."""
+        posterior = checkpoint
+        for attribute_id, answer in deferred:
+            columns, offsets, signs = self._get_evidence_plan(attribute_id, answer)
+            p_yes = self.kb.matrix[:len(posterior), columns]
+            likelihoods = offsets + signs * p_yes + self.smoothing
+            posterior = posterior * likelihoods.prod(axis=1)
+            posterior = posterior / posterior.sum()
+        return posterior
+
+    def _activate(self, vector: np.ndarray) -> ActiveBeliefState:
+        """Choose the active set of a full distribution, which becomes the checkpoint."""
+        size = len(vector)
+        if size == 0 or vector.max() <= 0:
+            return ActiveBeliefState(
+                vector, np.arange(size), size, self.kb.entity_ids, self.kb.entity_index, vector
+            )
+        keep = vector >= self.prune_epsilon * vector.max()
+        active = np.flatnonzero(keep)
+        values = vector[active]
+        kept = values.sum()
+        bound = float(vector[~keep].max()) / kept if not keep.all() else 0.0
+        return ActiveBeliefState(
+            values / kept, active, size, self.kb.entity_ids, self.kb.entity_index,
+            vector, (), bound
+        )
+
+    def get_answer_factors(self, answer: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get fused update factors for answering every attribute the same way.
+
+        Column j holds the product of smoothed likelihoods that
+        update_beliefs() would apply for (attribute j, answer), including
+        implications. Cached until the knowledge base changes.
+
+        Args:
+            answer: The hypothetical answer (1.0=yes, 0.0=no)
+
+        Returns:
+            (factors, factors * ln(factors)), both of shape (entities, attributes)
+        """
+        if self._factors_version != self.kb.version:
+            self._answer_factors.clear()
+            self._factors_version = self.kb.version
+
+        answer_key = 1.0 if answer > 0.7 else 0.0 if answer < 0.3 else 0.5
+        cached = self._answer_factors.get(answer_key)
+        if cached is not None:
+            return cached
+
+        matrix = self.kb.matrix
+        factors = np.ones_like(matrix)
+        for col, attr_id in enumerate(self.kb.attribute_ids):
+            columns, offsets, signs = self._get_evidence_plan(attr_id, answer_key)
+            if len(columns):
+                likelihoods = offsets + signs * matrix[:, columns] + self.smoothing
+                factors[:, col] = likelihoods.prod(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weighted_log = np.where(factors > 0, factors * np.log(factors), 0.0)
+        cached = (factors, weighted_log)
+        self._answer_factors[answer_key] = cached
+        return cached
+
     def _apply_single_update(
         self,
         beliefs: BeliefState,
@@ -151,6 +471,13 @@ class BeliefTracker:
         Returns:
             Entropy value (0 = completely certain, log2(n) = completely uncertain)
         """
+        if isinstance(beliefs, ActiveBeliefState):
+            probs = beliefs.values[beliefs.values > 0]
+            return float(-(probs * np.log2(probs)).sum())
+        if isinstance(beliefs, VectorBeliefState):
+            probs = beliefs.vector[beliefs.vector > 0]
+            return float(-(probs * np.log2(probs)).sum())
+
         entropy = 0.0
         for prob in beliefs.probabilities.values():
             if prob > 0:
@@ -203,6 +530,9 @@ class BeliefTracker:
         Returns:
             Simulated belief state
         """
+        if self.vectorized:
+            # Fused updates never modify their input, so no copy is needed
+            return self.update_beliefs(beliefs, attribute_id, answer)
         return self.update_beliefs(beliefs.copy(), attribute_id, answer)
 
     def get_answer_probability(
@@ -222,6 +552,17 @@ class BeliefTracker:
         Returns:
             Estimated probability of "yes" answer
         """
+        if isinstance(beliefs, ActiveBeliefState):
+            column = self.kb.get_attribute_column(attribute_id)
+            if column is None:
+                return 0.5 * float(beliefs.values.sum())
+            return float(beliefs.values @ column[beliefs.active])
+        if isinstance(beliefs, VectorBeliefState):
+            column = self.kb.get_attribute_column(attribute_id)
+            if column is None:
+                return 0.5 * float(beliefs.vector.sum())
+            return float(beliefs.vector @ column[:len(beliefs.vector)])
+
         p_yes = 0.0
         for entity_id, prob in beliefs.probabilities.items():
             entity = self.kb.get_entity(entity_id)
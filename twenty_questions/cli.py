@@ -7,8 +7,13 @@ Provides an interactive terminal experience with rich feedback.
 
 import os
 import sys
-from typing import Optional
-from .game_engine import GameEngine, GameConfig, GameState
+import threading
+from typing import TYPE_CHECKING, Optional
+
+# The game engine pulls in NumPy and the knowledge base; it is imported on
+# the loader thread so the header appears immediately
+if TYPE_CHECKING:
+    from .game_engine import GameEngine
 
 
 def clear_screen():
@@ -74,17 +79,70 @@ def get_yes_no_maybe(prompt: str) -> float:
             print("  Please answer 'yes', 'no', or 'maybe'.")
 
 
-def play_game(engine: GameEngine, show_debug: bool = False) -> bool:
+def print_intro():
+    """Print the game instructions and wait for the player."""
+    print("\n  Think of something - Animal, Vegetable, or Mineral!")
+    print("  Answer my questions with 'yes', 'no', or 'maybe'.")
+    input("\n  Press Enter when you're ready...")
+
+
+class EngineLoader:
+    """
+    Creates and warms up the game engine on a background thread.
+
+    The knowledge base and its indexes load while the player reads the
+    instructions; result() waits for them.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, **config_options):
+        """
+        Args:
+            data_dir: Directory for data files (defaults to the package data)
+            **config_options: GameConfig fields
+        """
+        self._engine: Optional["GameEngine"] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._load, args=(data_dir, config_options), name="engine-loader", daemon=True
+        )
+        self._thread.start()
+
+    def _load(self, data_dir: Optional[str], config_options: dict) -> None:
+        try:
+            from .game_engine import GameEngine, GameConfig
+
+            engine = GameEngine(data_dir, config=GameConfig(**config_options))
+            engine.warm_up()
+            self._engine = engine
+        except BaseException as e:
+            self._error = e
+
+    def result(self) -> "GameEngine":
+        """Wait for the engine; re-raises any error from loading it."""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._engine
+
+
+def play_game(engine: "GameEngine", show_debug: bool = False, show_intro: bool = True) -> bool:
     """Play a single game.
 
+    Args:
+        engine: The game engine
+        show_debug: Show entropy and top guesses after each question
+        show_intro: Print the instructions first (main() shows them itself
+                    for the first game, while the engine loads)
+
     Returns:
         True if the system guessed correctly, False otherwise.
     """
+    from .game_engine import GameState
+
     engine.start_game()
 
-    print("\n  Think of something - Animal, Vegetable, or Mineral!")
-    print("  Answer my questions with 'yes', 'no', or 'maybe'.")
-    input("\n  Press Enter when you're ready...")
+    if show_intro:
+        print_intro()
 
     while engine.state == GameState.ASKING_QUESTIONS:
         # Get current state
@@ -149,8 +207,10 @@ def play_game(engine: GameEngine, show_debug: bool = False) -> bool:
         return False
 
 
-def handle_wrong_guess(engine: GameEngine):
+def handle_wrong_guess(engine: "GameEngine"):
     """Handle a wrong guess by learning from the user."""
+    from .game_engine import GameState
+
     print("\n  What were you thinking of?")
     actual_name = input("  Your answer: ").strip()
 
@@ -198,7 +258,7 @@ def handle_wrong_guess(engine: GameEngine):
         print(f"\n  Thanks! I've adjusted my knowledge about {actual_name}.")
 
 
-def show_stats(engine: GameEngine):
+def show_stats(engine: "GameEngine"):
     """Show global game statistics."""
     stats = engine.get_stats()
 
@@ -218,47 +278,57 @@ def main():
     """Main entry point for the CLI."""
     # Parse simple command line args
     show_debug = '--debug' in sys.argv or '-d' in sys.argv
-
-    # Create game engine
-    config = GameConfig(show_debug=show_debug)
-    engine = GameEngine(config=config)
+    storage_backend = "sqlite" if '--sqlite' in sys.argv else "json"
+    write_behind_saves = '--write-behind' in sys.argv
 
     clear_screen()
     print_header()
 
+    # Load the game engine while the player reads the instructions
+    loader = EngineLoader(
+        show_debug=show_debug,
+        write_behind_saves=write_behind_saves,
+        storage_backend=storage_backend
+    )
+    print_intro()
+    engine = loader.result()
+
     wins = 0
     games = 0
 
-    while True:
-        was_correct = play_game(engine, show_debug=show_debug)
-
-        # Track score
-        games += 1
-        if was_correct:
-            wins += 1
-
-        print(f"\n  Games played this session: {games} (Wins: {wins})")
-
-        # Show stats option
-        print("\n  Options:")
-        print("    [P]lay again")
-        print("    [S]how statistics")
-        print("    [Q]uit")
-
-        choice = input("\n  Your choice: ").strip().lower()
-
-        if choice in ('q', 'quit', 'exit'):
-            break
-        elif choice in ('s', 'stats', 'statistics'):
-            show_stats(engine)
-            input("\n  Press Enter to continue...")
-        elif choice in ('p', 'play', 'again', ''):
-            clear_screen()
-            print_header()
-            continue
-        else:
-            clear_screen()
-            print_header()
+    try:
+        while True:
+            was_correct = play_game(engine, show_debug=show_debug, show_intro=games > 0)
+
+            # Track score
+            games += 1
+            if was_correct:
+                wins += 1
+
+            print(f"\n  Games played this session: {games} (Wins: {wins})")
+
+            # Show stats option
+            print("\n  Options:")
+            print("    [P]lay again")
+            print("    [S]how statistics")
+            print("    [Q]uit")
+
+            choice = input("\n  Your choice: ").strip().lower()
+
+            if choice in ('q', 'quit', 'exit'):
+                break
+            elif choice in ('s', 'stats', 'statistics'):
+                show_stats(engine)
+                input("\n  Press Enter to continue...")
+            elif choice in ('p', 'play', 'again', ''):
+                clear_screen()
+                print_header()
+                continue
+            else:
+                clear_screen()
+                print_header()
+    finally:
+        engine.close()
 
     print("\n  Thanks for playing Twenty Questions!")
     print("  Your knowledge helps me learn and improve.")
@@ -0,0 +1,299 @@
+"""
+Compiled binary knowledge base for the 20 Questions game.
+
+entities.json and attributes.json are compiled into a single file that
+KnowledgeBase can open without parsing the catalog:
+
+    magic "TQKB" | format version (uint32) | header length (uint64)
+    header: UTF-8 JSON with the entity table (ids, names, ranks, counters),
+            the attribute table, the matrix column order and the source
+            file stamps used for staleness checks
+    padding to an 8-byte boundary
+    matrix: float64 P(yes|entity, attr), entities x attributes, row-major
+    mask:   uint8 1 where the entity sets the attribute explicitly
+
+The matrix and mask are memory-mapped copy-on-write, so opening is
+near-instant, pages are shared between processes, and in-process weight
+updates never touch the file. When either source JSON file changed since
+compilation the file is ignored and KnowledgeBase falls back to JSON.
+
+Usage: python -m twenty_questions.compiled_kb [--data-dir DIR]
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .models import Entity, Attribute
+from .knowledge_base import DEFAULT_PROBABILITY
+
+
+# File name of the compiled knowledge base inside the data directory
+COMPILED_FILENAME = "compiled_kb.bin"
+
+MAGIC = b"TQKB"
+COMPILED_FORMAT_VERSION = 1
+
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<4sIQ")
+_ALIGNMENT = 8
+
+
+def source_stamp(path: Path) -> Optional[List[int]]:
+    """Get the (size, mtime in ns) stamp of a source file, or None if missing."""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def compiled_sources(data_dir) -> Dict[str, Path]:
+    """Get the {name: path} of the JSON sources a compiled file depends on."""
+    data_dir = Path(data_dir)
+    return {
+        "entities.json": data_dir / "entities.json",
+        "attributes.json": data_dir / "attributes.json",
+    }
+
+
+class CompiledKnowledgeBase:
+    """
+    A memory-mapped compiled knowledge base.
+    """
+
+    def __init__(self, header: dict, matrix: np.ndarray, mask: np.ndarray):
+        """
+        Initialize from an opened file's parts (use open()).
+
+        Args:
+            header: Decoded header
+            matrix: Probability matrix (memory-mapped copy-on-write)
+            mask: Explicit-value mask aligned to the matrix
+        """
+        self.header = header
+        self.matrix = matrix
+        self.mask = mask
+        self.entity_ids: List[str] = [e["id"] for e in header["entities"]]
+        self.attribute_ids: List[str] = header["attribute_ids"]
+
+    @classmethod
+    def open(
+        cls,
+        path,
+        sources: Optional[Dict[str, Path]] = None
+    ) -> Optional["CompiledKnowledgeBase"]:
+        """
+        Open a compiled knowledge base.
+
+        Args:
+            path: Path of the compiled file
+            sources: Optional {name: path} of the JSON sources; if any stamp
+                     differs from the one recorded at compile time, the file
+                     is considered stale
+
+        Returns:
+            The compiled knowledge base, or None if missing, unreadable or stale
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+                if magic != MAGIC or version != COMPILED_FORMAT_VERSION:
+                    return None
+                header = json.loads(f.read(header_length).decode("utf-8"))
+        except (struct.error, json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
+            print(f"Warning: Failed to read compiled knowledge base: {e}")
+            return None
+
+        if sources:
+            recorded = header.get("sources", {})
+            for name, source_path in sources.items():
+                if recorded.get(name) != source_stamp(source_path):
+                    return None
+
+        shape = tuple(header["shape"])
+        if 0 in shape:
+            matrix = np.zeros(shape, dtype=np.float64)
+            mask = np.zeros(shape, dtype=np.uint8)
+        else:
+            # Plain ndarray views of the maps skip np.memmap's per-slice overhead
+            matrix = np.memmap(
+                path, dtype="<f8", mode="c", offset=header["matrix_offset"], shape=shape
+            ).view(np.ndarray)
+            mask = np.memmap(
+                path, dtype=np.uint8, mode="r", offset=header["mask_offset"], shape=shape
+            ).view(np.ndarray)
+        return cls(header, matrix, mask)
+
+    def build_entities(self) -> Dict[str, Entity]:
+        """Create Entity objects whose attribute dicts are built on first access."""
+        return {
+            data["id"]: CompiledEntity(self, row, data)
+            for row, data in enumerate(self.header["entities"])
+        }
+
+    def row_attributes(self, row: int) -> Dict[str, float]:
+        """Build the {attr_id: value} dict of an entity's explicitly set attributes."""
+        columns = np.flatnonzero(self.mask[row])
+        return dict(zip(
+            [self.attribute_ids[c] for c in columns.tolist()],
+            self.matrix[row, columns].tolist()
+        ))
+
+    def build_attributes(self) -> Dict[str, Attribute]:
+        """Create the declared Attribute objects."""
+        return {a["id"]: Attribute.from_dict(a) for a in self.header["attributes"]}
+
+
+class CompiledEntity(Entity):
+    """
+    Entity loaded from a compiled knowledge base.
+
+    Behaves like a plain Entity; its attribute dict is rebuilt from the
+    compiled matrix and mask the first time it is read, so opening a
+    compiled catalog does not create thousands of dicts up front.
+    """
+
+    def __init__(self, compiled: CompiledKnowledgeBase, row: int, data: dict):
+        """
+        Args:
+            compiled: The compiled knowledge base holding the attribute values
+            row: The entity's row in the compiled matrix
+            data: The entity's header record
+        """
+        self._compiled = compiled
+        self._row = row
+        self._attributes: Optional[Dict[str, float]] = None
+        self.id = data["id"]
+        self.name = data["name"]
+        self.popularity_rank = data.get("popularity_rank", 500)
+        self.category = data.get("category", "unknown")
+        self.times_played = data.get("times_played", 0)
+        self.times_guessed_correctly = data.get("times_guessed_correctly", 0)
+
+    @property
+    def attributes(self) -> Dict[str, float]:
+        if self._attributes is None:
+            self._attributes = self._compiled.row_attributes(self._row)
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value: Dict[str, float]) -> None:
+        self._attributes = value
+
+
+def compile_knowledge_base(data_dir: Optional[str] = None, output=None) -> Path:
+    """
+    Compile entities.json and attributes.json into the binary format.
+
+    Learned data is not compiled; it keeps being applied on top at load time.
+
+    Args:
+        data_dir: Directory containing the JSON files (defaults to the package data)
+        output: Output path (defaults to data_dir/compiled_kb.bin)
+
+    Returns:
+        Path of the written file
+    """
+    data_dir = Path(data_dir) if data_dir is not None else Path(__file__).parent / "data"
+    source_files = compiled_sources(data_dir)
+    output = Path(output) if output is not None else data_dir / COMPILED_FILENAME
+
+    # Stamp the sources before reading, so edits made meanwhile mark the output stale
+    sources = {name: source_stamp(path) for name, path in source_files.items()}
+    entity_data = _read_list(source_files["entities.json"], "entities")
+    attribute_data = _read_list(source_files["attributes.json"], "attributes")
+
+    # Same column order as KnowledgeBase._build_matrix: declared attributes
+    # first, then attributes only referenced by entities
+    attribute_ids = [a["id"] for a in attribute_data]
+    attribute_index = {aid: j for j, aid in enumerate(attribute_ids)}
+    entities_by_id: Dict[str, dict] = {}
+    for e in entity_data:
+        entities_by_id[e["id"]] = e
+    for e in entities_by_id.values():
+        for aid in e.get("attributes", {}):
+            if aid not in attribute_index:
+                attribute_index[aid] = len(attribute_ids)
+                attribute_ids.append(aid)
+
+    shape = (len(entities_by_id), len(attribute_ids))
+    matrix = np.full(shape, DEFAULT_PROBABILITY, dtype=np.float64)
+    mask = np.zeros(shape, dtype=np.uint8)
+    entity_table = []
+    for row, e in enumerate(entities_by_id.values()):
+        for aid, value in e.get("attributes", {}).items():
+            matrix[row, attribute_index[aid]] = value
+            mask[row, attribute_index[aid]] = 1
+        entity_table.append({k: v for k, v in e.items() if k != "attributes"})
+
+    header = {
+        "sources": sources,
+        "shape": list(shape),
+        "entities": entity_table,
+        "attributes": [Attribute.from_dict(a).to_dict() for a in attribute_data],
+        "attribute_ids": attribute_ids,
+    }
+    _write(output, header, matrix, mask)
+    return output
+
+
+def _read_list(path: Path, key: str) -> List[dict]:
+    """Read the list stored under a key of a JSON file (empty if missing)."""
+    if not path.exists():
+        return []
+    with open(path, "r") as f:
+        return json.load(f).get(key, [])
+
+
+def _write(path: Path, header: dict, matrix: np.ndarray, mask: np.ndarray) -> None:
+    """Write a compiled file atomically (temp file, then rename)."""
+    # Offsets depend on the header length, which depends on the offsets'
+    # digits; iterate until the layout is stable
+    header = dict(header, matrix_offset=0, mask_offset=0)
+    while True:
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        matrix_offset = _align(_PREAMBLE.size + len(header_bytes))
+        mask_offset = matrix_offset + matrix.nbytes
+        if header["matrix_offset"] == matrix_offset and header["mask_offset"] == mask_offset:
+            break
+        header["matrix_offset"] = matrix_offset
+        header["mask_offset"] = mask_offset
+
+    temp_file = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with open(temp_file, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, COMPILED_FORMAT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b"\0" * (matrix_offset - _PREAMBLE.size - len(header_bytes)))
+            f.write(np.ascontiguousarray(matrix, dtype="<f8").tobytes())
+            f.write(np.ascontiguousarray(mask, dtype=np.uint8).tobytes())
+        temp_file.replace(path)
+    except IOError:
+        if temp_file.exists():
+            temp_file.unlink()
+        raise
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the array alignment."""
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compile the 20 Questions knowledge base')
+    parser.add_argument('--data-dir', default=None, help='Knowledge base data directory')
+    parser.add_argument('--output', default=None, help='Output file')
+
+    args = parser.parse_args()
+
+    output_path = compile_knowledge_base(args.data_dir, args.output)
+    print(f"Compiled knowledge base saved to: {output_path}")
@@ -4,16 +4,28 @@ Game Engine for the 20 Questions game.
 Orchestrates all components and manages the game flow.
 """
 
-from typing import Optional, List, Tuple, Callable, Dict
+import base64
+from typing import Optional, List, Mapping, Tuple, Callable, Dict
 from dataclasses import dataclass, field
 from enum import Enum
 
-from .models import BeliefState, GameSession
+import numpy as np
+
+from .models import BeliefState, GameSession, LogBeliefState
 from .knowledge_base import KnowledgeBase
+from .sqlite_kb import SQLiteKnowledgeBase
 from .belief_tracker import BeliefTracker
-from .question_selector import QuestionSelector
+from .question_selector import (
+    QuestionSelector, DEFAULT_LOOKAHEAD_BUDGET, DEFAULT_APPROX_ENTITIES, DEFAULT_APPROX_MAX_ERROR
+)
 from .weight_learner import WeightLearner
-from .implications import ImplicationEngine
+from .implications import ImplicationEngine, KnownAnswers
+from .opening_book import OpeningBook, BOOK_FILENAME
+from .posterior_cache import PosteriorCache, DEFAULT_CACHE_SIZE
+
+
+# Version of the serialize_session() format
+SESSION_FORMAT_VERSION = 1
 
 
 class GameState(Enum):
@@ -33,6 +45,47 @@ class GameConfig:
     guess_margin: float = 0.15
     learning_rate: float = 0.1
     show_debug: bool = False
+    vectorized_beliefs: bool = True  # Array-backed Bayesian updates
+    log_space_beliefs: bool = False  # Log-probability beliefs (needs vectorized_beliefs)
+    prune_epsilon: float = 0.0  # Drop entities below this fraction of the top (0 = keep all)
+    lookahead_width: int = 0  # Re-rank this many top questions by two-ply lookahead (0 = greedy)
+    lookahead_budget: float = DEFAULT_LOOKAHEAD_BUDGET  # Lookahead: max seconds per turn
+    maybe_aware_gains: bool = False  # Discount questions players often answer "maybe"
+    gain_approximation: str = "exact"  # "exact" or "sample" info gains (for large catalogs)
+    approx_entities: int = DEFAULT_APPROX_ENTITIES  # Sample: entities drawn per turn
+    approx_max_error: float = DEFAULT_APPROX_MAX_ERROR  # Sample: gain (bits) a pick may lose
+    use_opening_book: bool = True  # Use data_dir/opening_book.json when it matches the KB
+    write_behind_saves: bool = False  # Save learned data from a background thread
+    save_interval: float = 5.0  # Write-behind: max seconds before changes are saved
+    save_batch_size: int = 20  # Write-behind: dirty entities that trigger an early save
+    snapshot_interval: float = 5.0  # Session manager: min seconds between KB snapshot rebuilds
+    storage_backend: str = "json"  # "json" files or a shared "sqlite" database
+    posterior_cache_size: int = DEFAULT_CACHE_SIZE  # Answer sets cached (0 = no cache)
+
+
+def create_knowledge_base(
+    data_dir: Optional[str] = None,
+    storage_backend: str = "json"
+) -> KnowledgeBase:
+    """
+    Open the knowledge base with the configured storage backend.
+
+    Args:
+        data_dir: Directory for data files
+        storage_backend: "json" or "sqlite"
+    """
+    if storage_backend == "sqlite":
+        return SQLiteKnowledgeBase(data_dir)
+    if storage_backend == "json":
+        return KnowledgeBase(data_dir)
+    raise ValueError(f"Unknown storage backend: {storage_backend!r}")
+
+
+def create_posterior_cache(config: GameConfig) -> Optional[PosteriorCache]:
+    """Create the posterior cache a configuration asks for, if any."""
+    if config.posterior_cache_size > 0:
+        return PosteriorCache(config.posterior_cache_size)
+    return None
 
 
 @dataclass
@@ -74,31 +127,83 @@ class GameEngine:
         self.config = config or GameConfig()
 
         # Initialize components
-        self.kb = KnowledgeBase(data_dir)
-        self.bt = BeliefTracker(self.kb)
-        self.qs = QuestionSelector(self.kb, self.bt)
-        self.wl = WeightLearner(self.kb, learning_rate=self.config.learning_rate)
+        self.kb = create_knowledge_base(data_dir, self.config.storage_backend)
+        # One implication engine shared by every component
         self.implication_engine = ImplicationEngine()
+        self.bt = BeliefTracker(
+            self.kb,
+            vectorized=self.config.vectorized_beliefs,
+            log_space=self.config.log_space_beliefs,
+            implication_engine=self.implication_engine,
+            prune_epsilon=self.config.prune_epsilon
+        )
+        self.qs = QuestionSelector(
+            self.kb,
+            self.bt,
+            implication_engine=self.implication_engine,
+            lookahead_width=self.config.lookahead_width,
+            lookahead_budget=self.config.lookahead_budget,
+            maybe_aware=self.config.maybe_aware_gains,
+            gain_approximation=self.config.gain_approximation,
+            approx_entities=self.config.approx_entities,
+            approx_max_error=self.config.approx_max_error
+        )
+        self.wl = WeightLearner(
+            self.kb,
+            learning_rate=self.config.learning_rate,
+            write_behind=self.config.write_behind_saves,
+            flush_interval=self.config.save_interval,
+            flush_count=self.config.save_batch_size
+        )
+        if self.config.use_opening_book:
+            self.qs.opening_book = OpeningBook.load(self.kb.data_dir / BOOK_FILENAME)
+        self.posterior_cache = create_posterior_cache(self.config)
+
+        self._reset_game_state()
 
-        # Game state
+    def _reset_game_state(self) -> None:
+        """Clear the game state; the game is not started until start_game()."""
         self.state = GameState.NOT_STARTED
         self.beliefs: Optional[BeliefState] = None
         self.asked_questions: set = set()
         self.question_answers: List[Tuple[str, float]] = []
+        self._known_answers = KnownAnswers(self.implication_engine)
         self.current_question: int = 0
         self.guessed_entity: Optional[str] = None
         self.turn_history: List[TurnResult] = []
+        # Per answer: (beliefs before it, known-answers checkpoint) for undo
+        self._undo_stack: List[Tuple[BeliefState, int]] = []
+
+    def warm_up(self) -> None:
+        """
+        Build the caches the first question needs (answer factors, opening
+        book validation) without touching the game state.
+
+        Lets a caller that creates the engine in the background move this
+        work off the first turn.
+        """
+        self.qs.select_best_question(
+            self.bt.initialize_beliefs(),
+            set(),
+            KnownAnswers(self.implication_engine),
+            answer_path=[]
+        )
 
     def start_game(self) -> None:
         """Start a new game."""
+        self._reset_game_state()
         self.beliefs = self.bt.initialize_beliefs()
-        self.asked_questions = set()
-        self.question_answers = []
-        self.current_question = 0
-        self.guessed_entity = None
-        self.turn_history = []
         self.state = GameState.ASKING_QUESTIONS
 
+    @property
+    def known_answers(self) -> Mapping[str, float]:
+        """
+        Answers given so far plus everything they imply (read-only).
+
+        Maintained incrementally by process_answer() and undo_last_answer().
+        """
+        return self._known_answers
+
     def get_next_question(self) -> Optional[Tuple[str, str]]:
         """
         Get the next question to ask.
@@ -122,15 +227,22 @@ class GameEngine:
             self.state = GameState.MAKING_GUESS
             return None
 
-        # Build known answers dict for implication filtering
-        known_answers = self._get_known_answers()
-
-        # Select best question (with hierarchy and implication awareness)
-        attr_id = self.qs.select_best_question(
-            self.beliefs,
-            self.asked_questions,
-            known_answers
-        )
+        # Select best question (with hierarchy and implication awareness),
+        # unless it is cached for this answer set
+        cache = self.posterior_cache
+        found = False
+        if cache is not None:
+            cache_key = cache.make_key(self.question_answers)
+            found, attr_id = cache.get_question(self.kb.version, cache_key)
+        if not found:
+            attr_id = self.qs.select_best_question(
+                self.beliefs,
+                self.asked_questions,
+                self._known_answers,
+                answer_path=self.question_answers
+            )
+            if cache is not None:
+                cache.put_question(self.kb.version, cache_key, attr_id)
 
         if attr_id is None:
             # No more useful questions
@@ -140,35 +252,6 @@ class GameEngine:
         question_text = self.qs.get_question_text(attr_id)
         return (attr_id, question_text)
 
-    def _get_known_answers(self) -> Dict[str, float]:
-        """
-        Build a dictionary of known answers from the question history,
-        including answers that are logically implied by previous answers.
-
-        Returns:
-            Dict mapping attribute_id -> answer_value
-        """
-        # Start with directly answered questions
-        known = {attr_id: answer for attr_id, answer in self.question_answers}
-
-        # Propagate implications to build complete set of known answers
-        # We need to iterate until no new implications are found
-        # Limit iterations to prevent infinite loops from circular implications
-        max_iterations = 100
-        iteration = 0
-        changed = True
-        while changed and iteration < max_iterations:
-            changed = False
-            iteration += 1
-            for attr_id, answer in list(known.items()):
-                implications = self.implication_engine.get_implications(attr_id, answer)
-                for implied_attr, implied_val in implications:
-                    if implied_attr not in known:
-                        known[implied_attr] = implied_val
-                        changed = True
-
-        return known
-
     def process_answer(self, attribute_id: str, answer: float) -> TurnResult:
         """
         Process user's answer to a question.
@@ -186,8 +269,11 @@ class GameEngine:
         # Record entropy before
         entropy_before = self.bt.get_entropy(self.beliefs)
 
-        # Update beliefs
-        self.beliefs = self.bt.update_beliefs(self.beliefs, attribute_id, answer)
+        # Belief states are never modified in place, so keeping a reference
+        # is enough to restore them on undo
+        self._undo_stack.append((self.beliefs, self._known_answers.checkpoint()))
+
+        self.beliefs = self._next_beliefs(self.beliefs, self.question_answers, attribute_id, answer)
 
         # Record entropy after
         entropy_after = self.bt.get_entropy(self.beliefs)
@@ -197,6 +283,10 @@ class GameEngine:
         self.question_answers.append((attribute_id, answer))
         self.current_question += 1
 
+        # Known answers are maintained incrementally: only this answer's
+        # precompiled consequences are merged in
+        self._known_answers.add_answer(attribute_id, answer)
+
         # Get current state info
         top_entities = self.beliefs.get_top_entities(5)
         confidence = self.bt.get_confidence(self.beliefs)
@@ -216,6 +306,195 @@ class GameEngine:
 
         return result
 
+    def _next_beliefs(
+        self,
+        beliefs: BeliefState,
+        answer_path: List[Tuple[str, float]],
+        attribute_id: str,
+        answer: float
+    ) -> BeliefState:
+        """
+        Update beliefs after one more answer.
+
+        Reuses the posterior cached for the same answer set, or the opening
+        book's snapshot when the path is covered.
+        """
+        path = answer_path + [(attribute_id, answer)]
+        cache = self.posterior_cache
+        if cache is not None:
+            cache_key = cache.make_key(path)
+            cached = cache.get_beliefs(self.kb.version, cache_key)
+            if cached is not None:
+                return cached
+
+        posterior = None
+        book = self.qs.get_opening_book()
+        if book is not None:
+            posterior = book.get_posterior(path)
+        if posterior is not None:
+            new_beliefs = self.bt.beliefs_from_vector(posterior)
+        else:
+            new_beliefs = self.bt.update_beliefs(beliefs, attribute_id, answer)
+
+        if cache is not None:
+            cache.put_beliefs(self.kb.version, cache_key, new_beliefs)
+        return new_beliefs
+
+    def _replay_beliefs(self, answer_path: List[Tuple[str, float]]) -> BeliefState:
+        """Re-derive the beliefs after a sequence of answers from the prior."""
+        beliefs = self.bt.initialize_beliefs()
+        for i, (attribute_id, answer) in enumerate(answer_path):
+            beliefs = self._next_beliefs(beliefs, answer_path[:i], attribute_id, answer)
+        return beliefs
+
+    def undo_last_answer(self) -> Optional[Tuple[str, float]]:
+        """
+        Take back the most recent answer.
+
+        Restores the previous beliefs and known answers from saved
+        references and the known-answers journal, without recomputing
+        any updates. A pending guess is cancelled.
+
+        Returns:
+            The (attribute_id, answer) that was undone, or None if there is none
+        """
+        if not self._undo_stack or self.state not in (
+            GameState.ASKING_QUESTIONS, GameState.MAKING_GUESS
+        ):
+            return None
+
+        previous, checkpoint = self._undo_stack.pop()
+        self._known_answers.rollback(checkpoint)
+
+        attribute_id, answer = self.question_answers.pop()
+        if previous is None:
+            # Restored from a session without belief history
+            previous = self._replay_beliefs(self.question_answers)
+        self.beliefs = previous
+        self.asked_questions.discard(attribute_id)
+        self.current_question -= 1
+        self.turn_history.pop()
+
+        self.guessed_entity = None
+        self.state = GameState.ASKING_QUESTIONS
+        return (attribute_id, answer)
+
+    def serialize_session(self, include_posterior: bool = False) -> dict:
+        """
+        Capture the in-progress game as a JSON-compatible dict.
+
+        The compact form holds only the answers (plus state and pending
+        guess); restore_session() replays them to re-derive the beliefs.
+        With include_posterior, the current posterior and turn history are
+        stored too, tied to the KB content hash, so restoring skips the
+        replay while the knowledge base is unchanged.
+
+        Args:
+            include_posterior: Also store the posterior and turn history
+
+        Returns:
+            The serialized session
+        """
+        data = {
+            "format": SESSION_FORMAT_VERSION,
+            "state": self.state.value,
+            "answers": [[attr_id, answer] for attr_id, answer in self.question_answers],
+            "guessed_entity": self.guessed_entity,
+        }
+        if include_posterior and self.beliefs is not None:
+            data["kb"] = self.kb.content_hash()
+            if isinstance(self.beliefs, LogBeliefState):
+                data["log_posterior"] = _encode_array(self.beliefs.log_weights)
+            else:
+                data["posterior"] = _encode_array(self.bt.as_vector(self.beliefs).vector)
+            data["turns"] = [
+                [
+                    t.question_number,
+                    t.attribute_id,
+                    t.entropy_before,
+                    t.entropy_after,
+                    t.confidence,
+                    [[eid, prob] for eid, prob in t.top_entities],
+                ]
+                for t in self.turn_history
+            ]
+        return data
+
+    def restore_session(self, data: dict) -> None:
+        """
+        Resume a game captured by serialize_session().
+
+        Uses the stored posterior when it was captured against the current
+        knowledge base; otherwise replays the answers, which yields the
+        beliefs this engine would have reached playing them live.
+
+        Args:
+            data: The serialized session
+
+        Raises:
+            ValueError: If the data is not a serialized session of this format
+        """
+        if data.get("format") != SESSION_FORMAT_VERSION:
+            raise ValueError("Unsupported session format")
+        state = GameState(data["state"])
+        answers = [(str(attr_id), float(answer)) for attr_id, answer in data["answers"]]
+
+        self.start_game()
+        if state == GameState.NOT_STARTED:
+            self.beliefs = None
+            self.state = state
+            return
+
+        beliefs = None
+        turns = data.get("turns")
+        if data.get("kb") == self.kb.content_hash() and turns is not None and len(turns) == len(answers):
+            beliefs = self._decode_beliefs(data)
+
+        if beliefs is None:
+            for attr_id, answer in answers:
+                self.process_answer(attr_id, answer)
+        else:
+            for attr_id, answer in answers:
+                # No belief history: undo re-derives earlier beliefs by replay
+                self._undo_stack.append((None, self._known_answers.checkpoint()))
+                self._known_answers.add_answer(attr_id, answer)
+                self.asked_questions.add(attr_id)
+            self.question_answers = answers
+            self.current_question = len(answers)
+            self.beliefs = beliefs
+            self.turn_history = [
+                TurnResult(
+                    question_number=number,
+                    question_text=self.qs.get_question_text(attr_id) or "",
+                    attribute_id=attr_id,
+                    entropy_before=entropy_before,
+                    entropy_after=entropy_after,
+                    top_entities=[(eid, prob) for eid, prob in top_entities],
+                    confidence=confidence
+                )
+                for number, attr_id, entropy_before, entropy_after, confidence, top_entities in turns
+            ]
+
+        self.state = state
+        self.guessed_entity = data.get("guessed_entity")
+
+    def _decode_beliefs(self, data: dict) -> Optional[BeliefState]:
+        """Rebuild the stored posterior in this tracker's representation, if it fits the KB."""
+        if "log_posterior" in data:
+            log_weights = _decode_array(data["log_posterior"])
+            if len(log_weights) != len(self.kb.entity_ids):
+                return None
+            if self.bt.log_space:
+                return LogBeliefState(log_weights, self.kb.entity_ids, self.kb.entity_index)
+            vector = np.exp(log_weights - log_weights.max())
+            return self.bt.beliefs_from_vector(vector / vector.sum())
+        if "posterior" in data:
+            vector = _decode_array(data["posterior"])
+            if len(vector) != len(self.kb.entity_ids):
+                return None
+            return self.bt.beliefs_from_vector(vector)
+        return None
+
     def _should_guess(self) -> bool:
         """Check if we should make a guess now."""
         if self.beliefs is None:
@@ -289,13 +568,18 @@ class GameEngine:
             else:
                 self.state = GameState.LEARNING_NEW
 
-    def _find_entity_by_name(self, name: str):
+    def _find_entity_by_name(self, name: str, kb: Optional[KnowledgeBase] = None):
         """Find an entity by name (case-insensitive).
 
         Uses a multi-pass matching strategy:
         1. Exact match (after normalizing articles)
         2. Core noun match (removing 'a', 'an', 'the')
+
+        Searches kb if given, otherwise the engine's knowledge base.
         """
+        if kb is None:
+            kb = self.kb
+
         def normalize_name(n: str) -> str:
             """Remove leading articles and normalize."""
             n = n.lower().strip()
@@ -307,14 +591,14 @@ class GameEngine:
         name_normalized = normalize_name(name)
 
         # Pass 1: Exact match after normalization
-        for entity in self.kb.get_all_entities():
+        for entity in kb.get_all_entities():
             entity_normalized = normalize_name(entity.name)
             if name_normalized == entity_normalized:
                 return entity
 
         # Pass 2: Check if the normalized name matches as a whole word
         # (prevents "cat" matching "catfish")
-        for entity in self.kb.get_all_entities():
+        for entity in kb.get_all_entities():
             entity_normalized = normalize_name(entity.name)
             # Split into words and check for whole word match
             entity_words = entity_normalized.split()
@@ -379,6 +663,16 @@ class GameEngine:
         """Get global learning statistics."""
         return self.wl.get_global_stats()
 
+    def get_cache_stats(self) -> dict:
+        """Get posterior cache entry count and hit/miss counters (empty if disabled)."""
+        if self.posterior_cache is None:
+            return {}
+        return self.posterior_cache.get_stats()
+
+    def close(self) -> None:
+        """Save any learned data still pending and stop background saving."""
+        self.wl.close()
+
     def get_current_state(self) -> dict:
         """
         Get the current game state for display.
@@ -405,3 +699,13 @@ class GameEngine:
                 for eid, prob in top_entities
             ]
         }
+
+
+def _encode_array(array: np.ndarray) -> str:
+    """Encode a float vector as base64 little-endian float64."""
+    return base64.b64encode(np.ascontiguousarray(array, dtype="<f8").tobytes()).decode("ascii")
+
+
+def _decode_array(text: str) -> np.ndarray:
+    """Decode a vector written by _encode_array()."""
+    return np.frombuffer(base64.b64decode(text), dtype="<f8").astype(np.float64)
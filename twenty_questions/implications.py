@@ -8,7 +8,10 @@ When a user answers a question, this system propagates logical
 implications to infer answers to related questions.
 """
 
-from typing import Dict, List, Tuple, Optional
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Optional, Union
+
+import numpy as np
 
 
 # Implication rules: (attribute_id, answer_value) -> [(implied_attr, implied_value), ...]
@@ -566,6 +569,14 @@ class ImplicationEngine:
 
     When a user answers a question, this engine determines what other
     attributes are logically implied by that answer.
+
+    The rules are compiled once into a transitive-closure table mapping each
+    (attribute, yes/no) to its full set of consequences, so propagating a
+    set of answers is a union of precomputed dicts rather than a fixpoint
+    iteration. Attributes that are already known keep their values and are
+    not propagated through (an attribute answered "maybe" passes nothing
+    on); only answers whose closure touches a known attribute are derived
+    rule by rule.
     """
 
     def __init__(self, implications: Optional[Dict] = None):
@@ -577,6 +588,8 @@ class ImplicationEngine:
         """
         self.implications = implications or ATTRIBUTE_IMPLICATIONS
         self._build_reverse_index()
+        self._compile_closure()
+        self._compile_rule_masks()
 
     def _build_reverse_index(self):
         """Build an index of which attributes can be implied by others."""
@@ -587,6 +600,76 @@ class ImplicationEngine:
                     self.implied_by[implied_attr] = []
                 self.implied_by[implied_attr].append((cond_attr, cond_val, implied_val))
 
+    def _compile_closure(self):
+        """Precompute the transitive consequences of every rule condition."""
+        self.closure: Dict[Tuple[str, float], Dict[str, float]] = {
+            key: self._derive_consequences(*key) for key in self.implications
+        }
+
+    def _derive_consequences(
+        self,
+        attribute_id: str,
+        answer_key: float,
+        known: Optional[Mapping[str, float]] = None
+    ) -> Dict[str, float]:
+        """
+        Derive everything implied by an answer, breadth first.
+
+        Conflicts are resolved by preferring the shortest derivation; between
+        values derived at the same depth, the more certain one wins (so a
+        hard 0.0/1.0 beats a soft 0.9/0.95), then the first one found.
+
+        Args:
+            attribute_id: The answered attribute
+            answer_key: 1.0 for yes, 0.0 for no
+            known: Known answers; these attributes are neither derived nor
+                   propagated through
+
+        Returns:
+            Dict of {attr_id: implied_value}, excluding the answered attribute
+        """
+        if known is None:
+            known = {}
+        consequences: Dict[str, float] = {}
+        frontier = [(attribute_id, answer_key)]
+        while frontier:
+            level: Dict[str, float] = {}
+            for attr_id, value in frontier:
+                for implied_attr, implied_val in self.get_implications(attr_id, value):
+                    if (implied_attr == attribute_id or implied_attr in consequences
+                            or implied_attr in known):
+                        continue
+                    current = level.get(implied_attr)
+                    if current is None or abs(implied_val - 0.5) > abs(current - 0.5):
+                        level[implied_attr] = implied_val
+            consequences.update(level)
+            frontier = list(level.items())
+        return consequences
+
+    def _compile_rule_masks(self):
+        """
+        Index every attribute named in a rule and build boolean rule matrices.
+
+        yes_rules[j, i] is True when answering attribute i "yes" determines
+        attribute j; no_rules likewise for "no".
+        """
+        self.attribute_ids: List[str] = []
+        self.attribute_index: Dict[str, int] = {}
+        for (cond_attr, _), implications in self.implications.items():
+            for attr_id in [cond_attr] + [implied for implied, _ in implications]:
+                if attr_id not in self.attribute_index:
+                    self.attribute_index[attr_id] = len(self.attribute_ids)
+                    self.attribute_ids.append(attr_id)
+
+        n = len(self.attribute_ids)
+        self.yes_rules = np.zeros((n, n), dtype=bool)
+        self.no_rules = np.zeros((n, n), dtype=bool)
+        for (cond_attr, cond_val), implications in self.implications.items():
+            rules = self.yes_rules if cond_val == 1.0 else self.no_rules
+            cond_idx = self.attribute_index[cond_attr]
+            for implied_attr, _ in implications:
+                rules[self.attribute_index[implied_attr], cond_idx] = True
+
     def get_implications(self, attribute_id: str, answer: float) -> List[Tuple[str, float]]:
         """
         Get all attributes implied by an answer.
@@ -609,6 +692,101 @@ class ImplicationEngine:
         key = (attribute_id, answer_key)
         return self.implications.get(key, [])
 
+    def get_all_implications(self, attribute_id: str, answer: float) -> Dict[str, float]:
+        """
+        Get every attribute transitively implied by an answer.
+
+        Args:
+            attribute_id: The attribute that was answered
+            answer: The answer value (1.0=yes, 0.0=no, 0.5=maybe)
+
+        Returns:
+            Dict of {attr_id: implied_value} (do not mutate)
+        """
+        if answer > 0.7:
+            answer_key = 1.0
+        elif answer < 0.3:
+            answer_key = 0.0
+        else:
+            return {}
+        return self.closure.get((attribute_id, answer_key), {})
+
+    def get_new_implications(
+        self,
+        attribute_id: str,
+        answer: float,
+        known: Mapping[str, float]
+    ) -> Dict[str, float]:
+        """
+        Get what an answer adds to a set of known answers.
+
+        Known attributes are not overwritten and not propagated through, as
+        in a fixpoint over the known answers: after is_animal was answered
+        "maybe", is_mineral=yes does not imply is_cetacean=no via
+        is_animal=no. When no consequence is known yet, this is the
+        precompiled closure.
+
+        Args:
+            attribute_id: The attribute that was answered
+            answer: The answer value (1.0=yes, 0.0=no, 0.5=maybe)
+            known: Known answers (may include the answered attribute)
+
+        Returns:
+            Dict of {attr_id: implied_value} for attributes not in known (do not mutate)
+        """
+        if answer > 0.7:
+            answer_key = 1.0
+        elif answer < 0.3:
+            answer_key = 0.0
+        else:
+            return {}
+        consequences = self.closure.get((attribute_id, answer_key), {})
+        if any(attr_id in known for attr_id in consequences):
+            consequences = self._derive_consequences(attribute_id, answer_key, known)
+        return consequences
+
+    def propagate(
+        self,
+        answers: Union[Dict[str, float], Iterable[Tuple[str, float]]]
+    ) -> Dict[str, float]:
+        """
+        Build the complete set of known answers from direct answers.
+
+        Direct answers always win and are not propagated through; implied
+        values are merged in answer order, so earlier answers take precedence
+        on conflicts.
+
+        Args:
+            answers: Direct answers as a dict or (attr_id, answer) pairs
+
+        Returns:
+            Dict of {attr_id: value} for answered and implied attributes
+        """
+        pairs = list(answers.items()) if isinstance(answers, dict) else list(answers)
+        known = dict(pairs)
+        for attr_id, answer in pairs:
+            known.update(self.get_new_implications(attr_id, answer, known))
+        return known
+
+    def determined_mask(self, known: "KnownAnswers") -> np.ndarray:
+        """
+        Find every attribute determined by a set of known answers at once.
+
+        Vectorized equivalent of calling is_already_determined() for each
+        attribute in `attribute_ids`.
+
+        Args:
+            known: Known answers built against this engine's rules
+
+        Returns:
+            Boolean array aligned to `attribute_ids`
+        """
+        return (self.yes_rules @ known.known_yes) | (self.no_rules @ known.known_no)
+
+    def get_determined_attribute_ids(self, known: "KnownAnswers") -> Set[str]:
+        """Get the IDs of all attributes determined by a set of known answers."""
+        return {self.attribute_ids[i] for i in np.flatnonzero(self.determined_mask(known))}
+
     def is_already_determined(
         self,
         attribute_id: str,
@@ -645,8 +823,9 @@ class ImplicationEngine:
         """
         Get all attributes that are logically determined from known answers.
 
-        Uses iterative propagation to handle transitive implications:
-        e.g., is_bird=1 -> is_mammal=0 -> is_cetacean=0
+        Transitive implications come from the precompiled closure table:
+        e.g., is_bird=1 -> is_mammal=0 -> is_cetacean=0 (unless is_mammal is
+        already known)
 
         Args:
             known_answers: Dict of {attr_id: answer_value}
@@ -654,28 +833,122 @@ class ImplicationEngine:
         Returns:
             Dict of {attr_id: implied_value} for all determined attributes
         """
-        # Create a working copy that includes both known and determined
         all_known = dict(known_answers)
-        determined = {}
+        determined: Dict[str, float] = {}
+        for attr_id, value in known_answers.items():
+            implied = self.get_new_implications(attr_id, value, all_known)
+            all_known.update(implied)
+            determined.update(implied)
+        return determined
 
-        # Iterate until no new determinations
-        max_iterations = 10  # Prevent infinite loops
-        for _ in range(max_iterations):
-            new_determinations = {}
 
-            for attr_id in self.implied_by:
-                if attr_id in all_known:
-                    continue  # Already known or determined
+class KnownAnswers(Mapping):
+    """
+    Known attribute answers with "known yes" / "known no" bit-vectors.
+
+    Reads like a dict of {attr_id: answer_value}. Every write also updates
+    boolean vectors indexed by the engine's attribute index (yes: > 0.7,
+    no: < 0.3), so ImplicationEngine.determined_mask() can test every
+    candidate attribute against the precomputed rule masks in one step.
 
-                is_det, implied_val = self.is_already_determined(attr_id, all_known)
-                if is_det:
-                    new_determinations[attr_id] = implied_val
+    Writes are journaled, so checkpoint()/rollback() undo recent answers
+    without re-propagating anything.
+    """
 
-            if not new_determinations:
-                break  # Converged, no new determinations
+    def __init__(
+        self,
+        engine: ImplicationEngine,
+        answers: Optional[Union[Dict[str, float], Iterable[Tuple[str, float]]]] = None
+    ):
+        """
+        Args:
+            engine: Implication engine whose attribute index the bits follow
+            answers: Optional initial values
+        """
+        self.engine = engine
+        self._values: Dict[str, float] = {}
+        self._journal: List[Tuple[str, Optional[float]]] = []  # (attr_id, previous value)
+        self.known_yes = np.zeros(len(engine.attribute_ids), dtype=bool)
+        self.known_no = np.zeros(len(engine.attribute_ids), dtype=bool)
+        if answers:
+            self.update(answers)
+
+    def __getitem__(self, attr_id: str) -> float:
+        return self._values[attr_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    # Fast paths for the Mapping mixins, which would go through __getitem__
+    def __contains__(self, attr_id: object) -> bool:
+        return attr_id in self._values
+
+    def get(self, attr_id: str, default: Optional[float] = None) -> Optional[float]:
+        return self._values.get(attr_id, default)
+
+    def items(self):
+        return self._values.items()
+
+    def set(self, attr_id: str, value: float) -> None:
+        """Set the known value of an attribute."""
+        self._journal.append((attr_id, self._values.get(attr_id)))
+        self._write(attr_id, value)
+
+    def _write(self, attr_id: str, value: Optional[float]) -> None:
+        """Store or clear a value and its bits without journaling."""
+        if value is None:
+            del self._values[attr_id]
+        else:
+            self._values[attr_id] = value
+        idx = self.engine.attribute_index.get(attr_id)
+        if idx is not None:
+            self.known_yes[idx] = value is not None and value > 0.7
+            self.known_no[idx] = value is not None and value < 0.3
 
-            # Add new determinations to working set
-            all_known.update(new_determinations)
-            determined.update(new_determinations)
+    def update(
+        self,
+        answers: Union[Dict[str, float], Iterable[Tuple[str, float]]]
+    ) -> None:
+        """Set several known values, overwriting existing ones."""
+        pairs = answers.items() if isinstance(answers, Mapping) else answers
+        for attr_id, value in pairs:
+            self.set(attr_id, value)
+
+    def add_answer(self, attr_id: str, answer: float) -> None:
+        """
+        Record a direct answer and merge in its transitive consequences.
 
-        return determined
+        The direct answer overwrites any implied value; consequences only
+        fill attributes that are not known yet, and are not propagated
+        through known ones.
+        """
+        self.set(attr_id, answer)
+        for implied_attr, implied_val in self.engine.get_new_implications(
+            attr_id, answer, self._values
+        ).items():
+            self.set(implied_attr, implied_val)
+
+    def checkpoint(self) -> int:
+        """Get a marker for the current state, for use with rollback()."""
+        return len(self._journal)
+
+    def rollback(self, checkpoint: int) -> None:
+        """Undo every write made since the given checkpoint."""
+        while len(self._journal) > checkpoint:
+            attr_id, previous = self._journal.pop()
+            self._write(attr_id, previous)
+
+    def compatible_with(self, engine: ImplicationEngine) -> bool:
+        """Check whether the bit-vectors follow the given engine's attribute index."""
+        return self.engine is engine or self.engine.implications is engine.implications
+
+    def copy(self) -> "KnownAnswers":
+        """Create an independent copy."""
+        result = KnownAnswers(self.engine)
+        result._values = dict(self._values)
+        result.known_yes = self.known_yes.copy()
+        result.known_no = self.known_no.copy()
+        return result
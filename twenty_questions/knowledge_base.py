@@ -1,30 +1,85 @@
 """
 Knowledge Base for the 20 Questions game.
 
-Manages entities and attributes with JSON persistence.
+Manages entities and attributes with JSON persistence, and keeps a dense
+P(yes|entity, attribute) matrix in sync for vectorized inference.
+
+Learned changes are persisted as an append-only journal (learned.journal,
+one compact JSON record per line) that is periodically compacted into the
+learned.json snapshot and replayed on load. Mutators mark entities dirty,
+so saving only serializes what changed since the last save.
+
+frozen_copy() makes read-only copies for concurrent readers; successive
+copies share every entity and attribute that did not change in between.
 """
 
+import copy
+import hashlib
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
 from .models import Entity, Attribute
 
 
+# Probability used for entity/attribute pairs with no explicit value
+DEFAULT_PROBABILITY = 0.5
+
+# Element type of the dense probability matrix
+MATRIX_DTYPE = np.float64
+
+# Journal records after which save() compacts the journal into learned.json
+JOURNAL_COMPACT_THRESHOLD = 1000
+
+# Journal record types
+RECORD_UPDATE = "u"      # {"op", "e": entity_id, "v": {attr_id: value}, "p": times_played,
+                         #  "c": times_guessed_correctly}
+RECORD_ENTITY = "e"      # {"op", "entity": Entity.to_dict()}
+RECORD_ATTRIBUTE = "a"   # {"op", "attribute": Attribute.to_dict()}
+RECORD_WEIGHT = "w"      # {"op", "e", "a": attr_id, "v": value} (replay only)
+RECORD_STATS = "s"       # {"op", "e", "p", "c"} (replay only)
+RECORD_ANSWERS = "q"     # {"op", "a": attr_id, "n": times_asked, "m": times_maybe}
+
+
 class KnowledgeBase:
     """
     Manages the knowledge base of entities and attributes.
 
     Provides persistence to JSON files and methods for accessing
     and modifying the knowledge base.
+
+    Alongside the per-entity attribute dicts, the knowledge base maintains a
+    dense matrix of P(yes|entity, attr) values. Row and column indices are
+    stable: new entities and attributes are appended, never reordered, so
+    arrays aligned to the matrix stay valid as the knowledge base grows.
+    Attributes referenced by entities but missing from attributes.json get
+    their own columns after the declared attributes.
+
+    Mutators mark the touched entities (and, for weights, attributes) dirty;
+    save() appends one record per dirty entity holding absolute values (so
+    replaying a record twice is harmless) and compacts the journal into
+    learned.json once it grows past the threshold. Edits that bypass the
+    mutators must be followed by sync_entity() to be saved.
     """
 
-    def __init__(self, data_dir: Optional[str] = None):
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        journal_compact_threshold: int = JOURNAL_COMPACT_THRESHOLD,
+        use_compiled: bool = True
+    ):
         """
         Initialize the knowledge base.
 
         Args:
             data_dir: Directory for data files. Defaults to ./data relative to this file.
+            journal_compact_threshold: Journal records after which save() compacts
+            use_compiled: Open data_dir/compiled_kb.bin instead of parsing the
+                          JSON catalog when it is up to date
         """
         if data_dir is None:
             data_dir = Path(__file__).parent / "data"
@@ -34,24 +89,124 @@ class KnowledgeBase:
         self.entities_file = self.data_dir / "entities.json"
         self.attributes_file = self.data_dir / "attributes.json"
         self.learned_file = self.data_dir / "learned.json"
+        self.journal_file = self.data_dir / "learned.journal"
+        self.use_compiled = use_compiled
 
         self.entities: Dict[str, Entity] = {}
         self.attributes: Dict[str, Attribute] = {}
-        self._original_entities: Dict[str, dict] = {}  # Cache for original entity data
+        self._original_attribute_ids: Set[str] = set()
+
+        # Changes since the last save: entity -> changed attribute IDs, entities
+        # replaced wholesale, new attributes, and attributes with new answer counts
+        self._dirty_entities: Dict[str, Set[str]] = {}
+        self._replaced_entities: Set[str] = set()
+        self._new_attributes: List[str] = []
+        self._answered_attributes: Dict[str, None] = {}
+        # Entities that differ from entities.json and belong in learned.json
+        self._learned_entities: Dict[str, None] = {}
+
+        # Changes since the last frozen_copy(), and a counter that tells
+        # whether a copy is still the latest one (see frozen_copy)
+        self._uncopied_entities: Set[str] = set()
+        self._uncopied_attributes: Set[str] = set()
+        self._copy_epoch = 0
+
+        # Learning journal on disk
+        self.journal_compact_threshold = journal_compact_threshold
+        self._journal_length = 0
+
+        # Held around mutations and saves when saving from another thread
+        self.lock = threading.RLock()
+        # Whether add/update methods save immediately; write-behind savers
+        # turn this off and flush on their own schedule
+        self.autosave = True
+
+        # Dense probability matrix and its index maps
+        self._entity_ids: List[str] = []
+        self._attribute_ids: List[str] = []
+        self._entity_index: Dict[str, int] = {}
+        self._attribute_index: Dict[str, int] = {}
+        self._matrix: np.ndarray = np.empty((0, 0), dtype=MATRIX_DTYPE)
+        self.version = 0  # Bumped on every change to the matrix
+        self.answer_stats_version = 0  # Bumped whenever answer counts change
+        self._content_hash: Optional[str] = None
+        self._content_hash_version = -1
+
+        compiled = self._load()
+        if compiled is not None:
+            self._adopt_compiled_matrix(compiled)
+        else:
+            self._build_matrix()
+
+    def _load(self):
+        """
+        Load entities and attributes, then apply learned data on top.
+
+        The catalog comes from the compiled binary file when it is enabled
+        and up to date, otherwise from the JSON files.
 
-        self._load()
+        Returns:
+            The CompiledKnowledgeBase used, or None if the JSON files were parsed
+        """
+        compiled = self._open_compiled() if self.use_compiled else None
+        if compiled is not None:
+            self.entities = compiled.build_entities()
+            self.attributes = compiled.build_attributes()
+            self._original_attribute_ids = set(self.attributes)
+        else:
+            self._load_json_catalog()
 
-    def _load(self) -> None:
-        """Load entities and attributes from JSON files."""
-        # Load entities and cache original data
+        # Load learned data (overrides for entities/attributes from play sessions)
+        if self.learned_file.exists():
+            try:
+                with open(self.learned_file, "r") as f:
+                    data = json.load(f)
+                    # Merge learned entities
+                    for e in data.get("entities", []):
+                        entity = Entity.from_dict(e)
+                        if entity.id in self.entities:
+                            # Update existing entity's learned attributes
+                            self.entities[entity.id].attributes.update(entity.attributes)
+                            self.entities[entity.id].times_played = entity.times_played
+                            self.entities[entity.id].times_guessed_correctly = entity.times_guessed_correctly
+                        else:
+                            self.entities[entity.id] = entity
+                        self._learned_entities[entity.id] = None
+                    # Learned attributes (questions added during play)
+                    for a in data.get("attributes", []):
+                        if a["id"] not in self.attributes:
+                            self.attributes[a["id"]] = Attribute.from_dict(a)
+                    # Answer counts of every question asked in learned games
+                    for attr_id, (asked, maybe) in data.get("answer_counts", {}).items():
+                        attribute = self.attributes.get(attr_id)
+                        if attribute is not None:
+                            attribute.times_asked = asked
+                            attribute.times_maybe = maybe
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Warning: Failed to load learned file: {e}")
+
+        # Replay changes journaled since the last compaction
+        self._replay_journal()
+        return compiled
+
+    def _open_compiled(self):
+        """Open the compiled catalog, or return None if it is missing or stale."""
+        # Imported here: the compiled format builds on this module's constants
+        from .compiled_kb import CompiledKnowledgeBase, COMPILED_FILENAME, compiled_sources
+
+        return CompiledKnowledgeBase.open(
+            self.data_dir / COMPILED_FILENAME, sources=compiled_sources(self.data_dir)
+        )
+
+    def _load_json_catalog(self) -> None:
+        """Load entities and attributes from the JSON files."""
+        # Load entities
         if self.entities_file.exists():
             try:
                 with open(self.entities_file, "r") as f:
                     data = json.load(f)
                     for e in data.get("entities", []):
                         self.entities[e["id"]] = Entity.from_dict(e)
-                        # Cache original attributes for comparison during save
-                        self._original_entities[e["id"]] = e.get("attributes", {})
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Warning: Failed to load entities file: {e}")
 
@@ -63,55 +218,488 @@ class KnowledgeBase:
                     self.attributes = {
                         a["id"]: Attribute.from_dict(a) for a in data.get("attributes", [])
                     }
+                    self._original_attribute_ids = set(self.attributes)
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Warning: Failed to load attributes file: {e}")
 
-        # Load learned data (overrides for entities/attributes from play sessions)
-        if self.learned_file.exists():
-            try:
-                with open(self.learned_file, "r") as f:
-                    data = json.load(f)
-                    # Merge learned entities
-                    for e in data.get("entities", []):
-                        entity = Entity.from_dict(e)
-                        if entity.id in self.entities:
-                            # Update existing entity's learned attributes
-                            self.entities[entity.id].attributes.update(entity.attributes)
-                            self.entities[entity.id].times_played = entity.times_played
-                            self.entities[entity.id].times_guessed_correctly = entity.times_guessed_correctly
-                        else:
-                            self.entities[entity.id] = entity
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Failed to load learned file: {e}")
+    def _replay_journal(self) -> None:
+        """
+        Apply the records in the learning journal on top of the loaded data.
 
-    def save(self) -> None:
-        """Save learned data to JSON file."""
-        learned_entities = [
-            e.to_dict() for e in self.entities.values()
-            if e.times_played > 0 or any(
-                e.attributes.get(aid) != self._get_original_attribute(e.id, aid)
-                for aid in e.attributes
+        Replay stops at the first unreadable record, and the journal is
+        truncated there so later appends do not land on the torn line.
+        """
+        if not self.journal_file.exists():
+            return
+        try:
+            with open(self.journal_file, "rb") as f:
+                lines = f.readlines()
+        except IOError as e:
+            print(f"Warning: Failed to load learning journal: {e}")
+            return
+
+        good_bytes = 0
+        for line_number, line in enumerate(lines, 1):
+            if line.strip():
+                try:
+                    self._apply_record(json.loads(line))
+                except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+                    # A torn final write is expected after a crash; drop it
+                    print(f"Warning: Ignoring learning journal from line {line_number}: {e}")
+                    try:
+                        os.truncate(self.journal_file, good_bytes)
+                    except OSError as e:
+                        print(f"Warning: Failed to truncate learning journal: {e}")
+                    return
+                self._journal_length += 1
+            good_bytes += len(line)
+
+    def _apply_record(self, record: dict) -> None:
+        """Apply one journal record to the entity and attribute dicts."""
+        op = record["op"]
+        if op == RECORD_UPDATE:
+            entity = self.entities.get(record["e"])
+            if entity is not None:
+                entity.attributes.update(record["v"])
+                entity.times_played = record["p"]
+                entity.times_guessed_correctly = record["c"]
+                self._learned_entities[entity.id] = None
+        elif op == RECORD_WEIGHT:
+            entity = self.entities.get(record["e"])
+            if entity is not None:
+                entity.attributes[record["a"]] = record["v"]
+                self._learned_entities[entity.id] = None
+        elif op == RECORD_ENTITY:
+            entity = Entity.from_dict(record["entity"])
+            self.entities[entity.id] = entity
+            self._learned_entities[entity.id] = None
+        elif op == RECORD_ATTRIBUTE:
+            attribute = Attribute.from_dict(record["attribute"])
+            self.attributes[attribute.id] = attribute
+        elif op == RECORD_STATS:
+            entity = self.entities.get(record["e"])
+            if entity is not None:
+                entity.times_played = record["p"]
+                entity.times_guessed_correctly = record["c"]
+                self._learned_entities[entity.id] = None
+        elif op == RECORD_ANSWERS:
+            attribute = self.attributes.get(record["a"])
+            if attribute is not None:
+                attribute.times_asked = record["n"]
+                attribute.times_maybe = record["m"]
+
+    def _build_matrix(self) -> None:
+        """Build the dense probability matrix from the entity attribute dicts."""
+        self._entity_ids = list(self.entities.keys())
+        self._entity_index = {eid: i for i, eid in enumerate(self._entity_ids)}
+
+        self._attribute_ids = list(self.attributes.keys())
+        self._attribute_index = {aid: j for j, aid in enumerate(self._attribute_ids)}
+        for entity in self.entities.values():
+            for aid in entity.attributes:
+                if aid not in self._attribute_index:
+                    self._attribute_index[aid] = len(self._attribute_ids)
+                    self._attribute_ids.append(aid)
+
+        self._matrix = np.full(
+            (len(self._entity_ids), len(self._attribute_ids)),
+            DEFAULT_PROBABILITY,
+            dtype=MATRIX_DTYPE
+        )
+        for i, entity in enumerate(self.entities.values()):
+            self._fill_row(i, entity)
+        self.version += 1
+        self._copy_epoch += 1
+
+    def _adopt_compiled_matrix(self, compiled) -> None:
+        """
+        Use a compiled catalog's memory-mapped matrix as the probability matrix.
+
+        Rows of entities changed by learned data, and columns of learned
+        attributes, are synced on top; those writes go to private
+        copy-on-write pages, never to the file.
+        """
+        self._entity_ids = list(compiled.entity_ids)
+        self._entity_index = {eid: i for i, eid in enumerate(self._entity_ids)}
+        self._attribute_ids = list(compiled.attribute_ids)
+        self._attribute_index = {aid: j for j, aid in enumerate(self._attribute_ids)}
+        self._matrix = compiled.matrix
+
+        for attr_id in self.attributes:
+            self._ensure_attribute_column(attr_id)
+        for entity_id in self._learned_entities:
+            entity = self.entities.get(entity_id)
+            if entity is not None:
+                self._sync_entity_row(entity)
+        self.version += 1
+        self._copy_epoch += 1
+
+    def _fill_row(self, row: int, entity: Entity) -> None:
+        """Write an entity's attribute dict into its matrix row."""
+        for aid, value in entity.attributes.items():
+            self._matrix[row, self._attribute_index[aid]] = value
+
+    def _ensure_attribute_column(self, attr_id: str) -> int:
+        """Get the column for an attribute, appending a default column if new."""
+        col = self._attribute_index.get(attr_id)
+        if col is None:
+            col = len(self._attribute_ids)
+            self._attribute_index[attr_id] = col
+            self._attribute_ids.append(attr_id)
+            new_column = np.full(
+                (self._matrix.shape[0], 1), DEFAULT_PROBABILITY, dtype=MATRIX_DTYPE
             )
+            self._matrix = np.hstack([self._matrix, new_column])
+            self.version += 1
+        return col
+
+    def _sync_entity_row(self, entity: Entity) -> None:
+        """Write an entity into the matrix, appending a row if it is new."""
+        for aid in entity.attributes:
+            self._ensure_attribute_column(aid)
+
+        row = self._entity_index.get(entity.id)
+        if row is None:
+            row = len(self._entity_ids)
+            self._entity_index[entity.id] = row
+            self._entity_ids.append(entity.id)
+            new_row = np.full(
+                (1, self._matrix.shape[1]), DEFAULT_PROBABILITY, dtype=MATRIX_DTYPE
+            )
+            self._matrix = np.vstack([self._matrix, new_row])
+        else:
+            self._matrix[row, :] = DEFAULT_PROBABILITY
+        self._fill_row(row, entity)
+        self.version += 1
+        self._uncopied_entities.add(entity.id)
+
+    def __getstate__(self) -> dict:
+        # Locks cannot be pickled (e.g. when sending the KB to worker processes)
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        Dense P(yes|entity, attr) matrix of shape (entities, attributes).
+
+        Rows follow `entity_ids` and columns follow `attribute_ids`. Treat it
+        as read-only; use set_attribute_value() to change weights.
+        """
+        return self._matrix
+
+    @property
+    def entity_ids(self) -> List[str]:
+        """Entity IDs in matrix row order."""
+        return self._entity_ids
+
+    @property
+    def entity_index(self) -> Dict[str, int]:
+        """Mapping of entity ID -> matrix row."""
+        return self._entity_index
+
+    @property
+    def attribute_ids(self) -> List[str]:
+        """Attribute IDs in matrix column order."""
+        return self._attribute_ids
+
+    def get_entity_index(self, entity_id: str) -> Optional[int]:
+        """Get the matrix row of an entity, or None if unknown."""
+        return self._entity_index.get(entity_id)
+
+    def get_attribute_index(self, attr_id: str) -> Optional[int]:
+        """Get the matrix column of an attribute, or None if unknown."""
+        return self._attribute_index.get(attr_id)
+
+    def get_attribute_column(self, attr_id: str) -> Optional[np.ndarray]:
+        """Get P(yes|entity) for every entity as a column view, or None if unknown."""
+        col = self._attribute_index.get(attr_id)
+        if col is None:
+            return None
+        return self._matrix[:, col]
+
+    def set_attribute_value(self, entity_id: str, attr_id: str, value: float) -> None:
+        """
+        Set P(yes|entity) for one attribute, keeping the matrix in sync.
+
+        Args:
+            entity_id: The entity to update
+            attr_id: The attribute to update
+            value: New probability value
+        """
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            return
+        value = float(value)
+        entity.attributes[attr_id] = value
+        col = self._ensure_attribute_column(attr_id)
+        self._matrix[self._entity_index[entity_id], col] = value
+        self.version += 1
+        self._dirty_entities.setdefault(entity_id, set()).add(attr_id)
+        self._uncopied_entities.add(entity_id)
+
+    def record_play(self, entity_id: str, guessed_correctly: bool) -> None:
+        """
+        Count a game played with an entity as the target.
+
+        Args:
+            entity_id: The target entity
+            guessed_correctly: Whether the system guessed it
+        """
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            return
+        entity.times_played += 1
+        if guessed_correctly:
+            entity.times_guessed_correctly += 1
+        self._dirty_entities.setdefault(entity_id, set())
+        self._uncopied_entities.add(entity_id)
+
+    def record_answer(self, attribute_id: str, answer: float) -> None:
+        """
+        Count an answer given to a question in a learned game.
+
+        Args:
+            attribute_id: The question that was answered
+            answer: The answer (0.3 to 0.7 counts as "maybe")
+        """
+        attribute = self.attributes.get(attribute_id)
+        if attribute is None:
+            return
+        attribute.times_asked += 1
+        if 0.3 <= answer <= 0.7:
+            attribute.times_maybe += 1
+        self.answer_stats_version += 1
+        self._answered_attributes[attribute_id] = None
+        self._uncopied_attributes.add(attribute_id)
+
+    def sync_entity(self, entity_id: str) -> None:
+        """Re-sync an entity's matrix row after its attribute dict was edited directly."""
+        entity = self.entities.get(entity_id)
+        if entity is not None:
+            self._sync_entity_row(entity)
+            self._replaced_entities.add(entity_id)
+
+    def has_unsaved_changes(self) -> bool:
+        """Check whether anything changed since the last save."""
+        return bool(
+            self._dirty_entities or self._replaced_entities
+            or self._new_attributes or self._answered_attributes
+        )
+
+    def _build_dirty_records(self) -> List[dict]:
+        """
+        Build one journal record per change since the last save.
+
+        Entities replaced wholesale get a full entity record; entities that
+        only had weights or statistics changed get an update record holding
+        just the changed attributes.
+        """
+        records = [
+            {"op": RECORD_ATTRIBUTE, "attribute": self.attributes[attr_id].to_dict()}
+            for attr_id in self._new_attributes
+            if attr_id in self.attributes
         ]
+        for entity_id in self._replaced_entities:
+            entity = self.entities.get(entity_id)
+            if entity is not None:
+                records.append({"op": RECORD_ENTITY, "entity": entity.to_dict()})
+        for entity_id, attr_ids in self._dirty_entities.items():
+            entity = self.entities.get(entity_id)
+            if entity is None or entity_id in self._replaced_entities:
+                continue
+            records.append({
+                "op": RECORD_UPDATE,
+                "e": entity_id,
+                "v": {aid: entity.attributes[aid] for aid in attr_ids},
+                "p": entity.times_played,
+                "c": entity.times_guessed_correctly,
+            })
+        for attr_id in self._answered_attributes:
+            attribute = self.attributes.get(attr_id)
+            if attribute is not None:
+                records.append({
+                    "op": RECORD_ANSWERS,
+                    "a": attr_id,
+                    "n": attribute.times_asked,
+                    "m": attribute.times_maybe,
+                })
+        return records
 
-        learned_data = {"entities": learned_entities}
+    def _clear_dirty(self) -> None:
+        """Mark all changes as saved; the changed entities now belong in learned.json."""
+        for entity_id in self._replaced_entities:
+            self._learned_entities[entity_id] = None
+        for entity_id in self._dirty_entities:
+            self._learned_entities[entity_id] = None
+        self._dirty_entities = {}
+        self._replaced_entities = set()
+        self._new_attributes = []
+        self._answered_attributes = {}
 
-        # Write to temp file first, then rename for atomic operation
-        temp_file = self.learned_file.with_suffix('.json.tmp')
-        try:
-            with open(temp_file, "w") as f:
-                json.dump(learned_data, f, indent=2)
-            # Atomic rename to prevent corruption on crash
-            temp_file.replace(self.learned_file)
-        except IOError as e:
-            print(f"Warning: Failed to save learned file: {e}")
-            if temp_file.exists():
-                temp_file.unlink()
+    def content_hash(self) -> str:
+        """
+        Get a hash of the entity/attribute layout and probability values.
+
+        Derived data (such as the opening book) stores this to detect that
+        the knowledge base changed since it was built. Cached per version.
+        """
+        if self._content_hash_version != self.version:
+            digest = hashlib.sha256()
+            digest.update("\n".join(self._entity_ids).encode("utf-8"))
+            digest.update(b"\0")
+            digest.update("\n".join(self._attribute_ids).encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(np.ascontiguousarray(self._matrix).tobytes())
+            self._content_hash = digest.hexdigest()
+            self._content_hash_version = self.version
+        return self._content_hash
+
+    def frozen_copy(self, previous: Optional["KnowledgeBase"] = None) -> "KnowledgeBase":
+        """
+        Copy the knowledge base for readers that must not see later changes.
+
+        The matrix and the index maps are copied. When previous is the last
+        copy made by this method, only entities and attributes changed since
+        then are copied, and the rest are shared with previous; otherwise
+        all of them are. Copies never save and their matrix is read-only, so
+        the shared objects are never modified.
+
+        Args:
+            previous: The last copy made from this knowledge base, if any
+
+        Returns:
+            The read-only copy
+        """
+        with self.lock:
+            frozen = copy.copy(self)
+            frozen.lock = threading.RLock()
+            frozen.autosave = False
+            frozen._matrix = self._matrix.copy()
+            frozen._matrix.setflags(write=False)
+            frozen._entity_ids = list(self._entity_ids)
+            frozen._attribute_ids = list(self._attribute_ids)
+            frozen._entity_index = dict(self._entity_index)
+            frozen._attribute_index = dict(self._attribute_index)
+            frozen._original_attribute_ids = set(self._original_attribute_ids)
+            frozen._dirty_entities = {}
+            frozen._replaced_entities = set()
+            frozen._new_attributes = []
+            frozen._answered_attributes = {}
+            frozen._learned_entities = {}
+            frozen._uncopied_entities = set()
+            frozen._uncopied_attributes = set()
 
-    def _get_original_attribute(self, entity_id: str, attr_id: str) -> Optional[float]:
-        """Get original attribute value from cached base data (for comparison)."""
-        original_attrs = self._original_entities.get(entity_id, {})
-        return original_attrs.get(attr_id)
+            if previous is not None and previous._copy_epoch == self._copy_epoch:
+                frozen.entities = {
+                    eid: copy.deepcopy(entity) if eid in self._uncopied_entities
+                    else previous.entities[eid]
+                    for eid, entity in self.entities.items()
+                }
+                frozen.attributes = {
+                    aid: copy.deepcopy(attribute) if aid in self._uncopied_attributes
+                    else previous.attributes[aid]
+                    for aid, attribute in self.attributes.items()
+                }
+            else:
+                frozen.entities = copy.deepcopy(self.entities)
+                frozen.attributes = copy.deepcopy(self.attributes)
+
+            self._uncopied_entities = set()
+            self._uncopied_attributes = set()
+            self._copy_epoch += 1
+            frozen._copy_epoch = self._copy_epoch
+            return frozen
+
+    def save(self) -> None:
+        """
+        Persist changes made since the last save.
+
+        Appends a record per dirty entity to learned.journal, and compacts
+        the journal into learned.json once it exceeds the threshold. Cost is
+        proportional to the changes, not to the size of the catalog.
+        """
+        with self.lock:
+            if self.has_unsaved_changes():
+                records = self._build_dirty_records()
+                lines = "".join(
+                    json.dumps(record, separators=(",", ":")) + "\n"
+                    for record in records
+                )
+                try:
+                    with open(self.journal_file, "a+b") as f:
+                        # Never continue a line left unterminated by an earlier write
+                        if f.seek(0, os.SEEK_END) > 0:
+                            f.seek(-1, os.SEEK_END)
+                            if f.read(1) != b"\n":
+                                lines = "\n" + lines
+                        f.write(lines.encode("utf-8"))
+                except IOError as e:
+                    print(f"Warning: Failed to append to learning journal: {e}")
+                    return
+                self._clear_dirty()
+                self._journal_length += len(records)
+
+            if self._journal_length >= self.journal_compact_threshold:
+                self.compact()
+
+    def compact(self) -> None:
+        """
+        Fold all learned data into a fresh learned.json snapshot and clear the journal.
+
+        The snapshot is written before the journal is removed; journal records
+        hold absolute values, so a crash in between only replays them again.
+        """
+        with self.lock:
+            learned_ids = dict(self._learned_entities)
+            learned_ids.update(dict.fromkeys(self._replaced_entities))
+            learned_ids.update(dict.fromkeys(self._dirty_entities))
+            learned_entities = [
+                self.entities[eid].to_dict() for eid in learned_ids
+                if eid in self.entities
+            ]
+            learned_attributes = [
+                a.to_dict() for a in self.attributes.values()
+                if a.id not in self._original_attribute_ids
+            ]
+
+            answer_counts = {
+                a.id: [a.times_asked, a.times_maybe]
+                for a in self.attributes.values() if a.times_asked
+            }
+
+            learned_data = {
+                "entities": learned_entities,
+                "attributes": learned_attributes,
+                "answer_counts": answer_counts,
+            }
+
+            # Write to temp file first, then rename for atomic operation
+            temp_file = self.learned_file.with_suffix('.json.tmp')
+            try:
+                with open(temp_file, "w") as f:
+                    json.dump(learned_data, f, indent=2)
+                # Atomic rename to prevent corruption on crash
+                temp_file.replace(self.learned_file)
+            except IOError as e:
+                print(f"Warning: Failed to save learned file: {e}")
+                if temp_file.exists():
+                    temp_file.unlink()
+                return
+
+            # Unsaved changes are part of the snapshot now
+            self._clear_dirty()
+            try:
+                self.journal_file.unlink(missing_ok=True)
+            except IOError as e:
+                print(f"Warning: Failed to clear learning journal: {e}")
+                return
+            self._journal_length = 0
 
     def get_entity(self, entity_id: str) -> Optional[Entity]:
         """Get an entity by ID."""
@@ -140,18 +728,28 @@ class KnowledgeBase:
     def add_entity(self, entity: Entity) -> None:
         """Add a new entity to the knowledge base."""
         self.entities[entity.id] = entity
-        self.save()
+        self._sync_entity_row(entity)
+        self._replaced_entities.add(entity.id)
+        if self.autosave:
+            self.save()
 
     def add_attribute(self, attribute: Attribute) -> None:
         """Add a new attribute to the knowledge base."""
         self.attributes[attribute.id] = attribute
+        self._ensure_attribute_column(attribute.id)
+        self._uncopied_attributes.add(attribute.id)
         # Save to learned file as well
-        self.save()
+        self._new_attributes.append(attribute.id)
+        if self.autosave:
+            self.save()
 
     def update_entity(self, entity: Entity) -> None:
         """Update an existing entity."""
         self.entities[entity.id] = entity
-        self.save()
+        self._sync_entity_row(entity)
+        self._replaced_entities.add(entity.id)
+        if self.autosave:
+            self.save()
 
     def get_entity_count(self) -> int:
         """Get total number of entities."""
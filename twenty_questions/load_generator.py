@@ -0,0 +1,222 @@
+"""
+Load generator for the 20 Questions game server.
+
+Simulates concurrent players against a running server: each player opens
+its own connection and plays games back to back, answering questions the
+way Trainer does for a target drawn from a local copy of the knowledge
+base. Reports throughput and per-request latency percentiles.
+
+Games are not reported back by default, so a load test does not change
+the server's knowledge base; pass --learn to include guess_result
+requests.
+
+Usage: python -m twenty_questions.load_generator [--host H] [--port P | --unix PATH]
+                                                 [--players N] [--games N] [--learn]
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .knowledge_base import KnowledgeBase
+from .trainer import Trainer
+from .server import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE_BYTES
+
+
+@dataclass
+class LoadReport:
+    """Results of a load test."""
+    players: int = 0
+    games: int = 0
+    correct: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    # op -> per-request latencies in seconds
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    # Server posterior cache counters after the run
+    cache_stats: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        return sum(len(times) for times in self.latencies.values())
+
+    def percentile(self, fraction: float, op: Optional[str] = None) -> float:
+        """Latency percentile in seconds, for one op or over all requests."""
+        if op is not None:
+            times = sorted(self.latencies.get(op, []))
+        else:
+            times = sorted(t for op_times in self.latencies.values() for t in op_times)
+        if not times:
+            return 0.0
+        return times[min(len(times) - 1, int(fraction * len(times)))]
+
+    def print_summary(self) -> None:
+        """Print throughput and latency percentiles."""
+        elapsed = max(self.elapsed, 1e-9)
+        print(f"Players: {self.players}  Games: {self.games}  "
+              f"Correct: {self.correct}  Errors: {self.errors}")
+        print(f"Elapsed: {self.elapsed:.2f}s  "
+              f"Throughput: {self.requests / elapsed:.1f} req/s, {self.games / elapsed:.2f} games/s")
+        print(f"\n{'op':16s} {'count':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+        for op in list(self.latencies) + [None]:
+            times = self.latencies[op] if op is not None else None
+            count = len(times) if times is not None else self.requests
+            print(f"{op or 'all':16s} {count:7d} "
+                  f"{self.percentile(0.50, op) * 1000:8.2f} "
+                  f"{self.percentile(0.95, op) * 1000:8.2f} "
+                  f"{self.percentile(0.99, op) * 1000:8.2f} "
+                  f"{self.percentile(1.0, op) * 1000:8.2f}")
+        if self.cache_stats:
+            print(f"\nServer posterior cache: {self.cache_stats['entries']} entries, "
+                  f"hit rate {self.cache_stats['hit_rate'] * 100:.1f}% "
+                  f"(posteriors {self.cache_stats['posterior_hits']}/"
+                  f"{self.cache_stats['posterior_hits'] + self.cache_stats['posterior_misses']}, "
+                  f"questions {self.cache_stats['question_hits']}/"
+                  f"{self.cache_stats['question_hits'] + self.cache_stats['question_misses']})")
+
+
+class _Connection:
+    """A client connection that times every request."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, report: LoadReport):
+        self.reader = reader
+        self.writer = writer
+        self.report = report
+
+    async def request(self, op: str, **fields) -> dict:
+        start = time.perf_counter()
+        self.writer.write(json.dumps(dict(fields, op=op)).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        self.report.latencies.setdefault(op, []).append(time.perf_counter() - start)
+        if not line:
+            raise ConnectionError("server closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            self.report.errors += 1
+        return response
+
+
+async def _play(
+    conn: _Connection,
+    trainer: Trainer,
+    rng: random.Random,
+    games: int,
+    learn: bool
+) -> None:
+    """Play games back to back on one connection."""
+    entities = trainer.kb.get_all_entities()
+    for _ in range(games):
+        target = rng.choice(entities)
+        started = await conn.request("start_game")
+        if not started.get("ok"):
+            continue
+        session = started["session"]
+
+        while True:
+            reply = await conn.request("next_question", session=session)
+            if not reply.get("ok") or reply.get("question") is None:
+                break
+            attribute_id = reply["question"]["attribute_id"]
+            answer = trainer.get_target_answer(target, attribute_id)
+            await conn.request("answer", session=session, attribute_id=attribute_id, answer=answer)
+
+        guess = reply.get("guess") if reply.get("ok") else None
+        correct = guess is not None and guess["entity_id"] == target.id
+        conn.report.games += 1
+        conn.report.correct += int(correct)
+        if learn and guess is not None:
+            await conn.request(
+                "guess_result", session=session, correct=correct, actual_name=target.name
+            )
+        await conn.request("end_session", session=session)
+
+
+async def run_load(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_path: Optional[str] = None,
+    players: int = 10,
+    games_per_player: int = 5,
+    data_dir: Optional[str] = None,
+    learn: bool = False,
+    seed: Optional[int] = None
+) -> LoadReport:
+    """
+    Run concurrent simulated players against a server.
+
+    Args:
+        host: Server host (TCP)
+        port: Server port (TCP)
+        unix_path: Server Unix socket (used instead of TCP if given)
+        players: Concurrent connections, one player each
+        games_per_player: Games each player plays
+        data_dir: Knowledge base the simulated players draw targets from;
+                  should match the server's
+        learn: Report guess results so the server learns from the games
+        seed: Seed for target selection
+
+    Returns:
+        The load report
+    """
+    trainer = Trainer(KnowledgeBase(data_dir))
+    report = LoadReport(players=players)
+    rng = random.Random(seed)
+
+    async def connect():
+        if unix_path is not None:
+            return await asyncio.open_unix_connection(unix_path, limit=MAX_LINE_BYTES)
+        return await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+
+    async def player(player_rng: random.Random) -> None:
+        reader, writer = await connect()
+        try:
+            await _play(_Connection(reader, writer, report), trainer, player_rng, games_per_player, learn)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(player(random.Random(rng.random())) for _ in range(players)))
+    report.elapsed = time.perf_counter() - start
+
+    # Outside the timed run, so it does not count towards the latencies
+    reader, writer = await connect()
+    try:
+        stats = await _Connection(reader, writer, LoadReport()).request("stats")
+        report.cache_stats = stats.get("posterior_cache") or {}
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load test the 20 Questions game server')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Server host')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Server port')
+    parser.add_argument('--unix', default=None, help='Connect to this Unix socket instead of TCP')
+    parser.add_argument('--players', type=int, default=10, help='Concurrent players')
+    parser.add_argument('--games', type=int, default=5, help='Games per player')
+    parser.add_argument('--learn', action='store_true', help='Report guess results to the server')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for target selection')
+    parser.add_argument('--data-dir', default=None, help='Knowledge base data directory')
+
+    args = parser.parse_args()
+
+    load_report = asyncio.run(run_load(
+        host=args.host,
+        port=args.port,
+        unix_path=args.unix,
+        players=args.players,
+        games_per_player=args.games,
+        data_dir=args.data_dir,
+        learn=args.learn,
+        seed=args.seed
+    ))
+    load_report.print_summary()
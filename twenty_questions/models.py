@@ -5,8 +5,11 @@ Defines the core data structures: Entity, Attribute, and BeliefState.
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import copy
+import heapq
+
+import numpy as np
 
 
 @dataclass
@@ -73,12 +76,29 @@ class Attribute:
         category: Category for organization (e.g., "biology", "habitat")
         alpha: Beta distribution parameter (prior successes + 1)
         beta: Beta distribution parameter (prior failures + 1)
+        times_asked: Times the question was answered in learned games
+        times_maybe: How many of those answers were "maybe"
     """
     id: str
     question: str
     category: str = "general"
     alpha: float = 1.0  # Beta distribution param
     beta: float = 1.0   # Beta distribution param
+    times_asked: int = 0
+    times_maybe: int = 0
+
+    def get_maybe_rate(self, prior_rate: float = 0.0, prior_weight: float = 10.0) -> float:
+        """
+        Estimate how often players answer this question with "maybe".
+
+        Args:
+            prior_rate: Rate assumed before any answers are seen
+            prior_weight: Number of pseudo-answers the prior counts as
+
+        Returns:
+            The smoothed maybe rate (0.0 to 1.0)
+        """
+        return (self.times_maybe + prior_rate * prior_weight) / (self.times_asked + prior_weight)
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -88,6 +108,8 @@ class Attribute:
             "category": self.category,
             "alpha": self.alpha,
             "beta": self.beta,
+            "times_asked": self.times_asked,
+            "times_maybe": self.times_maybe,
         }
 
     @classmethod
@@ -99,6 +121,8 @@ class Attribute:
             category=data.get("category", "general"),
             alpha=data.get("alpha", 1.0),
             beta=data.get("beta", 1.0),
+            times_asked=data.get("times_asked", 0),
+            times_maybe=data.get("times_maybe", 0),
         )
 
 
@@ -119,18 +143,36 @@ class BeliefState:
                 self.probabilities[k] /= total
 
     def get_top_entities(self, n: int = 5) -> list:
-        """Get top n entities by probability."""
-        sorted_entities = sorted(
-            self.probabilities.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        return sorted_entities[:n]
+        """
+        Get top n entities by probability.
+
+        Ties keep insertion order, as in a stable descending sort.
+        """
+        return heapq.nlargest(n, self.probabilities.items(), key=lambda x: x[1])
 
     def get_probability(self, entity_id: str) -> float:
         """Get probability for a specific entity."""
         return self.probabilities.get(entity_id, 0.0)
 
+    def get_rank(self, entity_id: str) -> Optional[int]:
+        """
+        Get the 1-based rank of an entity, as its position in get_top_entities().
+
+        Returns:
+            The rank, or None if the entity is not in the distribution
+        """
+        prob = self.probabilities.get(entity_id)
+        if prob is None:
+            return None
+        rank = 1
+        before = True
+        for other_id, other_prob in self.probabilities.items():
+            if other_id == entity_id:
+                before = False
+            elif other_prob > prob or (before and other_prob == prob):
+                rank += 1
+        return rank
+
     def get_max_probability(self) -> tuple:
         """Get the entity with highest probability and its value."""
         if not self.probabilities:
@@ -138,6 +180,10 @@ class BeliefState:
         max_entity = max(self.probabilities.items(), key=lambda x: x[1])
         return max_entity
 
+    def num_entities(self) -> int:
+        """Get the number of entities in the distribution."""
+        return len(self.probabilities)
+
     def copy(self) -> "BeliefState":
         """Create a deep copy of the belief state."""
         return BeliefState(probabilities=copy.deepcopy(self.probabilities))
@@ -152,6 +198,288 @@ class BeliefState:
         return cls(probabilities={eid: prob for eid in entity_ids})
 
 
+# Longer vectors use partial selection in _top_indices
+_PARTIAL_SELECT_MIN = 512
+
+
+def _top_indices(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n largest values, ordered as a stable descending sort would.
+
+    Selects with argpartition and only sorts the selection, plus any values
+    tied with the n-th largest so ties still go to the lower index. Short
+    vectors are sorted outright, which is faster below a few hundred rows.
+    """
+    if n >= len(values) or len(values) <= _PARTIAL_SELECT_MIN:
+        return np.argsort(-values, kind="stable")[:n]
+    if n <= 0:
+        return np.zeros(0, dtype=np.intp)
+    kth = values[np.argpartition(-values, n - 1)[n - 1]]
+    candidates = np.flatnonzero(values >= kth)
+    order = np.argsort(-values[candidates], kind="stable")[:n]
+    return candidates[order]
+
+
+def _rank_of(values: np.ndarray, i: int) -> int:
+    """1-based position of values[i] in a stable descending sort, without sorting."""
+    value = values[i]
+    return 1 + int((values > value).sum()) + int((values[:i] == value).sum())
+
+
+class VectorBeliefState(BeliefState):
+    """
+    Array-backed probability distribution over entities.
+
+    `vector[i]` is the probability of `entity_ids[i]`, aligned to the rows of
+    the knowledge base matrix. The `probabilities` dict is a read-only view
+    built on demand for compatibility with dict-based callers.
+    """
+
+    def __init__(
+        self,
+        vector: np.ndarray,
+        entity_ids: List[str],
+        entity_index: Dict[str, int]
+    ):
+        """
+        Args:
+            vector: Probability per entity row
+            entity_ids: Entity IDs in row order (may extend past the vector)
+            entity_index: Mapping of entity ID -> row
+        """
+        self.vector = vector
+        self.entity_ids = entity_ids
+        self.entity_index = entity_index
+        self._view: Optional[Dict[str, float]] = None
+
+    @property
+    def probabilities(self) -> Dict[str, float]:
+        """Dict view of the distribution (do not mutate)."""
+        if self._view is None:
+            self._view = dict(zip(self.entity_ids, self.vector.tolist()))
+        return self._view
+
+    def normalize(self) -> None:
+        """Normalize probabilities to sum to 1.0."""
+        total = self.vector.sum()
+        if total > 0:
+            self.vector = self.vector / total
+            self._view = None
+
+    def get_top_entities(self, n: int = 5) -> list:
+        """Get top n entities by probability."""
+        order = _top_indices(self.vector, n)
+        return [(self.entity_ids[i], float(self.vector[i])) for i in order]
+
+    def get_probability(self, entity_id: str) -> float:
+        """Get probability for a specific entity."""
+        i = self.entity_index.get(entity_id)
+        if i is None or i >= len(self.vector):
+            return 0.0
+        return float(self.vector[i])
+
+    def get_rank(self, entity_id: str) -> Optional[int]:
+        """
+        Get the 1-based rank of an entity, as its position in get_top_entities().
+
+        Returns:
+            The rank, or None if the entity is not in the distribution
+        """
+        i = self.entity_index.get(entity_id)
+        if i is None or i >= len(self.vector):
+            return None
+        return _rank_of(self.vector, i)
+
+    def get_max_probability(self) -> tuple:
+        """Get the entity with highest probability and its value."""
+        if len(self.vector) == 0:
+            return None, 0.0
+        i = int(np.argmax(self.vector))
+        return self.entity_ids[i], float(self.vector[i])
+
+    def num_entities(self) -> int:
+        """Get the number of entities in the distribution."""
+        return len(self.vector)
+
+    def copy(self) -> "VectorBeliefState":
+        """Create a copy of the belief state."""
+        return VectorBeliefState(self.vector.copy(), self.entity_ids, self.entity_index)
+
+
+class LogBeliefState(VectorBeliefState):
+    """
+    Belief state stored as unnormalized log-probabilities.
+
+    Updates only add log-likelihoods, so long games cannot underflow and no
+    normalization pass runs per update. The normalized `vector` is computed
+    with log-sum-exp the first time probabilities are read, then cached.
+    """
+
+    def __init__(
+        self,
+        log_weights: np.ndarray,
+        entity_ids: List[str],
+        entity_index: Dict[str, int]
+    ):
+        """
+        Args:
+            log_weights: Unnormalized log-probability per entity row
+            entity_ids: Entity IDs in row order (may extend past the vector)
+            entity_index: Mapping of entity ID -> row
+        """
+        self.log_weights = log_weights
+        self.entity_ids = entity_ids
+        self.entity_index = entity_index
+        self._view: Optional[Dict[str, float]] = None
+        self._vector: Optional[np.ndarray] = None
+
+    @property
+    def vector(self) -> np.ndarray:
+        """Normalized probabilities, computed lazily via log-sum-exp."""
+        if self._vector is None:
+            if len(self.log_weights) == 0 or not np.isfinite(self.log_weights.max()):
+                self._vector = np.zeros(len(self.log_weights))
+            else:
+                weights = np.exp(self.log_weights - self.log_weights.max())
+                self._vector = weights / weights.sum()
+        return self._vector
+
+    def log_normalizer(self) -> float:
+        """Get log of the sum of the unnormalized weights."""
+        if len(self.log_weights) == 0:
+            return float("-inf")
+        shift = self.log_weights.max()
+        if not np.isfinite(shift):
+            return float(shift)
+        return float(shift + np.log(np.exp(self.log_weights - shift).sum()))
+
+    def normalize(self) -> None:
+        """Shift the log weights so they sum to probability 1.0."""
+        log_total = self.log_normalizer()
+        if np.isfinite(log_total):
+            self.log_weights = self.log_weights - log_total
+
+    def copy(self) -> "LogBeliefState":
+        """Create a copy of the belief state."""
+        return LogBeliefState(self.log_weights.copy(), self.entity_ids, self.entity_index)
+
+
+class ActiveBeliefState(VectorBeliefState):
+    """
+    Belief state restricted to an active set of entity rows.
+
+    Entities whose probability fell below a cutoff relative to the top are
+    pruned: they have zero probability here and updates skip them. To be
+    able to bring them back, the state keeps the full distribution as of the
+    last pruning (`checkpoint`) and the answers applied since (`deferred`),
+    plus `bound`, an upper bound on any pruned entity's probability.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        active: np.ndarray,
+        size: int,
+        entity_ids: List[str],
+        entity_index: Dict[str, int],
+        checkpoint: np.ndarray,
+        deferred: tuple = (),
+        bound: float = 0.0
+    ):
+        """
+        Args:
+            values: Probability per active row (sums to 1.0)
+            active: Active entity rows, in increasing order
+            size: Number of rows in the full distribution
+            entity_ids: Entity IDs in row order (may extend past `size`)
+            entity_index: Mapping of entity ID -> row
+            checkpoint: Full distribution when the active set was last chosen
+            deferred: (attribute_id, answer) pairs applied since the checkpoint
+            bound: Upper bound on the probability of any pruned row
+        """
+        self.values = values
+        self.active = active
+        self.size = size
+        self.entity_ids = entity_ids
+        self.entity_index = entity_index
+        self.checkpoint = checkpoint
+        self.deferred = deferred
+        self.bound = bound
+        self._view: Optional[Dict[str, float]] = None
+        self._vector: Optional[np.ndarray] = None
+
+    @property
+    def vector(self) -> np.ndarray:
+        """Full-length probabilities (zero for pruned rows), built on first use."""
+        if self._vector is None:
+            vector = np.zeros(self.size)
+            vector[self.active] = self.values
+            self._vector = vector
+        return self._vector
+
+    def normalize(self) -> None:
+        """Normalize the active probabilities to sum to 1.0."""
+        total = self.values.sum()
+        if total > 0:
+            self.values = self.values / total
+            self._vector = None
+            self._view = None
+
+    def get_top_entities(self, n: int = 5) -> list:
+        """Get top n entities by probability."""
+        order = _top_indices(self.values, n)
+        top = [(self.entity_ids[self.active[i]], float(self.values[i])) for i in order]
+        if len(top) < n and len(self.active) < self.size:
+            # Pruned rows follow the active ones, tied at zero in row order
+            pruned = np.setdiff1d(np.arange(self.size), self.active, assume_unique=True)
+            top.extend((self.entity_ids[row], 0.0) for row in pruned[:n - len(top)])
+        return top
+
+    def get_probability(self, entity_id: str) -> float:
+        """Get probability for a specific entity."""
+        row = self.entity_index.get(entity_id)
+        if row is None:
+            return 0.0
+        i = int(np.searchsorted(self.active, row))
+        if i < len(self.active) and self.active[i] == row:
+            return float(self.values[i])
+        return 0.0
+
+    def get_rank(self, entity_id: str) -> Optional[int]:
+        """
+        Get the 1-based rank of an entity, as its position in get_top_entities().
+
+        Returns:
+            The rank, or None if the entity is not in the distribution
+        """
+        row = self.entity_index.get(entity_id)
+        if row is None or row >= self.size:
+            return None
+        i = int(np.searchsorted(self.active, row))
+        if i < len(self.active) and self.active[i] == row:
+            return _rank_of(self.values, i)
+        # Pruned: after every active row, then by row among the pruned ones
+        return len(self.active) + 1 + (row - i)
+
+    def get_max_probability(self) -> tuple:
+        """Get the entity with highest probability and its value."""
+        if len(self.values) == 0:
+            return None, 0.0
+        i = int(np.argmax(self.values))
+        return self.entity_ids[self.active[i]], float(self.values[i])
+
+    def num_entities(self) -> int:
+        """Get the number of entities in the distribution, pruned ones included."""
+        return self.size
+
+    def copy(self) -> "ActiveBeliefState":
+        """Create a copy of the belief state."""
+        return ActiveBeliefState(
+            self.values.copy(), self.active, self.size, self.entity_ids,
+            self.entity_index, self.checkpoint, self.deferred, self.bound
+        )
+
+
 @dataclass
 class GameSession:
     """
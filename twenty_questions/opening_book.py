@@ -0,0 +1,267 @@
+"""
+Opening Book for the 20 Questions game.
+
+Every live game starts from the same uniform prior, so the first few
+questions are a deterministic function of the answers given so far. The
+opening book precomputes them offline as a tree of answer paths ->
+(next question, posterior snapshot), stored next to entities.json and
+tied to a hash of the knowledge base so it is ignored once the KB changes.
+
+Usage: python -m twenty_questions.opening_book [--plies N] [--data-dir DIR]
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .models import BeliefState
+from .implications import KnownAnswers
+
+
+# File name of the opening book inside the knowledge base data directory
+BOOK_FILENAME = "opening_book.json"
+
+# Number of questions covered by the book
+DEFAULT_PLIES = 3
+
+# Answers expanded at every node: yes, no, maybe
+BOOK_ANSWERS = (1.0, 0.0, 0.5)
+
+BOOK_FORMAT_VERSION = 1
+
+
+@dataclass
+class BookNode:
+    """
+    A position in the opening book.
+
+    Attributes:
+        posterior: Beliefs after the answers leading here, aligned to KB rows
+        question: Next question to ask (None if the selector found none)
+        has_question: False for leaves, whose next question was not computed
+    """
+    posterior: np.ndarray
+    question: Optional[str] = None
+    has_question: bool = False
+
+
+class OpeningBook:
+    """
+    Precomputed question tree for the opening plies of a game.
+    """
+
+    def __init__(self, fingerprint: str, plies: int, nodes: Dict[str, BookNode]):
+        """
+        Initialize the opening book.
+
+        Args:
+            fingerprint: Hash of the KB content and selection settings it was built for
+            plies: Number of questions covered
+            nodes: Mapping of path key -> node
+        """
+        self.fingerprint = fingerprint
+        self.plies = plies
+        self.nodes = nodes
+
+    @staticmethod
+    def path_key(answer_path: Sequence[Tuple[str, float]]) -> str:
+        """
+        Build the lookup key for a sequence of (attribute_id, answer) pairs.
+
+        Answers are reduced to yes/no/maybe, the only distinction the
+        belief update, implications and tier logic make.
+        """
+        parts = []
+        for attr_id, answer in answer_path:
+            outcome = "y" if answer > 0.7 else "n" if answer < 0.3 else "m"
+            parts.append(f"{attr_id}={outcome}")
+        return "/".join(parts)
+
+    @staticmethod
+    def compute_fingerprint(knowledge_base, belief_tracker, min_info_gain: float) -> str:
+        """
+        Hash everything the book's contents depend on.
+
+        Covers the KB content hash, the uniform prior, the belief tracker's
+        likelihood settings and the selector's information gain threshold.
+        """
+        settings = (
+            f"uniform:{belief_tracker.smoothing!r}:"
+            f"{belief_tracker.unknown_likelihood!r}:{min_info_gain!r}"
+        )
+        digest = hashlib.sha256()
+        digest.update(knowledge_base.content_hash().encode("ascii"))
+        digest.update(settings.encode("ascii"))
+        return digest.hexdigest()
+
+    def get_node(self, answer_path: Sequence[Tuple[str, float]]) -> Optional[BookNode]:
+        """Get the node reached by an answer path, or None if outside the book."""
+        return self.nodes.get(self.path_key(answer_path))
+
+    def get_question(
+        self,
+        answer_path: Sequence[Tuple[str, float]]
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Look up the next question for an answer path.
+
+        Returns:
+            (found, question); question may be None when found is True,
+            meaning no question passes the selection criteria
+        """
+        node = self.get_node(answer_path)
+        if node is None or not node.has_question:
+            return (False, None)
+        return (True, node.question)
+
+    def get_posterior(self, answer_path: Sequence[Tuple[str, float]]) -> Optional[np.ndarray]:
+        """Get the posterior snapshot for an answer path, or None if outside the book."""
+        node = self.get_node(answer_path)
+        return node.posterior if node is not None else None
+
+    @classmethod
+    def build(
+        cls,
+        knowledge_base,
+        belief_tracker,
+        question_selector,
+        plies: int = DEFAULT_PLIES
+    ) -> "OpeningBook":
+        """
+        Build the book by playing out every yes/no/maybe path from the uniform prior.
+
+        Args:
+            knowledge_base: The knowledge base to build for
+            belief_tracker: Belief tracker used by live games
+            question_selector: Question selector used by live games
+            plies: Number of questions to cover
+
+        Returns:
+            The new opening book
+        """
+        nodes: Dict[str, BookNode] = {}
+        known = KnownAnswers(question_selector.implication_engine)
+
+        def expand(
+            path: List[Tuple[str, float]],
+            beliefs: BeliefState,
+            asked: Set[str]
+        ) -> None:
+            node = BookNode(posterior=belief_tracker.as_vector(beliefs).vector.copy())
+            nodes[cls.path_key(path)] = node
+            if len(path) >= plies:
+                return
+
+            question = question_selector.select_best_question(beliefs, asked, known)
+            node.question = question
+            node.has_question = True
+            if question is None:
+                return
+
+            for answer in BOOK_ANSWERS:
+                checkpoint = known.checkpoint()
+                known.add_answer(question, answer)
+                expand(
+                    path + [(question, answer)],
+                    belief_tracker.update_beliefs(beliefs, question, answer),
+                    asked | {question}
+                )
+                known.rollback(checkpoint)
+
+        expand([], belief_tracker.initialize_beliefs(), set())
+
+        fingerprint = cls.compute_fingerprint(
+            knowledge_base, belief_tracker, question_selector.min_info_gain
+        )
+        return cls(fingerprint, plies, nodes)
+
+    def save(self, path) -> None:
+        """Save the book to a JSON file (atomically, via a temp file)."""
+        path = Path(path)
+        nodes = {}
+        for key, node in self.nodes.items():
+            data = {"posterior": node.posterior.tolist()}
+            if node.has_question:
+                data["question"] = node.question
+            nodes[key] = data
+
+        book_data = {
+            "format": BOOK_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "plies": self.plies,
+            "nodes": nodes,
+        }
+
+        temp_file = path.with_suffix('.json.tmp')
+        try:
+            with open(temp_file, "w") as f:
+                json.dump(book_data, f)
+            temp_file.replace(path)
+        except IOError as e:
+            print(f"Warning: Failed to save opening book: {e}")
+            if temp_file.exists():
+                temp_file.unlink()
+
+    @classmethod
+    def load(cls, path) -> Optional["OpeningBook"]:
+        """Load a book from a JSON file, or return None if missing or unreadable."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Failed to load opening book: {e}")
+            return None
+
+        if data.get("format") != BOOK_FORMAT_VERSION:
+            return None
+
+        nodes = {
+            key: BookNode(
+                posterior=np.array(node["posterior"], dtype=np.float64),
+                question=node.get("question"),
+                has_question="question" in node,
+            )
+            for key, node in data.get("nodes", {}).items()
+        }
+        return cls(data["fingerprint"], data.get("plies", 0), nodes)
+
+
+def build_opening_book(data_dir: Optional[str] = None, plies: int = DEFAULT_PLIES) -> Path:
+    """
+    Build and save the opening book for a knowledge base.
+
+    Args:
+        data_dir: Directory containing knowledge base data
+        plies: Number of questions to cover
+
+    Returns:
+        Path of the written book
+    """
+    # Imported here: the game engine itself loads opening books
+    from .game_engine import GameEngine
+
+    engine = GameEngine(data_dir)
+    book = OpeningBook.build(engine.kb, engine.bt, engine.qs, plies=plies)
+    book_path = engine.kb.data_dir / BOOK_FILENAME
+    book.save(book_path)
+    return book_path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the 20 Questions opening book')
+    parser.add_argument('--plies', type=int, default=DEFAULT_PLIES, help='Questions to cover')
+    parser.add_argument('--data-dir', default=None, help='Knowledge base data directory')
+
+    args = parser.parse_args()
+
+    book_path = build_opening_book(args.data_dir, plies=args.plies)
+    print(f"Opening book saved to: {book_path}")
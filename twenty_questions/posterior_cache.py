@@ -0,0 +1,156 @@
+"""
+Posterior Cache for the 20 Questions game.
+
+Many games share their early answers, and a posterior depends only on the
+set of answers given, not on their order. The cache maps the canonical
+(sorted) answer set to the resulting belief state and to the question
+selected next, so repeated answer sets skip the Bayesian update and the
+information gain search.
+
+Entries are valid for one knowledge base version; the cache empties itself
+when it sees a different version, which happens after every weight update.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+from .models import BeliefState
+
+
+# Default number of answer sets kept
+DEFAULT_CACHE_SIZE = 4096
+
+# Canonical answer set: sorted (attribute_id, "y" | "n" | "m") pairs
+CacheKey = Tuple[Tuple[str, str], ...]
+
+
+class _CacheEntry:
+    """Cached results for one answer set."""
+    __slots__ = ("beliefs", "question", "has_question")
+
+    def __init__(self):
+        self.beliefs: Optional[BeliefState] = None
+        self.question: Optional[str] = None
+        self.has_question = False
+
+
+class PosteriorCache:
+    """
+    Thread-safe LRU cache of posteriors and next questions by answer set.
+
+    Cached belief states are shared, which is safe because belief states
+    are never modified in place.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Answer sets kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.posterior_hits = 0
+        self.posterior_misses = 0
+        self.question_hits = 0
+        self.question_misses = 0
+
+    @staticmethod
+    def make_key(answer_path: Sequence[Tuple[str, float]]) -> CacheKey:
+        """
+        Build the canonical key of a sequence of (attribute_id, answer) pairs.
+
+        Answers are reduced to yes/no/maybe, the only distinction the
+        belief update makes.
+        """
+        return tuple(sorted(
+            (attr_id, "y" if answer > 0.7 else "n" if answer < 0.3 else "m")
+            for attr_id, answer in answer_path
+        ))
+
+    def _lookup(self, version: int, key: CacheKey) -> Optional[_CacheEntry]:
+        """Find an entry (lock held), dropping everything if the KB version changed."""
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, version: int, key: CacheKey) -> _CacheEntry:
+        """Get or create the entry for a key (lock held)."""
+        entry = self._lookup(version, key)
+        if entry is None:
+            entry = _CacheEntry()
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_beliefs(self, version: int, key: CacheKey) -> Optional[BeliefState]:
+        """Get the cached posterior for an answer set, or None."""
+        with self._lock:
+            entry = self._lookup(version, key)
+            if entry is not None and entry.beliefs is not None:
+                self.posterior_hits += 1
+                return entry.beliefs
+            self.posterior_misses += 1
+            return None
+
+    def put_beliefs(self, version: int, key: CacheKey, beliefs: BeliefState) -> None:
+        """Cache the posterior for an answer set."""
+        with self._lock:
+            self._store(version, key).beliefs = beliefs
+
+    def get_question(self, version: int, key: CacheKey) -> Tuple[bool, Optional[str]]:
+        """
+        Get the cached next question for an answer set.
+
+        Returns:
+            (found, question); question may be None when found is True,
+            meaning no question passed the selection criteria
+        """
+        with self._lock:
+            entry = self._lookup(version, key)
+            if entry is not None and entry.has_question:
+                self.question_hits += 1
+                return (True, entry.question)
+            self.question_misses += 1
+            return (False, None)
+
+    def put_question(self, version: int, key: CacheKey, question: Optional[str]) -> None:
+        """Cache the next question selected for an answer set."""
+        with self._lock:
+            entry = self._store(version, key)
+            entry.question = question
+            entry.has_question = True
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        """Get entry count and hit/miss counters."""
+        with self._lock:
+            lookups = (self.posterior_hits + self.posterior_misses
+                       + self.question_hits + self.question_misses)
+            hits = self.posterior_hits + self.question_hits
+            return {
+                "entries": len(self._entries),
+                "posterior_hits": self.posterior_hits,
+                "posterior_misses": self.posterior_misses,
+                "question_hits": self.question_hits,
+                "question_misses": self.question_misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
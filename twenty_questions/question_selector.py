@@ -5,12 +5,15 @@ Implements entropy-based question selection to maximize information gain.
 Uses hierarchical question ordering and implication-aware filtering.
 """
 
+import time
+
 import numpy as np
-from typing import Set, Optional, List, Tuple, Dict
-from .models import BeliefState
+from typing import Mapping, Sequence, Set, Optional, List, Tuple, Dict, Union
+from .models import BeliefState, ActiveBeliefState
 from .knowledge_base import KnowledgeBase
 from .belief_tracker import BeliefTracker
-from .implications import ImplicationEngine
+from .implications import ImplicationEngine, KnownAnswers
+from .opening_book import OpeningBook
 
 
 # Hierarchical question ordering - questions in earlier tiers are prioritized
@@ -109,6 +112,32 @@ QUESTION_HIERARCHY: Dict[int, Optional[List[str]]] = {
 # Tier 1 is now context-aware but still fixed order within category
 FIXED_ORDER_TIERS = {0, 1}
 
+# Default seconds per turn the two-ply lookahead may spend
+DEFAULT_LOOKAHEAD_BUDGET = 0.05
+
+# Lookahead questions evaluated per batch between time budget checks
+LOOKAHEAD_CHUNK = 4
+
+# Pseudo-answers (none of them "maybe") assumed for every question before
+# its maybe rate is estimated from play data
+MAYBE_PRIOR_WEIGHT = 10.0
+
+# Ways select_best_question can compute information gains
+GAIN_APPROXIMATIONS = ("exact", "sample")
+
+# Default number of entities sampled for approximate gains
+DEFAULT_APPROX_ENTITIES = 512
+
+# Default gain (bits) a question picked from approximate gains may lose
+# against the best one
+DEFAULT_APPROX_MAX_ERROR = 0.01
+
+# Catalogs up to this many times the sample size are scored exactly
+APPROX_MIN_RATIO = 4
+
+# Standard errors in an approximate gain's error bound (95% two-sided)
+APPROX_CONFIDENCE_Z = 1.96
+
 
 class QuestionSelector:
     """
@@ -118,13 +147,27 @@ class QuestionSelector:
     Information Gain = H(current) - E[H(after_answer)]
 
     Where E[H(after)] = P(yes)*H(if_yes) + P(no)*H(if_no)
+
+    With maybe_aware enabled, a third outcome is included: players answer
+    "maybe" to a question at the rate learned from play data (m), which
+    leaves the beliefs unchanged, so
+    E[H(after)] = (1 - m) * [P(yes)*H(if_yes) + P(no)*H(if_no)] + m * H(current)
+    and the gain of every question is scaled by (1 - m).
     """
 
     def __init__(
         self,
         knowledge_base: KnowledgeBase,
         belief_tracker: BeliefTracker,
-        min_info_gain: float = 0.001
+        min_info_gain: float = 0.001,
+        implication_engine: Optional[ImplicationEngine] = None,
+        lookahead_width: int = 0,
+        lookahead_budget: float = DEFAULT_LOOKAHEAD_BUDGET,
+        maybe_aware: bool = False,
+        gain_approximation: str = "exact",
+        approx_entities: int = DEFAULT_APPROX_ENTITIES,
+        approx_max_error: float = DEFAULT_APPROX_MAX_ERROR,
+        approx_seed: Optional[int] = None
     ):
         """
         Initialize the question selector.
@@ -133,13 +176,61 @@ class QuestionSelector:
             knowledge_base: The knowledge base to use
             belief_tracker: The belief tracker for simulating updates
             min_info_gain: Minimum information gain to consider a question
+            implication_engine: Implication engine to use (defaults to the
+                                belief tracker's, so both share one instance)
+            lookahead_width: Re-rank this many of the best questions by two-ply
+                             expected entropy (0 = greedy one-step selection;
+                             needs vectorized beliefs)
+            lookahead_budget: Seconds per turn the lookahead may spend
+            maybe_aware: Discount each question's gain by its learned rate
+                         of "maybe" answers
+            gain_approximation: "exact", or "sample" to estimate gains from a
+                                posterior-weighted sample of entities
+            approx_entities: Entities sampled for approximate gains
+            approx_max_error: Gain (bits) the selected question may lose against
+                              the best one when gains are approximated
+            approx_seed: Seed for the entity sampler
         """
+        if gain_approximation not in GAIN_APPROXIMATIONS:
+            raise ValueError(f"Unknown gain approximation: {gain_approximation!r}")
         self.kb = knowledge_base
         self.bt = belief_tracker
         self.min_info_gain = min_info_gain
-        self.implication_engine = ImplicationEngine()
+        self.lookahead_width = lookahead_width
+        self.lookahead_budget = lookahead_budget
+        self.maybe_aware = maybe_aware
+        self.gain_approximation = gain_approximation
+        self.approx_entities = approx_entities
+        self.approx_max_error = approx_max_error
+        self._rng = np.random.default_rng(approx_seed)
+
+        # ((kb.version, kb.answer_stats_version), maybe rate per attribute column)
+        self._maybe_rates: Optional[Tuple[Tuple[int, int], np.ndarray]] = None
+        if implication_engine is None:
+            implication_engine = belief_tracker.implication_engine
+        self.implication_engine = implication_engine
+
+        # Optional precomputed opening questions, validated per KB version
+        self.opening_book: Optional[OpeningBook] = None
+        self._book_checked_version = -1
+        self._book_valid = False
+
+    def get_opening_book(self) -> Optional[OpeningBook]:
+        """
+        Get the attached opening book if it matches the current knowledge base.
 
-    def _get_tier1_questions(self, known_answers: Dict[str, float]) -> List[str]:
+        Returns:
+            The opening book, or None if none is attached or it is stale
+        """
+        if self.opening_book is None:
+            return None
+        if self._book_checked_version != self.kb.version:
+            fingerprint = OpeningBook.compute_fingerprint(self.kb, self.bt, self.min_info_gain)
+            self._book_valid = fingerprint == self.opening_book.fingerprint
+            self._book_checked_version = self.kb.version
+        return self.opening_book if self._book_valid else None
+
+    def _get_tier1_questions(self, known_answers: Mapping[str, float]) -> List[str]:
         """
         Get context-aware Tier 1 questions based on determined category.
 
@@ -176,7 +267,8 @@ class QuestionSelector:
         self,
         beliefs: BeliefState,
         asked_questions: Set[str],
-        known_answers: Optional[Dict[str, float]] = None
+        known_answers: Optional[Mapping[str, float]] = None,
+        answer_path: Optional[Sequence[Tuple[str, float]]] = None
     ) -> Optional[str]:
         """
         Select the question that maximizes expected information gain.
@@ -192,16 +284,37 @@ class QuestionSelector:
         Args:
             beliefs: Current belief state
             asked_questions: Set of attribute IDs already asked
-            known_answers: Dict of {attr_id: answer_value} for implication filtering
+            known_answers: Known answers for implication filtering; a KnownAnswers
+                           instance lets the filter use its bit-vectors directly
+            answer_path: Ordered (attr_id, answer) history of a game started from
+                         the uniform prior; enables opening book lookups
 
         Returns:
             Attribute ID of the best question, or None if no good questions remain
         """
+        # Consult the opening book before doing any live computation. Its
+        # questions were chosen greedily without maybe rates, so lookahead
+        # and maybe-aware selection skip it.
+        if answer_path is not None and self.lookahead_width <= 0 and not self.maybe_aware:
+            book = self.get_opening_book()
+            if book is not None:
+                found, question = book.get_question(answer_path)
+                if found:
+                    return question
+
         if known_answers is None:
             known_answers = {}
 
+        # Resolve which attributes are determined by implications in one mask operation
+        determined = self._get_determined_attributes(known_answers)
+
         current_entropy = self.bt.get_entropy(beliefs)
 
+        # With array-backed beliefs, score every attribute in one pass
+        gains = bounds = None
+        if self.bt.vectorized:
+            gains, bounds = self.approximate_info_gains(beliefs, current_entropy)
+
         # Search through tiers in order
         for tier in sorted(QUESTION_HIERARCHY.keys()):
             tier_attrs = QUESTION_HIERARCHY[tier]
@@ -219,48 +332,56 @@ class QuestionSelector:
                     if a.id not in all_tier_attrs
                 ]
 
+            candidates = [
+                attr_id for attr_id in tier_attrs
+                if self._is_candidate(attr_id, asked_questions, determined)
+            ]
+            if not candidates:
+                continue
+
             # Check if this tier uses fixed order (for natural flow)
             use_fixed_order = tier in FIXED_ORDER_TIERS
 
             if use_fixed_order:
                 # Fixed order: Return first available question in the list order
-                for attr_id in tier_attrs:
-                    if attr_id in asked_questions:
-                        continue
-                    is_determined, _ = self.implication_engine.is_already_determined(
-                        attr_id, known_answers
-                    )
-                    if is_determined:
-                        continue
-                    if self.kb.get_attribute(attr_id) is None:
-                        continue
+                for attr_id in candidates:
+                    if gains is not None:
+                        col = self.kb.get_attribute_index(attr_id)
+                        info_gain = gains[col]
+                        if bounds is not None and abs(info_gain - self.min_info_gain) <= bounds[col]:
+                            info_gain = self.calculate_info_gains(
+                                beliefs, current_entropy, columns=np.array([col])
+                            )[0]
+                    else:
+                        info_gain = self._calculate_info_gain(beliefs, attr_id, current_entropy)
                     # Check minimum info gain threshold
-                    info_gain = self._calculate_info_gain(beliefs, attr_id, current_entropy)
                     if info_gain >= self.min_info_gain:
                         return attr_id
                 # No valid questions in this fixed-order tier, move to next tier
                 continue
 
             # Info-gain based selection: Find best question within this tier
+            if gains is not None:
+                columns = [self.kb.get_attribute_index(a) for a in candidates]
+                tier_gains = gains[columns]
+                if bounds is not None:
+                    tier_gains = self._rescore_contenders(
+                        beliefs, columns, tier_gains, bounds[columns], current_entropy
+                    )
+                tier_gains = np.where(tier_gains >= self.min_info_gain, tier_gains, -np.inf)
+                best = int(np.argmax(tier_gains))
+                if tier_gains[best] > -np.inf:
+                    if self.lookahead_width > 0:
+                        return self._select_with_lookahead(
+                            beliefs, candidates, tier_gains, current_entropy
+                        )
+                    return candidates[best]
+                continue
+
             best_question = None
             best_gain = -float('inf')
 
-            for attr_id in tier_attrs:
-                # Skip already asked questions
-                if attr_id in asked_questions:
-                    continue
-
-                # Skip questions whose answers are already determined via implications
-                is_determined, _ = self.implication_engine.is_already_determined(
-                    attr_id, known_answers
-                )
-                if is_determined:
-                    continue
-
-                # Skip if attribute doesn't exist in knowledge base
-                if self.kb.get_attribute(attr_id) is None:
-                    continue
-
+            for attr_id in candidates:
                 info_gain = self._calculate_info_gain(
                     beliefs, attr_id, current_entropy
                 )
@@ -275,6 +396,352 @@ class QuestionSelector:
 
         return None
 
+    def _get_determined_attributes(self, known_answers: Mapping[str, float]) -> Set[str]:
+        """
+        Get every attribute whose answer is determined by the known answers.
+
+        Uses the bit-vectors of a KnownAnswers instance directly; plain dicts
+        are converted first.
+        """
+        if not (isinstance(known_answers, KnownAnswers)
+                and known_answers.compatible_with(self.implication_engine)):
+            known_answers = KnownAnswers(self.implication_engine, known_answers)
+        return self.implication_engine.get_determined_attribute_ids(known_answers)
+
+    def _is_candidate(
+        self,
+        attr_id: str,
+        asked_questions: Set[str],
+        determined: Set[str]
+    ) -> bool:
+        """Check that a question is unasked, undetermined and in the knowledge base."""
+        # Skip already asked questions
+        if attr_id in asked_questions:
+            return False
+
+        # Skip questions whose answers are already determined via implications
+        if attr_id in determined:
+            return False
+
+        # Skip if attribute doesn't exist in knowledge base
+        return self.kb.get_attribute(attr_id) is not None
+
+    def calculate_info_gains(
+        self,
+        beliefs: BeliefState,
+        current_entropy: Optional[float] = None,
+        columns: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Calculate expected information gain for every attribute at once.
+
+        Produces the same values as _calculate_info_gain, using the fused
+        answer factors from the belief tracker instead of simulating each
+        answer separately.
+
+        Args:
+            beliefs: Current belief state
+            current_entropy: Pre-calculated current entropy (computed if None)
+            columns: Attribute columns to score (all if None)
+
+        Returns:
+            Array of information gains aligned to the knowledge base attribute
+            columns, or to columns if given
+        """
+        if current_entropy is None:
+            current_entropy = self.bt.get_entropy(beliefs)
+        vector, rows = self._belief_rows(beliefs)
+        gains = self.score_belief_matrix(
+            vector[np.newaxis, :], np.array([current_entropy]), rows=rows, columns=columns
+        )
+        return gains[0]
+
+    def approximate_info_gains(
+        self,
+        beliefs: BeliefState,
+        current_entropy: Optional[float] = None
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Calculate information gains the way gain_approximation says.
+
+        In "sample" mode, approx_entities entities are drawn in proportion
+        to their probability, and the sums score_belief_matrix computes over
+        every entity (P(yes), Z = E[f], E[f ln p], E[f ln f] per answer) are
+        replaced by sample means, using the true ln p of each drawn entity.
+        Cost is proportional to the sample instead of the catalog. The
+        error bound of each gain is the half-width of a normal-approximation
+        confidence interval: APPROX_CONFIDENCE_Z standard errors, from the
+        sample variance propagated through the entropy formula.
+
+        Exact gains are returned when the catalog (or active set) has at
+        most APPROX_MIN_RATIO * approx_entities entities. select_best_question
+        rescores the questions that could still be the best exactly (see
+        _rescore_contenders), so only the gains it never picks from stay
+        approximate.
+
+        Args:
+            beliefs: Current belief state
+            current_entropy: Pre-calculated current entropy (computed if None)
+
+        Returns:
+            (gains aligned to the knowledge base attribute columns, their error
+            bounds in bits, or None when the gains are exact)
+        """
+        if current_entropy is None:
+            current_entropy = self.bt.get_entropy(beliefs)
+        vector, rows = self._belief_rows(beliefs)
+        m = self.approx_entities
+        if self.gain_approximation == "exact" or len(vector) <= APPROX_MIN_RATIO * m:
+            return self.calculate_info_gains(beliefs, current_entropy), None
+
+        total = vector.sum()
+        # Sorted, so the row gathers below walk the matrices in order
+        drawn = np.sort(self._rng.choice(len(vector), size=m, p=vector / total))
+        log_p = np.log(vector[drawn] / total)[:, np.newaxis]
+        if isinstance(rows, slice):
+            drawn_rows = drawn + rows.start
+        else:
+            drawn_rows = rows[drawn]
+
+        # Per-entity P(yes) and its deviation from the sample mean
+        yes_deviation = self.kb.matrix[drawn_rows]
+        p_yes = yes_deviation.mean(axis=0)
+        yes_deviation -= p_yes
+        p_yes = np.clip(p_yes, 0.01, 0.99)
+
+        # Influence of each drawn entity on the estimated expected entropy
+        # (in nats), from linearizing ln Z - T / Z around the sample means
+        influence = np.zeros_like(yes_deviation)
+        entropies = []
+        for answer, p_answer in ((1.0, p_yes), (0.0, 1.0 - p_yes)):
+            factors, weighted_log = self.bt.get_answer_factors(answer)
+            f = factors[drawn_rows]
+            terms = weighted_log[drawn_rows]
+            terms += f * log_p
+            z = f.mean(axis=0)
+            t = terms.mean(axis=0)
+            entropies.append(np.log(z) - t / z)
+
+            f *= p_answer * (1.0 / z + t / z ** 2)
+            terms *= p_answer / z
+            influence += f
+            influence -= terms
+
+        entropy_yes, entropy_no = entropies
+        yes_deviation *= entropy_yes - entropy_no
+        influence += yes_deviation
+
+        expected_entropy = (p_yes * entropy_yes + (1.0 - p_yes) * entropy_no) / np.log(2)
+        gains = current_entropy - expected_entropy
+        bounds = APPROX_CONFIDENCE_Z * influence.std(axis=0, ddof=1) / (np.sqrt(m) * np.log(2))
+        if self.maybe_aware:
+            scale = 1.0 - self.get_maybe_rates()[:len(gains)]
+            gains *= scale
+            bounds *= scale
+        return gains, bounds
+
+    def _rescore_contenders(
+        self,
+        beliefs: BeliefState,
+        columns: List[int],
+        tier_gains: np.ndarray,
+        bounds: np.ndarray,
+        current_entropy: float
+    ) -> np.ndarray:
+        """
+        Replace approximate gains that could still be the best with exact ones.
+
+        The approximate leader is scored exactly first; every question whose
+        upper bound is more than approx_max_error above that exact gain is a
+        contender and is scored exactly too. The others are dropped (-inf),
+        so the question picked from the result is, within the confidence of
+        the bounds, at most approx_max_error bits worse than the best one.
+        (The leader's lower bound is not used as the threshold: it is the
+        gain most likely to be overestimated.)
+        """
+        leader = int(np.argmax(tier_gains))
+        columns = np.asarray(columns)
+        leader_gain = self.calculate_info_gains(
+            beliefs, current_entropy, columns=columns[[leader]]
+        )[0]
+        contenders = np.flatnonzero(tier_gains + bounds > leader_gain + self.approx_max_error)
+        contenders = contenders[contenders != leader]
+
+        rescored = np.full_like(tier_gains, -np.inf)
+        rescored[leader] = leader_gain
+        if len(contenders):
+            rescored[contenders] = self.calculate_info_gains(
+                beliefs, current_entropy, columns=columns[contenders]
+            )
+        return rescored
+
+    def _belief_rows(self, beliefs: BeliefState) -> Tuple[np.ndarray, Union[np.ndarray, slice]]:
+        """
+        Get the probabilities to score and the entity rows they belong to.
+
+        Pruned entities have zero probability and contribute nothing, so
+        only the active rows of an ActiveBeliefState are used. Gathering
+        them copies the rows, which only pays off once most are pruned.
+        """
+        if isinstance(beliefs, ActiveBeliefState) and 2 * len(beliefs.active) <= beliefs.size:
+            return beliefs.values, beliefs.active
+        vector = self.bt.as_vector(beliefs).vector
+        return vector, slice(0, len(vector))
+
+    def _select_with_lookahead(
+        self,
+        beliefs: BeliefState,
+        candidates: List[str],
+        gains: np.ndarray,
+        current_entropy: float
+    ) -> str:
+        """
+        Choose among the best one-step questions by two-ply expected entropy.
+
+        For each of the lookahead_width candidates with the highest one-step
+        gain, both answers are simulated and the best follow-up among the
+        other candidates is scored, all in one score_belief_matrix call per
+        chunk. The question with the lowest expected entropy after two
+        questions wins. Chunks are evaluated in one-step order until the
+        time budget runs out; ties and an exhausted budget favor the greedy
+        order.
+
+        Args:
+            beliefs: Current belief state
+            candidates: Candidate attribute IDs of the current tier
+            gains: One-step gains of the candidates (-inf for rejected ones)
+            current_entropy: Pre-calculated current entropy
+
+        Returns:
+            Attribute ID of the chosen question
+        """
+        deadline = time.perf_counter() + self.lookahead_budget
+        order = np.argsort(-gains, kind="stable")[:self.lookahead_width]
+        order = order[gains[order] > -np.inf]
+        if len(order) <= 1:
+            return candidates[int(order[0])]
+
+        vector, rows = self._belief_rows(beliefs)
+        columns = np.array([self.kb.get_attribute_index(a) for a in candidates], dtype=np.intp)
+        follow_ups = columns[gains > -np.inf]
+        factors_yes, _ = self.bt.get_answer_factors(1.0)
+        factors_no, _ = self.bt.get_answer_factors(0.0)
+
+        best_index, best_entropy = int(order[0]), np.inf
+        for start in range(0, len(order), LOOKAHEAD_CHUNK):
+            if time.perf_counter() >= deadline:
+                break
+            chunk = order[start:start + LOOKAHEAD_CHUNK]
+            chunk_columns = columns[chunk]
+
+            # Clamped as in score_belief_matrix
+            p_yes = np.clip(vector @ self.kb.matrix[:, chunk_columns][rows], 0.01, 0.99)
+            posteriors = np.vstack([
+                (vector[:, np.newaxis] * factors_yes[:, chunk_columns][rows]).T,
+                (vector[:, np.newaxis] * factors_no[:, chunk_columns][rows]).T,
+            ])
+            posteriors /= posteriors.sum(axis=1, keepdims=True)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                entropies = -np.where(posteriors > 0, posteriors * np.log2(posteriors), 0.0).sum(axis=1)
+
+            follow_gains = self.score_belief_matrix(posteriors, entropies, rows=rows)[:, follow_ups]
+            # A question cannot be its own follow-up
+            repeats = follow_ups[np.newaxis, :] == np.tile(chunk_columns, 2)[:, np.newaxis]
+            follow_gains[repeats] = -np.inf
+            best_follow = np.maximum(follow_gains.max(axis=1, initial=0.0), 0.0)
+
+            after = entropies - best_follow
+            k = len(chunk)
+            expected = p_yes * after[:k] + (1.0 - p_yes) * after[k:]
+            if self.maybe_aware:
+                # After a "maybe" the beliefs are unchanged, and the follow-up
+                # is the best other candidate by one-step gain
+                maybe = self.get_maybe_rates()[chunk_columns]
+                best_other = np.where(chunk == order[0], gains[order[1]], gains[order[0]])
+                expected = (1.0 - maybe) * expected + maybe * (current_entropy - np.maximum(best_other, 0.0))
+            i = int(np.argmin(expected))
+            if expected[i] < best_entropy:
+                best_index, best_entropy = int(chunk[i]), float(expected[i])
+
+        return candidates[best_index]
+
+    def score_belief_matrix(
+        self,
+        beliefs: np.ndarray,
+        current_entropies: np.ndarray,
+        rows: Optional[Union[np.ndarray, slice]] = None,
+        columns: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Calculate information gains for a batch of belief vectors.
+
+        For posterior weights w = p * f with Z = sum(w), the entropy is
+        ln Z - (sum(p ln p * f) + sum(p * f ln f)) / Z, so the yes/no
+        posterior entropies of every attribute reduce to matrix products
+        of the beliefs with the precomputed answer factors.
+
+        Args:
+            beliefs: Belief vectors of shape (games, entities)
+            current_entropies: Entropy of each belief vector, in bits
+            rows: Entity rows (index array or slice) the belief columns
+                  refer to (the first beliefs.shape[1] rows if None)
+            columns: Attribute columns to score (all if None)
+
+        Returns:
+            Information gains of shape (games, attributes), or
+            (games, len(columns)) if columns is given
+        """
+        if rows is None:
+            rows = slice(0, beliefs.shape[1])
+        if columns is None:
+            columns = slice(None)
+        p_yes = beliefs @ self.kb.matrix[:, columns][rows]
+
+        # Nearly deterministic questions are clamped, as in _calculate_info_gain
+        p_yes = np.clip(p_yes, 0.01, 0.99)
+        p_no = 1.0 - p_yes
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_log_p = np.where(beliefs > 0, beliefs * np.log(beliefs), 0.0)
+
+        expected_entropy = np.zeros_like(p_yes)
+        for answer, p_answer in ((1.0, p_yes), (0.0, p_no)):
+            factors, weighted_log = self.bt.get_answer_factors(answer)
+            factors, weighted_log = factors[:, columns][rows], weighted_log[:, columns][rows]
+            totals = beliefs @ factors
+            with np.errstate(divide="ignore", invalid="ignore"):
+                entropy = np.log(totals) - (p_log_p @ factors + beliefs @ weighted_log) / totals
+            entropy = np.nan_to_num(entropy) / np.log(2)
+            expected_entropy += p_answer * entropy
+
+        gains = current_entropies[:, np.newaxis] - expected_entropy
+        if self.maybe_aware:
+            # A "maybe" leaves the entropy unchanged
+            gains *= 1.0 - self.get_maybe_rates()[:self.kb.matrix.shape[1]][columns]
+        return gains
+
+    def get_maybe_rates(self) -> np.ndarray:
+        """
+        Get the estimated rate of "maybe" answers for every attribute column.
+
+        Cached until the knowledge base or its answer counts change.
+
+        Returns:
+            Array of maybe rates aligned to the knowledge base attribute columns
+        """
+        key = (self.kb.version, self.kb.answer_stats_version)
+        cached = self._maybe_rates
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        rates = np.zeros(len(self.kb.attribute_ids))
+        for col, attr_id in enumerate(self.kb.attribute_ids):
+            attribute = self.kb.get_attribute(attr_id)
+            if attribute is not None:
+                rates[col] = attribute.get_maybe_rate(prior_weight=MAYBE_PRIOR_WEIGHT)
+        self._maybe_rates = (key, rates)
+        return rates
+
     def _calculate_info_gain(
         self,
         beliefs: BeliefState,
@@ -320,6 +787,11 @@ class QuestionSelector:
         # Information gain is reduction in entropy
         info_gain = current_entropy - expected_entropy
 
+        if self.maybe_aware:
+            col = self.kb.get_attribute_index(attribute_id)
+            if col is not None:
+                info_gain *= 1.0 - self.get_maybe_rates()[col]
+
         return info_gain
 
     def get_top_questions(
@@ -342,6 +814,18 @@ class QuestionSelector:
         current_entropy = self.bt.get_entropy(beliefs)
         gains = []
 
+        if self.bt.vectorized:
+            candidates = [
+                attr.id for attr in self.kb.get_all_attributes()
+                if attr.id not in asked_questions
+            ]
+            if not candidates:
+                return []
+            all_gains = self.calculate_info_gains(beliefs, current_entropy)
+            candidate_gains = all_gains[[self.kb.get_attribute_index(a) for a in candidates]]
+            order = np.argsort(-candidate_gains, kind="stable")[:n]
+            return [(candidates[i], float(candidate_gains[i])) for i in order]
+
         for attr in self.kb.get_all_attributes():
             if attr.id in asked_questions:
                 continue
@@ -397,7 +881,7 @@ class QuestionSelector:
 
         # Calculate entropy to check certainty
         entropy = self.bt.get_entropy(beliefs)
-        num_entities = len(beliefs.probabilities)
+        num_entities = beliefs.num_entities()
         max_entropy = np.log2(num_entities) if num_entities > 0 else 1.0
 
         # Normalized entropy (0 = certain, 1 = completely uncertain)
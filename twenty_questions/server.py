@@ -0,0 +1,537 @@
+"""
+Asyncio game server for the 20 Questions game.
+
+Serves games over a TCP or Unix socket with a line-delimited JSON
+protocol: every request and every response is one JSON object on its own
+line. Requests carry an "op", an optional "id" echoed back in the
+response, and the "session" returned by start_game:
+
+    {"op": "start_game"}
+        -> {"ok": true, "session": "..."}
+    {"op": "next_question", "session": "..."}
+        -> {"ok": true, "question": {"attribute_id", "text", "number"}}
+           or, when it is time to guess,
+           {"ok": true, "question": null, "guess": {"entity_id", "name", "confidence"}}
+    {"op": "answer", "session": "...", "attribute_id": "...", "answer": 1.0}
+        -> {"ok": true, "question_number", "entropy", "confidence", "top_entities"}
+    {"op": "guess_result", "session": "...", "correct": false, "actual_name": "a dog"}
+        -> {"ok": true, "state": "game_over" | "learning_new"}
+    {"op": "learn_new_entity", "session": "...", "name": "...",
+     "question": "...", "question_answer": 1.0}
+        -> {"ok": true, "entity_id": "..."}
+    {"op": "end_session", "session": "..."}
+        -> {"ok": true}
+    {"op": "stats"}
+        -> {"ok": true, "sessions", "parked", "posterior_cache", "learning"}
+
+Failures are reported as {"ok": false, "error": "..."}. Question selection
+and learning run in a thread pool so the event loop keeps serving other
+connections; sessions idle for longer than the session timeout are
+dropped.
+
+With a park directory, sessions idle for a while (or the least recently
+used ones, beyond a resident limit) are serialized to disk and resumed
+transparently on their next request, which bounds memory use under many
+concurrent players.
+
+Usage: python -m twenty_questions.server [--host H] [--port P | --unix PATH]
+                                         [--workers N] [--session-timeout S]
+                                         [--park-dir DIR] [--park-after S]
+                                         [--max-resident N]
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from .game_engine import GameState
+from .session_manager import SessionManager, PlayerSession
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Seconds a session may stay idle before it is dropped
+DEFAULT_SESSION_TIMEOUT = 600.0
+
+# Seconds a session may stay idle before it is parked (when parking is enabled)
+DEFAULT_PARK_AFTER = 60.0
+
+# Longest accepted request line
+MAX_LINE_BYTES = 64 * 1024
+
+
+class RequestError(Exception):
+    """A request that cannot be served (reported to the client, connection stays open)."""
+
+
+@dataclass
+class _SessionEntry:
+    """A live session and its bookkeeping."""
+    session: PlayerSession
+    # Requests for one session run one at a time, in arrival order
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class GameServer:
+    """
+    Serves PlayerSessions of a SessionManager over a socket.
+    """
+
+    def __init__(
+        self,
+        manager: SessionManager,
+        session_timeout: float = DEFAULT_SESSION_TIMEOUT,
+        workers: Optional[int] = None,
+        park_dir: Optional[str] = None,
+        park_after: float = DEFAULT_PARK_AFTER,
+        max_resident_sessions: Optional[int] = None
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            manager: Session manager providing sessions and learning
+            session_timeout: Seconds of inactivity after which a session is dropped
+            workers: Threads for question selection and learning (None = default)
+            park_dir: Directory for parked sessions (None = keep all in memory)
+            park_after: Seconds of inactivity after which a session is parked
+            max_resident_sessions: Park the least recently used sessions when
+                                   more than this many are in memory
+        """
+        self.manager = manager
+        self.session_timeout = session_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="game")
+        self.sessions: Dict[str, _SessionEntry] = {}
+        # Parked session ID -> last use (monotonic time)
+        self.parked: Dict[str, float] = {}
+        self.park_dir = Path(park_dir) if park_dir is not None else None
+        if self.park_dir is not None:
+            self.park_dir.mkdir(parents=True, exist_ok=True)
+        self.park_after = park_after
+        self.max_resident_sessions = max_resident_sessions
+        self._resume_lock = asyncio.Lock()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._parker: Optional[asyncio.Task] = None
+
+        self._handlers: Dict[str, Callable] = {
+            "start_game": self._start_game,
+            "next_question": self._next_question,
+            "answer": self._answer,
+            "guess_result": self._guess_result,
+            "learn_new_entity": self._learn_new_entity,
+            "end_session": self._end_session,
+            "stats": self._stats,
+        }
+
+    async def start(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        unix_path: Optional[str] = None
+    ) -> asyncio.AbstractServer:
+        """
+        Start listening on a TCP port, or on a Unix socket if unix_path is given.
+
+        Returns:
+            The listening asyncio server
+        """
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=unix_path, limit=MAX_LINE_BYTES
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host=host, port=port, limit=MAX_LINE_BYTES
+            )
+        self._reaper = asyncio.create_task(self._reap_idle_sessions())
+        return self._server
+
+    async def close(self) -> None:
+        """Stop listening, drop all sessions and save pending learned data."""
+        for task in (self._reaper, self._parker):
+            if task is not None:
+                task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.sessions.clear()
+        for session_id in list(self.parked):
+            self._discard_parked(session_id)
+        self.executor.shutdown(wait=True)
+        self.manager.close()
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the requests of one connection in order."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than the limit; the stream cannot be resynchronized
+                    writer.write(_encode({"ok": False, "error": "request too long"}))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(_encode(await self.handle_request(line)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down; end the connection quietly
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle_request(self, line: bytes) -> dict:
+        """
+        Decode, dispatch and answer one request line.
+
+        Returns:
+            The response object
+        """
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {"ok": False, "error": "invalid JSON"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "request must be a JSON object"}
+
+        response: dict = {}
+        if "id" in request:
+            response["id"] = request["id"]
+        handler = self._handlers.get(request.get("op"))
+        if handler is None:
+            response.update(ok=False, error=f"unknown op: {request.get('op')!r}")
+            return response
+        try:
+            result = await handler(request)
+            response["ok"] = True
+            response.update(result)
+        except (RequestError, ValueError, TypeError) as e:
+            response.update(ok=False, error=str(e))
+        return response
+
+    async def _run(self, func, *args):
+        """Run a blocking call in the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    @asynccontextmanager
+    async def _session(self, request: dict):
+        """
+        Hold the lock of a request's session, resuming it first if parked.
+
+        Yields:
+            The session's entry
+        """
+        session_id = request.get("session")
+        while True:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                entry = await self._resume(session_id)
+            await entry.lock.acquire()
+            # The session may have been parked or dropped while we waited
+            if self.sessions.get(session_id) is entry:
+                break
+            entry.lock.release()
+        try:
+            entry.last_used = time.monotonic()
+            yield entry
+        finally:
+            entry.last_used = time.monotonic()
+            entry.lock.release()
+
+    async def _resume(self, session_id) -> _SessionEntry:
+        """Bring a parked session back into memory."""
+        if not isinstance(session_id, str) or session_id not in self.parked:
+            raise RequestError("unknown or expired session")
+        async with self._resume_lock:
+            entry = self.sessions.get(session_id)
+            if entry is not None:
+                return entry
+            if session_id not in self.parked:
+                raise RequestError("unknown or expired session")
+            try:
+                session = await self._run(self._load_parked, session_id)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self._discard_parked(session_id)
+                raise RequestError(f"failed to resume session: {e}")
+            del self.parked[session_id]
+            entry = _SessionEntry(session)
+            self.sessions[session_id] = entry
+            return entry
+
+    def _park_path(self, session_id: str) -> Path:
+        return self.park_dir / f"{session_id}.json"
+
+    def _load_parked(self, session_id: str) -> PlayerSession:
+        path = self._park_path(session_id)
+        with open(path, "r") as f:
+            data = json.load(f)
+        session = self.manager.create_session()
+        session.restore_session(data)
+        path.unlink()
+        return session
+
+    def _write_parked(self, session_id: str, session: PlayerSession) -> None:
+        path = self._park_path(session_id)
+        temp_file = path.with_suffix(".json.tmp")
+        with open(temp_file, "w") as f:
+            json.dump(session.serialize_session(include_posterior=True), f)
+        temp_file.replace(path)
+
+    def _discard_parked(self, session_id: str) -> None:
+        self.parked.pop(session_id, None)
+        try:
+            self._park_path(session_id).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    async def _park(self, session_id: str, entry: _SessionEntry) -> None:
+        """Write an idle session to the park directory and release its memory."""
+        if entry.lock.locked():
+            return
+        async with entry.lock:
+            if self.sessions.get(session_id) is not entry:
+                return
+            try:
+                await self._run(self._write_parked, session_id, entry.session)
+            except Exception as e:
+                # Pickling fails with more than OSError; the session stays resident
+                print(f"Warning: Failed to park session {session_id}: {e}")
+                return
+            del self.sessions[session_id]
+            self.parked[session_id] = entry.last_used
+
+    async def _start_game(self, request: dict) -> dict:
+        session = await self._run(self._create_started_session)
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = _SessionEntry(session)
+
+        # Parking happens off the request path; one task at a time does it
+        if (self.max_resident_sessions is not None and self.park_dir is not None
+                and len(self.sessions) > self.max_resident_sessions
+                and (self._parker is None or self._parker.done())):
+            self._parker = asyncio.create_task(self._park_least_recently_used())
+        return {"session": session_id}
+
+    async def _park_least_recently_used(self) -> None:
+        """Park idle sessions, oldest first, until at most max_resident_sessions remain."""
+        excess = len(self.sessions) - self.max_resident_sessions
+        if excess <= 0:
+            return
+        idle = sorted(
+            (entry.last_used, sid) for sid, entry in self.sessions.items()
+            if not entry.lock.locked()
+        )
+        for _, session_id in idle[:excess]:
+            entry = self.sessions.get(session_id)
+            if entry is not None:
+                await self._park(session_id, entry)
+
+    def _create_started_session(self) -> PlayerSession:
+        session = self.manager.create_session()
+        session.start_game()
+        return session
+
+    async def _next_question(self, request: dict) -> dict:
+        async with self._session(request) as entry:
+            return await self._run(_next_question, entry.session)
+
+    async def _answer(self, request: dict) -> dict:
+        attribute_id = _field(request, "attribute_id")
+        answer = float(_field(request, "answer"))
+        if not 0.0 <= answer <= 1.0:
+            raise RequestError("answer must be between 0 and 1")
+        async with self._session(request) as entry:
+            if entry.session.kb.get_attribute(attribute_id) is None:
+                raise RequestError(f"unknown attribute: {attribute_id!r}")
+            result = await self._run(entry.session.process_answer, attribute_id, answer)
+        return {
+            "question_number": result.question_number,
+            "entropy": result.entropy_after,
+            "confidence": result.confidence,
+            "top_entities": [[eid, prob] for eid, prob in result.top_entities],
+        }
+
+    async def _guess_result(self, request: dict) -> dict:
+        correct = bool(_field(request, "correct"))
+        actual_name = request.get("actual_name")
+        async with self._session(request) as entry:
+            await self._run(entry.session.process_guess_result, correct, actual_name)
+            return {"state": entry.session.state.value}
+
+    async def _learn_new_entity(self, request: dict) -> dict:
+        name = _field(request, "name")
+        if not isinstance(name, str) or not name.strip():
+            raise RequestError("name must be a non-empty string")
+        question = request.get("question")
+        question_answer = request.get("question_answer")
+        if question_answer is not None:
+            question_answer = float(question_answer)
+        async with self._session(request) as entry:
+            if entry.session.state != GameState.LEARNING_NEW:
+                raise RequestError("the session is not waiting for a new entity")
+            entity_id = await self._run(
+                entry.session.learn_new_entity, name.strip(), question, question_answer
+            )
+        return {"entity_id": entity_id}
+
+    async def _end_session(self, request: dict) -> dict:
+        session_id = request.get("session")
+        if session_id in self.parked:
+            self._discard_parked(session_id)
+            return {}
+        async with self._session(request):
+            del self.sessions[session_id]
+        return {}
+
+    async def _stats(self, request: dict) -> dict:
+        return {
+            "sessions": len(self.sessions),
+            "parked": len(self.parked),
+            "posterior_cache": self.manager.get_cache_stats(),
+            "learning": await self._run(self.manager.get_stats),
+        }
+
+    async def _reap_idle_sessions(self) -> None:
+        """Periodically park idle sessions and drop expired ones."""
+        interval = max(1.0, min(self.session_timeout, self.park_after or self.session_timeout) / 4)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            expired = now - self.session_timeout
+            for session_id, entry in list(self.sessions.items()):
+                if entry.lock.locked():
+                    continue
+                # One failing session must not stop the reaper
+                try:
+                    if entry.last_used < expired:
+                        del self.sessions[session_id]
+                    elif self.park_dir is not None and entry.last_used < now - self.park_after:
+                        await self._park(session_id, entry)
+                except Exception as e:
+                    print(f"Warning: Failed to reap session {session_id}: {e}")
+            for session_id in [sid for sid, last_used in self.parked.items() if last_used < expired]:
+                self._discard_parked(session_id)
+
+
+def _next_question(session: PlayerSession) -> dict:
+    """Get the next question, or the guess once the session stops asking."""
+    question = session.get_next_question()
+    if question is not None:
+        attribute_id, text = question
+        return {
+            "question": {
+                "attribute_id": attribute_id,
+                "text": text,
+                "number": session.current_question + 1,
+            }
+        }
+
+    guess = session.get_guess()
+    if guess is None:
+        return {"question": None, "guess": None}
+    entity_id, name, confidence = guess
+    return {
+        "question": None,
+        "guess": {"entity_id": entity_id, "name": name, "confidence": confidence},
+    }
+
+
+def _field(request: dict, name: str):
+    """Get a required request field."""
+    if name not in request:
+        raise RequestError(f"missing field: {name}")
+    return request[name]
+
+
+def _encode(response: dict) -> bytes:
+    return json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def serve(
+    data_dir: Optional[str] = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    session_timeout: float = DEFAULT_SESSION_TIMEOUT,
+    park_dir: Optional[str] = None,
+    park_after: float = DEFAULT_PARK_AFTER,
+    max_resident_sessions: Optional[int] = None
+) -> None:
+    """Run a game server until cancelled."""
+    # Imported here: the config only matters for the standalone server
+    from .game_engine import GameConfig
+
+    manager = SessionManager(data_dir, GameConfig(write_behind_saves=True))
+    server = GameServer(
+        manager,
+        session_timeout=session_timeout,
+        workers=workers,
+        park_dir=park_dir,
+        park_after=park_after,
+        max_resident_sessions=max_resident_sessions
+    )
+    listener = await server.start(host, port, unix_path)
+    where = unix_path or ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"20 Questions server listening on {where}")
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the 20 Questions game server')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='TCP host to bind')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port to bind')
+    parser.add_argument('--unix', default=None, help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=None, help='Worker threads')
+    parser.add_argument('--session-timeout', type=float, default=DEFAULT_SESSION_TIMEOUT,
+                        help='Seconds before an idle session is dropped')
+    parser.add_argument('--park-dir', default=None, help='Directory for parked idle sessions')
+    parser.add_argument('--park-after', type=float, default=DEFAULT_PARK_AFTER,
+                        help='Seconds before an idle session is parked')
+    parser.add_argument('--max-resident', type=int, default=None,
+                        help='Sessions kept in memory before parking the least recently used')
+    parser.add_argument('--data-dir', default=None, help='Knowledge base data directory')
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            args.data_dir,
+            host=args.host,
+            port=args.port,
+            unix_path=args.unix,
+            workers=args.workers,
+            session_timeout=args.session_timeout,
+            park_dir=args.park_dir,
+            park_after=args.park_after,
+            max_resident_sessions=args.max_resident
+        ))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,316 @@
+"""
+Session Manager for the 20 Questions game.
+
+Serves many concurrent players from one knowledge base. Question selection
+runs against an immutable KnowledgeSnapshot (a frozen copy of the KB plus
+the belief tracker, question selector and caches built for it) that is
+shared by every session; each PlayerSession only holds its own beliefs,
+asked questions and answers.
+
+Learning goes to the live knowledge base. After a learned game, a
+background thread captures a new snapshot (at most once per
+snapshot_interval seconds) and swaps it in for games that start later.
+Games already in progress keep the snapshot they started with, so they are
+never blocked or see the catalog change under them.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from .knowledge_base import KnowledgeBase
+from .belief_tracker import BeliefTracker
+from .question_selector import QuestionSelector
+from .weight_learner import WeightLearner
+from .implications import ImplicationEngine, KnownAnswers
+from .opening_book import OpeningBook, BOOK_FILENAME
+from .game_engine import (
+    GameEngine, GameConfig, create_knowledge_base, create_posterior_cache
+)
+
+
+class KnowledgeSnapshot:
+    """
+    A read-only copy of the knowledge base and the components that read it.
+
+    The copy comes from KnowledgeBase.frozen_copy(), whose matrix is marked
+    non-writable, so accidental weight updates raise instead of leaking into
+    games that share the snapshot.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase,
+        config: GameConfig,
+        implication_engine: ImplicationEngine,
+        opening_book: Optional[OpeningBook] = None,
+        number: int = 0
+    ):
+        """
+        Initialize the snapshot from a frozen KB copy (use capture()).
+
+        Args:
+            knowledge_base: A copy made by KnowledgeBase.frozen_copy()
+            config: Game configuration (belief representation)
+            implication_engine: Shared implication engine
+            opening_book: Opening book to validate against this snapshot
+            number: Sequence number of the snapshot
+        """
+        self.kb = knowledge_base
+        self.number = number
+        self.implication_engine = implication_engine
+        self.bt = BeliefTracker(
+            knowledge_base,
+            vectorized=config.vectorized_beliefs,
+            log_space=config.log_space_beliefs,
+            implication_engine=implication_engine,
+            prune_epsilon=config.prune_epsilon
+        )
+        self.qs = QuestionSelector(
+            knowledge_base,
+            self.bt,
+            implication_engine=implication_engine,
+            lookahead_width=config.lookahead_width,
+            lookahead_budget=config.lookahead_budget,
+            maybe_aware=config.maybe_aware_gains,
+            gain_approximation=config.gain_approximation,
+            approx_entities=config.approx_entities,
+            approx_max_error=config.approx_max_error
+        )
+        self.qs.opening_book = opening_book
+        # Shared by all sessions on this snapshot; the KB never changes under it
+        self.posterior_cache = create_posterior_cache(config)
+
+        # Build the lazily computed caches now, while no game is using them
+        self.qs.select_best_question(
+            self.bt.initialize_beliefs(), set(), KnownAnswers(implication_engine), answer_path=[]
+        )
+
+    @property
+    def version(self) -> int:
+        """Version of the live knowledge base this snapshot was captured at."""
+        return self.kb.version
+
+    @classmethod
+    def capture(
+        cls,
+        knowledge_base: KnowledgeBase,
+        config: GameConfig,
+        implication_engine: ImplicationEngine,
+        opening_book: Optional[OpeningBook] = None,
+        number: int = 0,
+        previous: Optional["KnowledgeSnapshot"] = None
+    ) -> "KnowledgeSnapshot":
+        """
+        Copy a live knowledge base into a new snapshot.
+
+        Only the matrix and the entities and attributes changed since the
+        previous snapshot are copied; the rest are shared with it.
+        """
+        frozen = knowledge_base.frozen_copy(previous.kb if previous is not None else None)
+        return cls(frozen, config, implication_engine, opening_book, number)
+
+
+class PlayerSession(GameEngine):
+    """
+    One player's game, played against a shared KnowledgeSnapshot.
+
+    Has the GameEngine game API (start_game, get_next_question,
+    process_answer, get_guess, ...). Learning is applied to the manager's
+    live knowledge base; the session switches to the latest snapshot when
+    its next game starts.
+    """
+
+    def __init__(self, manager: "SessionManager"):
+        """
+        Args:
+            manager: The session manager providing snapshots and learning
+        """
+        self.manager = manager
+        self.config = manager.config
+        self.wl = manager.wl
+        self._use_snapshot(manager.get_snapshot())
+        self._reset_game_state()
+
+    def _use_snapshot(self, snapshot: KnowledgeSnapshot) -> None:
+        """Point the session's components at a snapshot."""
+        self.snapshot = snapshot
+        self.kb = snapshot.kb
+        self.bt = snapshot.bt
+        self.qs = snapshot.qs
+        self.implication_engine = snapshot.implication_engine
+        self.posterior_cache = snapshot.posterior_cache
+
+    def start_game(self) -> None:
+        """Start a new game on the latest snapshot."""
+        self._use_snapshot(self.manager.get_snapshot())
+        super().start_game()
+
+    def _find_entity_by_name(self, name: str, kb: Optional[KnowledgeBase] = None):
+        """Find an entity by name in the live knowledge base.
+
+        The snapshot lacks entities learned since it was taken; matching
+        against it would learn a second copy of those.
+        """
+        if kb is None:
+            kb = self.manager.kb
+        with kb.lock:
+            return super()._find_entity_by_name(name, kb)
+
+    def close(self) -> None:
+        """Nothing to release; the manager owns the learner (see SessionManager.close)."""
+
+
+class SnapshotRefresher:
+    """
+    Rebuilds the session manager's snapshot from a background thread.
+
+    request() is called after every learned game. The worker captures a new
+    snapshot at most once per min_interval seconds and swaps it in, so no
+    game waits for a rebuild, and each snapshot (and its posterior cache)
+    stays in use for at least min_interval.
+    """
+
+    def __init__(self, manager: "SessionManager", min_interval: float):
+        """
+        Initialize the refresher and start its worker thread.
+
+        Args:
+            manager: The session manager whose snapshot is rebuilt
+            min_interval: Minimum seconds between two rebuilds
+        """
+        self.manager = manager
+        self.min_interval = min_interval
+
+        self._requested = False
+        self._last_refresh = time.monotonic()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self._thread = threading.Thread(
+            target=self._run, name="kb-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def request(self) -> None:
+        """Ask for a new snapshot because the live knowledge base changed."""
+        with self._condition:
+            if self._closed:
+                return
+            self._requested = True
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Stop the worker thread (pending requests are dropped)."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Worker loop: wait for a request and the interval, then rebuild."""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._requested:
+                        remaining = self._last_refresh + self.min_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+                self._requested = False
+            try:
+                self.manager.refresh_snapshot()
+            except Exception as e:
+                print(f"Warning: Failed to rebuild knowledge base snapshot: {e}")
+            with self._condition:
+                self._last_refresh = time.monotonic()
+
+
+class SessionManager:
+    """
+    Owns the live knowledge base and hands out sessions sharing its snapshots.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, config: Optional[GameConfig] = None):
+        """
+        Initialize the session manager.
+
+        Args:
+            data_dir: Directory for data files
+            config: Game configuration shared by all sessions
+        """
+        self.config = config or GameConfig()
+
+        self.kb = create_knowledge_base(data_dir, self.config.storage_backend)
+        self.implication_engine = ImplicationEngine()
+        self.wl = WeightLearner(
+            self.kb,
+            learning_rate=self.config.learning_rate,
+            write_behind=self.config.write_behind_saves,
+            flush_interval=self.config.save_interval,
+            flush_count=self.config.save_batch_size
+        )
+        self.opening_book: Optional[OpeningBook] = None
+        if self.config.use_opening_book:
+            self.opening_book = OpeningBook.load(self.kb.data_dir / BOOK_FILENAME)
+
+        # Held only while capturing a snapshot; games never wait on it
+        self._capture_lock = threading.Lock()
+        self._snapshot = KnowledgeSnapshot.capture(
+            self.kb, self.config, self.implication_engine, self.opening_book
+        )
+
+        # Learning requests a new snapshot, built off the request path
+        self.refresher = SnapshotRefresher(self, self.config.snapshot_interval)
+        self.wl.on_change = self.refresher.request
+
+    def get_snapshot(self) -> KnowledgeSnapshot:
+        """
+        Get the latest snapshot.
+
+        Never waits: new snapshots are built in the background after
+        learning (see SnapshotRefresher), or by refresh_snapshot().
+        """
+        return self._snapshot
+
+    def refresh_snapshot(self) -> KnowledgeSnapshot:
+        """
+        Capture a new snapshot now if the live KB changed, and swap it in.
+
+        Returns:
+            The latest snapshot
+        """
+        with self._capture_lock:
+            snapshot = self._snapshot
+            if snapshot.version != self.kb.version:
+                snapshot = KnowledgeSnapshot.capture(
+                    self.kb, self.config, self.implication_engine, self.opening_book,
+                    number=snapshot.number + 1, previous=snapshot
+                )
+                # A single reference assignment: sessions see the old or the new snapshot
+                self._snapshot = snapshot
+            return snapshot
+
+    def create_session(self) -> PlayerSession:
+        """Create a new player session (call start_game() to begin playing)."""
+        return PlayerSession(self)
+
+    def get_stats(self) -> dict:
+        """Get global learning statistics."""
+        return self.wl.get_global_stats()
+
+    def get_cache_stats(self) -> dict:
+        """Get the current snapshot's posterior cache counters (empty if disabled)."""
+        cache = self._snapshot.posterior_cache
+        return cache.get_stats() if cache is not None else {}
+
+    def close(self) -> None:
+        """Stop snapshot rebuilds, save any learned data still pending and stop background saving."""
+        self.refresher.close()
+        self.wl.close()
@@ -102,15 +102,11 @@ def simulate_game(engine: GameEngine, target_id: str) -> GameResult:
     # Check if correct
     correct = guessed_id == target_id
 
-    # Check rank of target in final beliefs
-    top_entities = engine.beliefs.get_top_entities(100)
-    rank = -1
-    was_in_top_5 = False
-    for i, (eid, _) in enumerate(top_entities):
-        if eid == target_id:
-            rank = i + 1
-            was_in_top_5 = (i < 5)
-            break
+    # Check rank of target in final beliefs (only the top 100 are ranked)
+    rank = engine.beliefs.get_rank(target_id)
+    if rank is None or rank > 100:
+        rank = -1
+    was_in_top_5 = 1 <= rank <= 5
 
     return GameResult(
         target_id=target_id,
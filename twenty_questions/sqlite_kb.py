@@ -0,0 +1,415 @@
+"""
+SQLite-backed knowledge base for the 20 Questions game.
+
+Stores entities, attributes, the sparse entity attribute values and play
+counters in a single SQLite database in WAL mode:
+
+    entities(id, name, popularity_rank, category, times_played, times_guessed_correctly)
+    attributes(id, question, category, alpha, beta, times_asked, times_maybe)
+    entity_attributes(entity_id, attribute_id, value)
+
+The database is created on first use by importing entities.json,
+attributes.json and any learned data (learned.json plus the journal) from
+the data directory; afterwards the JSON files are no longer read. save()
+writes only the rows that changed, and play counters are saved as
+increments, so several game processes can share one database. Databases
+created by an older version are upgraded in place when opened.
+
+Usage: python -m twenty_questions.sqlite_kb [--data-dir DIR] [--db PATH] [--reimport]
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .models import Entity, Attribute
+from .knowledge_base import KnowledgeBase
+
+
+# File name of the database inside the data directory
+DATABASE_FILENAME = "knowledge_base.sqlite3"
+
+SCHEMA_VERSION = 2
+
+# Seconds to wait for another process's write transaction to finish
+BUSY_TIMEOUT = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    popularity_rank INTEGER NOT NULL DEFAULT 500,
+    category TEXT NOT NULL DEFAULT 'unknown',
+    times_played INTEGER NOT NULL DEFAULT 0,
+    times_guessed_correctly INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS attributes (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT 'general',
+    alpha REAL NOT NULL DEFAULT 1.0,
+    beta REAL NOT NULL DEFAULT 1.0,
+    times_asked INTEGER NOT NULL DEFAULT 0,
+    times_maybe INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entity_attributes (
+    entity_id TEXT NOT NULL REFERENCES entities(id) ON DELETE CASCADE,
+    attribute_id TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (entity_id, attribute_id)
+);
+"""
+
+_UPSERT_ENTITY = """
+INSERT INTO entities (id, name, popularity_rank, category, times_played, times_guessed_correctly)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    name = excluded.name,
+    popularity_rank = excluded.popularity_rank,
+    category = excluded.category,
+    times_played = excluded.times_played,
+    times_guessed_correctly = excluded.times_guessed_correctly
+"""
+
+_UPSERT_ATTRIBUTE = """
+INSERT INTO attributes (id, question, category, alpha, beta)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    question = excluded.question,
+    category = excluded.category,
+    alpha = excluded.alpha,
+    beta = excluded.beta
+"""
+
+_UPSERT_VALUE = """
+INSERT INTO entity_attributes (entity_id, attribute_id, value)
+VALUES (?, ?, ?)
+ON CONFLICT(entity_id, attribute_id) DO UPDATE SET value = excluded.value
+"""
+
+_ADD_PLAYS = """
+UPDATE entities
+SET times_played = times_played + ?, times_guessed_correctly = times_guessed_correctly + ?
+WHERE id = ?
+"""
+
+_SET_ANSWERS = "UPDATE attributes SET times_asked = ?, times_maybe = ? WHERE id = ?"
+
+_ADD_ANSWERS = """
+UPDATE attributes
+SET times_asked = times_asked + ?, times_maybe = times_maybe + ?
+WHERE id = ?
+"""
+
+# Statements upgrading a database from the schema version before each key
+_MIGRATIONS = {
+    1: [
+        "ALTER TABLE attributes ADD COLUMN times_asked INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE attributes ADD COLUMN times_maybe INTEGER NOT NULL DEFAULT 0",
+    ],
+}
+
+
+class SQLiteKnowledgeBase(KnowledgeBase):
+    """
+    Knowledge base persisted in a SQLite database instead of JSON files.
+
+    Has the same API and in-memory structures as KnowledgeBase (entity and
+    attribute dicts plus the dense matrix); only loading and saving differ.
+    Rows are read in insertion order, so the matrix layout matches the one
+    built from the JSON files the database was imported from.
+
+    Weights are saved as absolute values (the last writer wins), while play
+    and answer counters are saved as increments so concurrent processes do
+    not lose each other's games. Changes made by other processes become visible on
+    the next load.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, db_path: Optional[str] = None):
+        """
+        Initialize the knowledge base.
+
+        Args:
+            data_dir: Directory for data files. Defaults to ./data relative to this file.
+            db_path: Database file (defaults to data_dir/knowledge_base.sqlite3);
+                     created and imported from data_dir's JSON files if missing
+        """
+        if data_dir is None:
+            data_dir = Path(__file__).parent / "data"
+        self.db_path = Path(db_path) if db_path is not None else Path(data_dir) / DATABASE_FILENAME
+        self._conn: Optional[sqlite3.Connection] = None
+        # Games counted since the last save: entity -> [played, guessed correctly]
+        self._play_deltas: Dict[str, List[int]] = {}
+        # Answers counted since the last save: attribute -> [asked, maybe]
+        self._answer_deltas: Dict[str, List[int]] = {}
+        super().__init__(data_dir, use_compiled=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database connection (once) and make sure the schema exists."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Saves may run on a write-behind thread; self.lock serializes access
+            conn = sqlite3.connect(
+                str(self.db_path), timeout=BUSY_TIMEOUT, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with conn:
+                # Version 0 is a new database, created at the current version
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                conn.executescript(_SCHEMA)
+                for old_version in range(version or SCHEMA_VERSION, SCHEMA_VERSION):
+                    for statement in _MIGRATIONS[old_version]:
+                        conn.execute(statement)
+                if version != SCHEMA_VERSION:
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection (reopened on the next save)."""
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __getstate__(self) -> dict:
+        # Connections cannot be pickled; worker processes reconnect on demand
+        state = super().__getstate__()
+        state["_conn"] = None
+        return state
+
+    def frozen_copy(self, previous: Optional[KnowledgeBase] = None) -> "SQLiteKnowledgeBase":
+        # Copies never save, so they get no connection or pending counters
+        frozen = super().frozen_copy(previous)
+        frozen._conn = None
+        frozen._play_deltas = {}
+        frozen._answer_deltas = {}
+        return frozen
+
+    def _load(self):
+        """
+        Load entities and attributes from the database.
+
+        An empty database is first filled from the JSON files.
+
+        Returns:
+            None (the matrix is always built from the loaded dicts)
+        """
+        conn = self._connect()
+        if conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0] == 0:
+            self._import_json()
+            return None
+
+        self.attributes = {
+            row[0]: Attribute(
+                id=row[0],
+                question=row[1],
+                category=row[2],
+                alpha=row[3],
+                beta=row[4],
+                times_asked=row[5],
+                times_maybe=row[6],
+            )
+            for row in conn.execute(
+                "SELECT id, question, category, alpha, beta, times_asked, times_maybe "
+                "FROM attributes ORDER BY rowid"
+            )
+        }
+        self._original_attribute_ids = set(self.attributes)
+        self.entities = {
+            row[0]: Entity(
+                id=row[0],
+                name=row[1],
+                popularity_rank=row[2],
+                category=row[3],
+                times_played=row[4],
+                times_guessed_correctly=row[5],
+            )
+            for row in conn.execute(
+                "SELECT id, name, popularity_rank, category, times_played, times_guessed_correctly "
+                "FROM entities ORDER BY rowid"
+            )
+        }
+        for entity_id, attr_id, value in conn.execute(
+            "SELECT entity_id, attribute_id, value FROM entity_attributes ORDER BY rowid"
+        ):
+            entity = self.entities.get(entity_id)
+            if entity is not None:
+                entity.attributes[attr_id] = value
+        return None
+
+    def import_json(self) -> None:
+        """
+        Replace the database contents with the JSON files in the data directory.
+
+        Reads the catalog, learned.json and the learning journal exactly as
+        KnowledgeBase does, then writes everything in one transaction.
+        Unsaved changes are discarded.
+        """
+        with self.lock:
+            self._import_json()
+            self._clear_dirty()
+            self._play_deltas = {}
+            self._answer_deltas = {}
+            self._build_matrix()
+            self.version += 1
+
+    def _import_json(self) -> None:
+        """Load the JSON files into the dicts and write them to the database."""
+        self.entities = {}
+        self.attributes = {}
+        self._learned_entities = {}
+        KnowledgeBase._load(self)
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entity_attributes")
+            conn.execute("DELETE FROM entities")
+            conn.execute("DELETE FROM attributes")
+            conn.executemany(
+                _UPSERT_ATTRIBUTE, [_attribute_row(a) for a in self.attributes.values()]
+            )
+            conn.executemany(_SET_ANSWERS, [
+                (a.times_asked, a.times_maybe, a.id) for a in self.attributes.values()
+            ])
+            conn.executemany(_UPSERT_ENTITY, [_entity_row(e) for e in self.entities.values()])
+            conn.executemany(_UPSERT_VALUE, [
+                (entity.id, attr_id, float(value))
+                for entity in self.entities.values()
+                for attr_id, value in entity.attributes.items()
+            ])
+
+    def record_play(self, entity_id: str, guessed_correctly: bool) -> None:
+        """
+        Count a game played with an entity as the target.
+
+        Args:
+            entity_id: The target entity
+            guessed_correctly: Whether the system guessed it
+        """
+        if entity_id not in self.entities:
+            return
+        super().record_play(entity_id, guessed_correctly)
+        delta = self._play_deltas.setdefault(entity_id, [0, 0])
+        delta[0] += 1
+        if guessed_correctly:
+            delta[1] += 1
+
+    def record_answer(self, attribute_id: str, answer: float) -> None:
+        """
+        Count an answer given to a question in a learned game.
+
+        Args:
+            attribute_id: The question that was answered
+            answer: The answer (0.3 to 0.7 counts as "maybe")
+        """
+        if attribute_id not in self.attributes:
+            return
+        super().record_answer(attribute_id, answer)
+        delta = self._answer_deltas.setdefault(attribute_id, [0, 0])
+        delta[0] += 1
+        if 0.3 <= answer <= 0.7:
+            delta[1] += 1
+
+    def save(self) -> None:
+        """
+        Persist changes made since the last save.
+
+        Upserts the changed attribute values, entities and attributes and adds
+        the counted games and answers to the counters, all in one transaction.
+        """
+        with self.lock:
+            if not self.has_unsaved_changes():
+                return
+            try:
+                with self._connect() as conn:
+                    self._write_changes(conn)
+            except sqlite3.Error as e:
+                print(f"Warning: Failed to save knowledge base: {e}")
+                return
+            self._clear_dirty()
+            self._play_deltas = {}
+            self._answer_deltas = {}
+
+    def _write_changes(self, conn: sqlite3.Connection) -> None:
+        """Write the rows changed since the last save (inside a transaction)."""
+        conn.executemany(_UPSERT_ATTRIBUTE, [
+            _attribute_row(self.attributes[attr_id])
+            for attr_id in self._new_attributes
+            if attr_id in self.attributes
+        ])
+
+        for entity_id in self._replaced_entities:
+            entity = self.entities.get(entity_id)
+            if entity is None:
+                continue
+            conn.execute(_UPSERT_ENTITY, _entity_row(entity))
+            conn.execute("DELETE FROM entity_attributes WHERE entity_id = ?", (entity_id,))
+            conn.executemany(_UPSERT_VALUE, [
+                (entity_id, attr_id, float(value))
+                for attr_id, value in entity.attributes.items()
+            ])
+
+        values: List[Tuple[str, str, float]] = []
+        plays: List[Tuple[int, int, str]] = []
+        for entity_id, attr_ids in self._dirty_entities.items():
+            entity = self.entities.get(entity_id)
+            if entity is None or entity_id in self._replaced_entities:
+                continue
+            values.extend(
+                (entity_id, attr_id, float(entity.attributes[attr_id])) for attr_id in attr_ids
+            )
+            played, guessed = self._play_deltas.get(entity_id, (0, 0))
+            if played:
+                plays.append((played, guessed, entity_id))
+        conn.executemany(_UPSERT_VALUE, values)
+        conn.executemany(_ADD_PLAYS, plays)
+        conn.executemany(_ADD_ANSWERS, [
+            (asked, maybe, attr_id) for attr_id, (asked, maybe) in self._answer_deltas.items()
+        ])
+
+    def compact(self) -> None:
+        """Save pending changes and fold the write-ahead log into the database file."""
+        with self.lock:
+            self.save()
+            try:
+                self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                print(f"Warning: Failed to checkpoint knowledge base: {e}")
+
+
+def _entity_row(entity: Entity) -> tuple:
+    """Get the entities table row of an entity."""
+    return (
+        entity.id,
+        entity.name,
+        entity.popularity_rank,
+        entity.category,
+        entity.times_played,
+        entity.times_guessed_correctly,
+    )
+
+
+def _attribute_row(attribute: Attribute) -> tuple:
+    """Get the attributes table row of an attribute."""
+    return (attribute.id, attribute.question, attribute.category, attribute.alpha, attribute.beta)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Create or refresh the SQLite knowledge base')
+    parser.add_argument('--data-dir', default=None, help='Knowledge base data directory')
+    parser.add_argument('--db', default=None, help='Database file')
+    parser.add_argument('--reimport', action='store_true',
+                        help='Replace the database contents with the JSON files')
+
+    args = parser.parse_args()
+
+    kb = SQLiteKnowledgeBase(args.data_dir, db_path=args.db)
+    if args.reimport:
+        kb.import_json()
+    kb.close()
+    print(f"Knowledge base database: {kb.db_path} "
+          f"({kb.get_entity_count()} entities, {kb.get_attribute_count()} attributes)")
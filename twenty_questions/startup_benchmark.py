@@ -0,0 +1,154 @@
+"""
+Cold-start benchmark for the 20 Questions CLI.
+
+Launches fresh interpreters that go through the CLI startup sequence and
+records, from process spawn, when each milestone is reached:
+
+    header    the title screen is printed
+    ready     the game engine (knowledge base and indexes) is loaded
+    question  the first question of a game is selected
+
+The "fast" path is the one the CLI uses (header first, engine loaded on a
+background thread); the "eager" path builds the engine before printing
+anything, as the CLI used to. The header time is checked against a target.
+
+Usage: python -m twenty_questions.startup_benchmark [--runs N] [--target-ms MS] [--data-dir DIR]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Header must appear within this many milliseconds of launching the process
+DEFAULT_HEADER_TARGET_MS = 50.0
+
+DEFAULT_RUNS = 10
+
+MILESTONES = ("header", "ready", "question")
+
+# Prefix of the lines the child prints when it reaches a milestone
+_MARKER = "@startup:"
+
+_CHILD_SCRIPT = """
+import json, sys
+mode, data_dir = sys.argv[1], json.loads(sys.argv[2])
+
+def mark(name):
+    print("%s" + name, flush=True)
+
+from twenty_questions import cli
+if mode == "fast":
+    cli.print_header()
+    mark("header")
+    engine = cli.EngineLoader(data_dir).result()
+else:
+    from twenty_questions.game_engine import GameEngine
+    engine = GameEngine(data_dir)
+    cli.print_header()
+    mark("header")
+mark("ready")
+engine.start_game()
+engine.get_next_question()
+mark("question")
+engine.close()
+""" % _MARKER
+
+
+def measure_startup(mode: str = "fast", data_dir: Optional[str] = None) -> Dict[str, float]:
+    """
+    Launch one fresh interpreter and time its startup milestones.
+
+    Args:
+        mode: "fast" (the CLI's startup order) or "eager" (engine before header)
+        data_dir: Knowledge base data directory (defaults to the package data)
+
+    Returns:
+        Mapping of milestone -> milliseconds since the process was spawned
+    """
+    package_root = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _CHILD_SCRIPT, mode, json.dumps(data_dir)],
+        stdout=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    for line in process.stdout:
+        if line.startswith(_MARKER):
+            timings[line[len(_MARKER):].strip()] = (time.perf_counter() - start) * 1000
+    if process.wait() != 0:
+        raise RuntimeError(f"Startup benchmark child exited with status {process.returncode}")
+    return timings
+
+
+def run_benchmark(
+    runs: int = DEFAULT_RUNS,
+    data_dir: Optional[str] = None,
+    modes=("fast", "eager")
+) -> Dict[str, Dict[str, List[float]]]:
+    """
+    Measure startup repeatedly for each mode.
+
+    Runs of the modes are interleaved so that both see the same system state.
+
+    Returns:
+        Mapping of mode -> milestone -> per-run milliseconds
+    """
+    results = {mode: {m: [] for m in MILESTONES} for mode in modes}
+    for _ in range(runs):
+        for mode in modes:
+            for milestone, ms in measure_startup(mode, data_dir).items():
+                results[mode][milestone].append(ms)
+    return results
+
+
+def print_report(
+    results: Dict[str, Dict[str, List[float]]],
+    target_ms: float = DEFAULT_HEADER_TARGET_MS
+) -> bool:
+    """
+    Print median/max timings per mode and check the header target.
+
+    Returns:
+        True if the fast path's median header time meets the target
+    """
+    print(f"{'mode':8s} {'milestone':10s} {'median ms':>10s} {'max ms':>8s}")
+    for mode, milestones in results.items():
+        for milestone in MILESTONES:
+            times = milestones[milestone]
+            if times:
+                print(f"{mode:8s} {milestone:10s} {statistics.median(times):10.1f} {max(times):8.1f}")
+
+    header_times = results.get("fast", {}).get("header", [])
+    if not header_times:
+        return False
+    header_ms = statistics.median(header_times)
+    met = header_ms <= target_ms
+    print(f"\nHeader after {header_ms:.1f} ms (target {target_ms:.0f} ms): "
+          f"{'met' if met else 'MISSED'}")
+    return met
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure 20 Questions CLI startup time')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Launches per mode')
+    parser.add_argument('--target-ms', type=float, default=DEFAULT_HEADER_TARGET_MS,
+                        help='Header time target in milliseconds')
+    parser.add_argument('--data-dir', default=None, help='Knowledge base data directory')
+
+    args = parser.parse_args()
+
+    benchmark = run_benchmark(args.runs, args.data_dir)
+    sys.exit(0 if print_report(benchmark, args.target_ms) else 1)
@@ -12,6 +12,7 @@ import random
 import json
 import math
 import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass, field
 from collections import defaultdict
@@ -21,6 +22,7 @@ from .models import Entity, BeliefState
 from .knowledge_base import KnowledgeBase
 from .belief_tracker import BeliefTracker
 from .question_selector import QuestionSelector
+from .implications import ImplicationEngine, KnownAnswers
 
 
 @dataclass
@@ -33,7 +35,8 @@ class SimulationResult:
     final_rank: int  # Rank of target in final beliefs (1 = top)
     final_probability: float
     questions_asked: List[str]
-    entropy_progression: List[float]
+    entropy_progression: List[float]  # Entropy before each question, then final
+    guessed_entity_id: Optional[str] = None  # Top entity in final beliefs
 
 
 @dataclass
@@ -74,7 +77,8 @@ class Trainer:
         max_questions: int = 20,
         guess_threshold: float = 0.5,
         guess_margin: float = 0.15,
-        use_popularity_prior: bool = True
+        use_popularity_prior: bool = True,
+        lookahead_width: int = 0
     ):
         """
         Initialize the trainer.
@@ -85,6 +89,7 @@ class Trainer:
             guess_threshold: Confidence threshold to make a guess
             guess_margin: Required margin over second-best
             use_popularity_prior: Whether to use popularity-weighted priors
+            lookahead_width: Questions re-ranked by two-ply lookahead (0 = greedy)
         """
         self.kb = knowledge_base
         self.max_questions = max_questions
@@ -92,8 +97,14 @@ class Trainer:
         self.guess_margin = guess_margin
         self.use_popularity_prior = use_popularity_prior
 
-        self.bt = BeliefTracker(knowledge_base)
-        self.qs = QuestionSelector(knowledge_base, self.bt)
+        self.implication_engine = ImplicationEngine()
+        self.bt = BeliefTracker(knowledge_base, implication_engine=self.implication_engine)
+        self.qs = QuestionSelector(
+            knowledge_base,
+            self.bt,
+            implication_engine=self.implication_engine,
+            lookahead_width=lookahead_width
+        )
 
         self.stats = TrainingStats()
         self.results: List[SimulationResult] = []
@@ -103,16 +114,27 @@ class Trainer:
         num_games: int = 1000,
         weighted_selection: bool = True,
         verbose: bool = False,
-        progress_interval: int = 100
+        progress_interval: int = 100,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        batch_size: int = 1
     ) -> TrainingStats:
         """
         Run multiple simulated games.
 
+        All targets are drawn up front in this process and each game is
+        deterministic given its target, so results (and their order) are the
+        same for any number of workers.
+
         Args:
             num_games: Number of games to simulate
             weighted_selection: Weight entity selection by popularity
             verbose: Print detailed progress
             progress_interval: How often to print progress
+            workers: Number of worker processes (1 = run in this process)
+            seed: Seed for target selection (None = use the global random state)
+            batch_size: Games advanced together in lockstep as one belief matrix
+                        (1 = play games one at a time)
 
         Returns:
             Aggregate training statistics
@@ -131,14 +153,13 @@ class Trainer:
         else:
             weights = [1.0 / len(entities)] * len(entities)
 
-        start_time = time.time()
+        # Select target entities (weighted by popularity)
+        rng = random.Random(seed) if seed is not None else random
+        targets = rng.choices(entities, weights=weights, k=num_games)
 
-        for i in range(num_games):
-            # Select target entity (weighted by popularity)
-            target = random.choices(entities, weights=weights, k=1)[0]
+        start_time = time.time()
 
-            # Run single game simulation
-            result = self._simulate_single_game(target)
+        for i, result in enumerate(self._play_games(targets, workers, batch_size)):
             self.results.append(result)
 
             # Update stats
@@ -158,6 +179,50 @@ class Trainer:
 
         return self.stats
 
+    def _play_games(self, targets: List[Entity], workers: int, batch_size: int = 1):
+        """
+        Simulate games for the given targets, yielding results in target order.
+
+        With a batch size above one, games are played in lockstep batches by
+        a BatchSimulator in this process. Otherwise, with more than one
+        worker, games are spread over a process pool whose workers each
+        receive a copy of the knowledge base once at startup.
+        """
+        if batch_size > 1:
+            if self.qs.lookahead_width > 0:
+                raise ValueError("lookahead selection is not supported in batched simulation")
+            # Imported here: the batch simulator builds on this module's results
+            from .batch_simulator import BatchSimulator
+
+            simulator = BatchSimulator(self)
+            for start in range(0, len(targets), batch_size):
+                yield from simulator.simulate(targets[start:start + batch_size])
+            return
+
+        if workers <= 1 or len(targets) <= 1:
+            for target in targets:
+                yield self._simulate_single_game(target)
+            return
+
+        settings = (
+            self.max_questions,
+            self.guess_threshold,
+            self.guess_margin,
+            self.use_popularity_prior,
+            self.qs.lookahead_width,
+        )
+        chunksize = max(1, len(targets) // (workers * 8))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_simulation_worker,
+            initargs=(self.kb, settings)
+        ) as executor:
+            yield from executor.map(
+                _simulate_in_worker,
+                [target.id for target in targets],
+                chunksize=chunksize
+            )
+
     def _calculate_selection_weights(self, entities: List[Entity]) -> List[float]:
         """Calculate selection weights based on popularity rank."""
         weights = []
@@ -190,7 +255,7 @@ class Trainer:
             beliefs = self.bt.initialize_beliefs()
 
         asked_questions: Set[str] = set()
-        known_answers: Dict[str, float] = {}
+        known_answers = KnownAnswers(self.implication_engine)
         questions_asked: List[str] = []
         entropy_progression: List[float] = [self.bt.get_entropy(beliefs)]
 
@@ -216,42 +281,20 @@ class Trainer:
                 break
 
             # "Answer" the question based on target's attributes
-            answer = self._get_target_answer(target, question_id)
+            answer = self.get_target_answer(target, question_id)
 
-            # Update tracking
+            # Update tracking; implied answers are merged in incrementally,
+            # as in GameEngine.process_answer
             asked_questions.add(question_id)
-            known_answers[question_id] = answer
+            known_answers.add_answer(question_id, answer)
             questions_asked.append(question_id)
             num_questions += 1
 
-            # Add implied answers to known_answers for proper question filtering
-            # Use recursive propagation to get ALL determined attributes
-            from .implications import ImplicationEngine
-            impl_engine = ImplicationEngine()
-
-            # First add direct implications
-            implications = impl_engine.get_implications(question_id, answer)
-            for implied_attr, implied_val in implications:
-                known_answers[implied_attr] = implied_val
-
-            # Then recursively propagate to get all determined attributes
-            all_determined = impl_engine.get_all_determined_attributes(known_answers)
-            known_answers.update(all_determined)
-
-            # Track question usage
-            self.stats.question_usage_count[question_id] += 1
-
-            # Calculate and track info gain
-            current_entropy = self.bt.get_entropy(beliefs)
-
-            # Update beliefs
+            # Update beliefs (per-question info gain is derived from the
+            # entropy progression in _update_stats)
             beliefs = self.bt.update_beliefs(beliefs, question_id, answer)
 
-            new_entropy = self.bt.get_entropy(beliefs)
-            info_gain = current_entropy - new_entropy
-            self.stats.question_info_gains[question_id].append(info_gain)
-
-            entropy_progression.append(new_entropy)
+            entropy_progression.append(self.bt.get_entropy(beliefs))
 
         # If we exhausted questions, check final beliefs
         if num_questions == self.max_questions:
@@ -260,13 +303,7 @@ class Trainer:
 
         # Calculate final rank and probability
         final_rank = self._get_entity_rank(beliefs, target.id)
-        final_probability = beliefs.probabilities.get(target.id, 0.0)
-
-        # Track confusion if failed
-        if not guessed_correctly:
-            top_entity = self.bt.get_top_entity(beliefs)
-            if top_entity:
-                self.stats.confusion_pairs[target.id].append(top_entity)
+        final_probability = beliefs.get_probability(target.id)
 
         return SimulationResult(
             target_entity_id=target.id,
@@ -276,7 +313,8 @@ class Trainer:
             final_rank=final_rank,
             final_probability=final_probability,
             questions_asked=questions_asked,
-            entropy_progression=entropy_progression
+            entropy_progression=entropy_progression,
+            guessed_entity_id=self.bt.get_top_entity(beliefs)
         )
 
     def _initialize_with_popularity_prior(self) -> BeliefState:
@@ -297,7 +335,7 @@ class Trainer:
 
         return BeliefState(probabilities=probs)
 
-    def _get_target_answer(self, target: Entity, attribute_id: str) -> float:
+    def get_target_answer(self, target: Entity, attribute_id: str) -> float:
         """
         Get the target's answer for a question.
 
@@ -305,8 +343,7 @@ class Trainer:
         Uses implication system to infer answers for unset attributes.
         """
         # First check if answer can be inferred from implications
-        from .implications import ImplicationEngine
-        impl_engine = ImplicationEngine()
+        impl_engine = self.implication_engine
 
         # Build known attributes from the target entity
         known_attrs = {k: v for k, v in target.attributes.items() if v >= 0.8 or v <= 0.2}
@@ -340,14 +377,18 @@ class Trainer:
 
     def _get_entity_rank(self, beliefs: BeliefState, entity_id: str) -> int:
         """Get the rank of an entity in the belief distribution."""
-        sorted_entities = beliefs.get_top_entities(len(beliefs.probabilities))
-        for rank, (eid, _) in enumerate(sorted_entities, 1):
-            if eid == entity_id:
-                return rank
-        return len(sorted_entities) + 1
+        rank = beliefs.get_rank(entity_id)
+        if rank is None:
+            return beliefs.num_entities() + 1
+        return rank
 
     def _update_stats(self, result: SimulationResult):
-        """Update aggregate statistics with a game result."""
+        """
+        Update aggregate statistics with a game result.
+
+        Everything is derived from the result itself, so results simulated
+        in worker processes merge exactly like local ones.
+        """
         self.stats.total_games += 1
         self.stats.total_questions += result.num_questions
 
@@ -367,6 +408,16 @@ class Trainer:
             if result.target_entity_id not in self.stats.failed_entities:
                 self.stats.failed_entities.append(result.target_entity_id)
 
+        # Question usage and info gain (entropy before minus after each question)
+        for i, question_id in enumerate(result.questions_asked):
+            self.stats.question_usage_count[question_id] += 1
+            info_gain = result.entropy_progression[i] - result.entropy_progression[i + 1]
+            self.stats.question_info_gains[question_id].append(info_gain)
+
+        # Track confusion if failed
+        if not result.guessed_correctly and result.guessed_entity_id:
+            self.stats.confusion_pairs[result.target_entity_id].append(result.guessed_entity_id)
+
     def _finalize_stats(self):
         """Finalize statistics after all games."""
         # Calculate avg questions when correct
@@ -572,6 +623,30 @@ class Trainer:
                     print(f"    Often confused with: {', '.join(item['confused_with'][:3])}")
 
 
+# Per-process trainer used by run_simulation(workers > 1)
+_worker_trainer: Optional[Trainer] = None
+
+
+def _init_simulation_worker(knowledge_base: KnowledgeBase, settings: tuple) -> None:
+    """Set up the simulation trainer once per worker process."""
+    global _worker_trainer
+    max_questions, guess_threshold, guess_margin, use_popularity_prior, lookahead_width = settings
+    _worker_trainer = Trainer(
+        knowledge_base,
+        max_questions=max_questions,
+        guess_threshold=guess_threshold,
+        guess_margin=guess_margin,
+        use_popularity_prior=use_popularity_prior,
+        lookahead_width=lookahead_width
+    )
+
+
+def _simulate_in_worker(target_id: str) -> SimulationResult:
+    """Simulate one game in a worker process."""
+    target = _worker_trainer.kb.get_entity(target_id)
+    return _worker_trainer._simulate_single_game(target)
+
+
 class AutoOptimizer:
     """
     Automatically optimizes the knowledge base based on training results.
@@ -671,11 +746,11 @@ class AutoOptimizer:
                     if diff > 0:
                         # Entity has this attribute more
                         new_val = min(1.0, entity.attributes.get(attr_id, 0.5) + 0.1)
-                        entity.attributes[attr_id] = new_val
+                        self.kb.set_attribute_value(entity.id, attr_id, new_val)
                     else:
                         # Confused entity has it more, decrease ours
                         new_val = max(0.0, entity.attributes.get(attr_id, 0.5) - 0.1)
-                        entity.attributes[attr_id] = new_val
+                        self.kb.set_attribute_value(entity.id, attr_id, new_val)
                     improvements += 1
 
         return improvements
@@ -709,7 +784,11 @@ def run_training(
     data_dir: str = None,
     num_games: int = 1000,
     save_results: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    batch_size: int = 1,
+    lookahead_width: int = 0
 ) -> TrainingStats:
     """
     Convenience function to run training.
@@ -719,6 +798,10 @@ def run_training(
         num_games: Number of games to simulate
         save_results: Whether to save results to file
         verbose: Print progress
+        workers: Number of worker processes
+        seed: Seed for target selection
+        batch_size: Games simulated together in lockstep
+        lookahead_width: Questions re-ranked by two-ply lookahead (0 = greedy)
 
     Returns:
         Training statistics
@@ -727,12 +810,15 @@ def run_training(
         data_dir = os.path.join(os.path.dirname(__file__), 'data')
 
     kb = KnowledgeBase(data_dir)
-    trainer = Trainer(kb)
+    trainer = Trainer(kb, lookahead_width=lookahead_width)
 
     stats = trainer.run_simulation(
         num_games=num_games,
         weighted_selection=True,
-        verbose=verbose
+        verbose=verbose,
+        workers=workers,
+        seed=seed,
+        batch_size=batch_size
     )
 
     if verbose:
@@ -755,6 +841,11 @@ if __name__ == '__main__':
     parser.add_argument('--optimize', action='store_true', help='Run auto-optimization')
     parser.add_argument('--iterations', type=int, default=5, help='Optimization iterations')
     parser.add_argument('--quiet', action='store_true', help='Suppress output')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for simulation')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for target selection')
+    parser.add_argument('--batch-size', type=int, default=1, help='Games simulated together in lockstep')
+    parser.add_argument('--lookahead', type=int, default=0,
+                        help='Re-rank this many top questions by two-ply lookahead (0 = greedy)')
 
     args = parser.parse_args()
 
@@ -769,4 +860,11 @@ if __name__ == '__main__':
             verbose=not args.quiet
         )
     else:
-        run_training(num_games=args.games, verbose=not args.quiet)
+        run_training(
+            num_games=args.games,
+            verbose=not args.quiet,
+            workers=args.workers,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            lookahead_width=args.lookahead
+        )
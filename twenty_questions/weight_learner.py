@@ -4,12 +4,127 @@ Weight Learner for the 20 Questions game.
 Implements dynamic weight adjustment based on game sessions.
 """
 
+import threading
+import time
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import Callable, Iterable, List, Set, Tuple, Optional
 from .models import Entity, Attribute, GameSession
 from .knowledge_base import KnowledgeBase
 
 
+# Write-behind defaults: save at most this many seconds after the first
+# unsaved change, or as soon as this many entities are dirty
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_FLUSH_COUNT = 20
+
+
+class WriteBehindSaver:
+    """
+    Saves a knowledge base from a background thread.
+
+    Changed entities are collected as they are reported; the worker thread
+    saves once flush_interval seconds have passed since the first unsaved
+    change or flush_count entities are dirty, whichever comes first. Saves
+    take the knowledge base lock and go through KnowledgeBase.save(), so
+    they keep its atomic write behavior.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_count: int = DEFAULT_FLUSH_COUNT
+    ):
+        """
+        Initialize the saver and start its worker thread.
+
+        Args:
+            knowledge_base: The knowledge base to save
+            flush_interval: Maximum seconds a change waits before being saved
+            flush_count: Number of dirty entities that triggers an early save
+        """
+        self.kb = knowledge_base
+        self.flush_interval = flush_interval
+        self.flush_count = flush_count
+
+        self._dirty: Set[str] = set()
+        self._first_dirty_at: Optional[float] = None
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self._thread = threading.Thread(
+            target=self._run, name="kb-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of entities with changes waiting to be saved."""
+        with self._condition:
+            return len(self._dirty)
+
+    def mark_dirty(self, entity_ids: Iterable[str]) -> None:
+        """
+        Report entities whose changes need saving.
+
+        Args:
+            entity_ids: IDs of the changed entities
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("WriteBehindSaver is closed")
+            was_clean = not self._dirty
+            self._dirty.update(entity_ids)
+            # Wake the worker to start the interval timer or to save early
+            if was_clean and self._dirty:
+                self._first_dirty_at = time.monotonic()
+                self._condition.notify()
+            elif len(self._dirty) >= self.flush_count:
+                self._condition.notify()
+
+    def flush(self) -> None:
+        """Save all pending changes now, in the calling thread."""
+        with self._condition:
+            self._dirty.clear()
+            self._first_dirty_at = None
+        self._save()
+
+    def close(self) -> None:
+        """Stop the worker thread and save anything still pending."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        """Worker loop: wait for a flush trigger, then save."""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._dirty:
+                        if len(self._dirty) >= self.flush_count:
+                            break
+                        remaining = self._first_dirty_at + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+                self._dirty.clear()
+                self._first_dirty_at = None
+            self._save()
+
+    def _save(self) -> None:
+        """Save the knowledge base under its lock."""
+        with self.kb.lock:
+            self.kb.save()
+
+
 class WeightLearner:
     """
     Learns and adjusts entity-attribute weights based on gameplay.
@@ -18,6 +133,9 @@ class WeightLearner:
     1. Correct guesses (reinforce the pattern)
     2. Wrong guesses (adjust toward actual answers)
     3. New entities (learn from user corrections)
+
+    Every learned game also counts its answers per question, from which the
+    question selector estimates how often a question gets a "maybe".
     """
 
     def __init__(
@@ -25,7 +143,10 @@ class WeightLearner:
         knowledge_base: KnowledgeBase,
         learning_rate: float = 0.1,
         min_weight: float = 0.01,
-        max_weight: float = 0.99
+        max_weight: float = 0.99,
+        write_behind: bool = False,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_count: int = DEFAULT_FLUSH_COUNT
     ):
         """
         Initialize the weight learner.
@@ -35,12 +156,48 @@ class WeightLearner:
             learning_rate: Rate of weight updates (0.0-1.0)
             min_weight: Minimum allowed weight value
             max_weight: Maximum allowed weight value
+            write_behind: Save from a background thread instead of after every update
+            flush_interval: Write-behind: maximum seconds before changes are saved
+            flush_count: Write-behind: dirty entities that trigger an early save
         """
         self.kb = knowledge_base
         self.learning_rate = learning_rate
         self.min_weight = min_weight
         self.max_weight = max_weight
 
+        # Called after every update that changed the knowledge base
+        self.on_change: Optional[Callable[[], None]] = None
+
+        self.saver: Optional[WriteBehindSaver] = None
+        if write_behind:
+            self.kb.autosave = False
+            self.saver = WriteBehindSaver(knowledge_base, flush_interval, flush_count)
+
+    def _persist(self, *entity_ids: str) -> None:
+        """Save changes to the given entities now, or hand them to the write-behind saver."""
+        if self.saver is not None:
+            self.saver.mark_dirty(entity_ids)
+        else:
+            self.kb.save()
+        self._notify_change()
+
+    def _notify_change(self) -> None:
+        """Tell the on_change listener, if any, that the knowledge base changed."""
+        if self.on_change is not None:
+            self.on_change()
+
+    def flush(self) -> None:
+        """Save all pending changes now (no-op without write-behind)."""
+        if self.saver is not None:
+            self.saver.flush()
+
+    def close(self) -> None:
+        """Save pending changes and stop the write-behind thread, if any."""
+        if self.saver is not None:
+            self.saver.close()
+            self.saver = None
+            self.kb.autosave = True
+
     def update_from_session(
         self,
         entity_id: str,
@@ -63,22 +220,27 @@ class WeightLearner:
         # and a lower rate for incorrect guesses (gentler correction)
         effective_rate = self.learning_rate if was_correct_guess else self.learning_rate * 0.5
 
-        for attr_id, answer in question_answers:
-            current_weight = entity.attributes.get(attr_id, 0.5)
+        with self.kb.lock:
+            for attr_id, answer in question_answers:
+                current_weight = entity.attributes.get(attr_id, 0.5)
 
-            # Move weight toward the user's answer using exponential moving average
-            new_weight = current_weight + effective_rate * (answer - current_weight)
-            new_weight = np.clip(new_weight, self.min_weight, self.max_weight)
+                # Move weight toward the user's answer using exponential moving average
+                new_weight = current_weight + effective_rate * (answer - current_weight)
+                new_weight = np.clip(new_weight, self.min_weight, self.max_weight)
 
-            entity.attributes[attr_id] = new_weight
+                self.kb.set_attribute_value(entity_id, attr_id, new_weight)
 
-        # Update play statistics
-        entity.times_played += 1
-        if was_correct_guess:
-            entity.times_guessed_correctly += 1
+            # Update play and answer statistics
+            self.kb.record_play(entity_id, was_correct_guess)
+            self._record_answers(question_answers)
 
         # Persist changes
-        self.kb.save()
+        self._persist(entity_id)
+
+    def _record_answers(self, question_answers: List[Tuple[str, float]]) -> None:
+        """Count a finished game's answers per question (lock held)."""
+        for attr_id, answer in question_answers:
+            self.kb.record_answer(attr_id, answer)
 
     def learn_new_entity(
         self,
@@ -119,10 +281,14 @@ class WeightLearner:
                     question=distinguishing_question,
                     category="learned"
                 )
-                self.kb.add_attribute(new_attr)
+                with self.kb.lock:
+                    self.kb.add_attribute(new_attr)
 
             attributes[attr_id] = distinguishing_answer
 
+        with self.kb.lock:
+            self._record_answers(question_answers)
+
         # Create and add the new entity
         new_entity = Entity(
             id=entity_id,
@@ -132,7 +298,11 @@ class WeightLearner:
             times_guessed_correctly=0
         )
 
-        self.kb.add_entity(new_entity)
+        with self.kb.lock:
+            self.kb.add_entity(new_entity)
+        if self.saver is not None:
+            self.saver.mark_dirty([entity_id])
+        self._notify_change()
 
         return new_entity
 
@@ -187,27 +357,35 @@ class WeightLearner:
         if guessed is None or actual is None:
             return
 
-        # For each question answered, adjust weights to create more separation
-        for attr_id, answer in question_answers:
-            guessed_weight = guessed.attributes.get(attr_id, 0.5)
-            actual_weight = actual.attributes.get(attr_id, 0.5)
-
-            # Move guessed entity's weight away from the answer
-            # (since it was wrong)
-            guessed_target = 1.0 - answer
-            new_guessed = guessed_weight + (self.learning_rate * 0.5) * (guessed_target - guessed_weight)
-            guessed.attributes[attr_id] = np.clip(new_guessed, self.min_weight, self.max_weight)
+        with self.kb.lock:
+            # For each question answered, adjust weights to create more separation
+            for attr_id, answer in question_answers:
+                guessed_weight = guessed.attributes.get(attr_id, 0.5)
+                actual_weight = actual.attributes.get(attr_id, 0.5)
+
+                # Move guessed entity's weight away from the answer
+                # (since it was wrong)
+                guessed_target = 1.0 - answer
+                new_guessed = guessed_weight + (self.learning_rate * 0.5) * (guessed_target - guessed_weight)
+                self.kb.set_attribute_value(
+                    guessed_entity_id, attr_id,
+                    np.clip(new_guessed, self.min_weight, self.max_weight)
+                )
 
-            # Move actual entity's weight toward the answer
-            new_actual = actual_weight + self.learning_rate * (answer - actual_weight)
-            actual.attributes[attr_id] = np.clip(new_actual, self.min_weight, self.max_weight)
+                # Move actual entity's weight toward the answer
+                new_actual = actual_weight + self.learning_rate * (answer - actual_weight)
+                self.kb.set_attribute_value(
+                    actual_entity_id, attr_id,
+                    np.clip(new_actual, self.min_weight, self.max_weight)
+                )
 
-        # Update statistics
-        guessed.times_played += 1
-        actual.times_played += 1
-        # Neither was guessed correctly
+            # Update statistics
+            # Neither was guessed correctly
+            self.kb.record_play(guessed_entity_id, False)
+            self.kb.record_play(actual_entity_id, False)
+            self._record_answers(question_answers)
 
-        self.kb.save()
+        self._persist(guessed_entity_id, actual_entity_id)
 
     def get_learning_stats(self, entity_id: str) -> dict:
         """